@@ -0,0 +1,10 @@
+# Abas do app: cada uma fica num módulo próprio, importado (com as suas dependências) só quando selecionada
+ABAS = {
+    "MMM SIMULADOR": "mmm_simulador",
+    "MMM Media Behavior": "mmm_media_behavior",
+    "BRAIN": "brain",
+    "MERIDIO": "meridio",
+    "MMX": "mmx",
+    "UXM": "uxm",
+    "FLAG": "flag_ltv",
+}
@@ -0,0 +1,219 @@
+# Aba FLAG: LTV modeling (segmentação, GLMs por cluster e conversion value)
+import io
+from datetime import date, timedelta
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from flag.cube import CUBE_VERSION, MAX_DAYS, build_cube
+from flag.export import export_model
+from flag.ingest import LOCATION_MAP, load_dataset
+from flag.k_selection import load_or_select_k
+from flag.model_cache import cache_key, default_cache, load_or_fit
+from flag.pipeline import DEFAULT_HYPERPARAMETERS, LTV_BACKENDS, PIPELINE_VERSION, fit_pipeline, transform
+from flag.scoring import CONVERSION_VALUE_DIVISOR, apply_predictions, ltv_models
+from flag.validation import MONTH_DAYS, N_MONTHS, VALIDATION_VERSION, cross_validate
+from perfil import etapa
+
+NOMES_PAGAMENTO = {'Credit Card': 'Cartão de crédito', 'Debit Card': 'Cartão de débito', 'UPI': 'UPI',
+                   'Wallet Balance': 'Saldo da carteira'}
+NOMES_BACKEND = {'glm': 'GLMs por cluster', 'xgboost': 'XGBoost (hist)'}
+
+
+def renderizar():
+    st.header("FLAG - Previsão de LTV & ROAS VBB")
+    dataset_path = "digital_wallet_ltv_dataset.csv"
+    # Leitura tipada via cache Parquet (o CSV só é reprocessado quando muda)
+    with etapa("flag:load_dataset"):
+        df = load_dataset(dataset_path)
+
+    # Scaler, KMeans, PCA e o modelo de LTV são treinados uma vez e reaproveitados entre reruns e sessões
+    # (cache em memória + disco, indexado pelo hash do dataset e pelos hiperparâmetros, backend incluído)
+    hiperparametros = dict(DEFAULT_HYPERPARAMETERS)
+    hiperparametros['ltv_backend'] = st.sidebar.selectbox("Modelo de LTV do FLAG", LTV_BACKENDS,
+                                                          format_func=NOMES_BACKEND.get)
+    # Número de clusters escolhido numa amostra do dataset (cotovelo da inércia, com silhueta e
+    # Calinski-Harabasz de cada k), guardado no cache pelo fingerprint do dataset
+    with etapa("flag:selecao_k"):
+        selecao_k = load_or_select_k(dataset_path, df, backend=hiperparametros['clustering_backend'])
+    hiperparametros['num_clusters'] = selecao_k['k']
+    with etapa("flag:load_or_fit"):
+        artefatos, chave_modelo = load_or_fit(dataset_path, hiperparametros,
+                                             lambda: fit_pipeline(df, **hiperparametros), version=PIPELINE_VERSION)
+
+    # Scoring e agregação rodam uma vez por modelo treinado: o cubo de conversion values fica no mesmo cache
+    # dos artefatos e, nos reruns, os filtros só consultam o cubo (sem reprocessar a tabela de clientes)
+    chave_cubo = cache_key(chave_modelo, {}, version=f"cubo-{CUBE_VERSION}")
+    # A validação rolling-origin do mesmo pipeline também fica no cache, junto do modelo que ela avalia
+    chave_validacao = cache_key(chave_modelo, {'scheme': 'rolling', 'months': N_MONTHS},
+                                version=f"validacao-{VALIDATION_VERSION}")
+    if st.sidebar.button("Retreinar modelos do FLAG"):
+        default_cache().invalidate(chave_modelo)
+        default_cache().invalidate(chave_cubo)
+        default_cache().invalidate(chave_validacao)
+        st.rerun()
+
+    # Modelos exportados (arrays + JSON, sem pickle) para o scoring em lote fora do app: `python -m flag.batch`
+    with etapa("flag:export"):
+        exportado = io.BytesIO()
+        export_model(artefatos, exportado, chave_modelo)
+    st.sidebar.download_button("Exportar modelos do FLAG", exportado.getvalue(),
+                               file_name=f"flag-{chave_modelo[:12]}.npz", mime="application/octet-stream")
+
+    cluster_metrics = artefatos['cluster_metrics']
+    evaluation_metrics = artefatos['evaluation_metrics']
+
+    def montar_cubo():
+        # Aplica encoding, cluster e PCA já treinados e calcula os conversion values
+        with etapa("flag:transform"):
+            df_novo = transform(df, artefatos)
+        with etapa("flag:apply_predictions"):
+            df_novo = apply_predictions(df_novo, ltv_models(artefatos))
+        with etapa("flag:cubo"):
+            df_novo['conversion_value'] = df_novo['conversion_value'] / CONVERSION_VALUE_DIVISOR
+            return build_cube(df_novo, artefatos, model_key=chave_modelo)
+
+    with etapa("flag:load_or_build_cube"):
+        cubo = default_cache().get_or_fit(chave_cubo, montar_cubo)
+
+    # Nomes dos clusters definidos pelo ranking de LTV médio no treino (estáveis entre retreinos)
+    cluster_names = artefatos['cluster_names']
+    income_names = {10: 'Alta Renda', 5: 'Mass Market Medium', 1: 'Mass Market Low'}
+    location_names = {'Urbana': LOCATION_MAP['Urban'], 'Suburbana': LOCATION_MAP['Suburban'],
+                      'Rural': LOCATION_MAP['Rural']}
+    payment_names = {NOMES_PAGAMENTO.get(metodo, metodo): score
+                     for metodo, score in sorted(artefatos['payment_scores'].items())}
+
+    # Subbloco de KPIs
+    st.subheader("KPIs de Performance")
+
+    # Filtros do gráfico de conversion value por cluster e renda (cada combinação é uma fatia do cubo)
+    st.write("### Filtros")
+    hoje = date.today()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        data_selecionada = st.date_input("Última transação entre", [], min_value=hoje - timedelta(days=MAX_DAYS),
+                                         max_value=hoje)
+    with col2:
+        regioes = st.multiselect("Selecione a(s) Localização(ões)", list(location_names))
+    with col3:
+        plataformas = st.multiselect("Selecione o(s) Meio(s) de Pagamento", list(payment_names))
+
+    with etapa("flag:consulta_cubo"):
+        dias = None
+        if data_selecionada:
+            inicio, fim = data_selecionada[0], data_selecionada[-1]
+            dias = ((hoje - fim).days, (hoje - inicio).days)
+        avg_conversion_per_cluster_income = cubo.query(
+            locations=[location_names[r] for r in regioes] or None,
+            payment_scores=[payment_names[p] for p in plataformas] or None,
+            days=dias)
+        clientes_filtrados = int(avg_conversion_per_cluster_income['customers'].sum())
+        avg_conversion_per_cluster_income['cluster_label'] = avg_conversion_per_cluster_income['cluster_label'].map(cluster_names)
+        avg_conversion_per_cluster_income['income_level_numerico'] = avg_conversion_per_cluster_income['income_level_numerico'].map(income_names)
+        avg_conversion_per_cluster_income = avg_conversion_per_cluster_income.sort_values(
+            ['cluster_label', 'income_level_numerico'], ignore_index=True)
+    st.caption(f"{clientes_filtrados:,} de {cubo.total:,} clientes nos filtros")
+
+    # Seleção de KPIs para exibir no gráfico de linhas
+    kpis_selecionados = st.multiselect("Selecione os KPIs para o gráfico de linhas", ["ROAS", "Taxa de Conversão", "CPC", "LTV Médio"])
+
+    # Gráfico de KPIs selecionados ao longo de 6 meses
+    if kpis_selecionados:
+        # Dados fictícios para visualização
+        meses = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun"]
+        dados_kpis = {
+            "ROAS": [1.2, 1.4, 1.3, 1.5, 1.6, 1.4],
+            "Taxa de Conversão": [0.03, 0.04, 0.035, 0.038, 0.04, 0.042],
+            "CPC": [0.5, 0.45, 0.48, 0.46, 0.44, 0.43],
+            "LTV Médio": [200, 220, 210, 230, 240, 225]
+        }
+        
+        fig_kpis = go.Figure()
+        for kpi in kpis_selecionados:
+            fig_kpis.add_trace(go.Scatter(x=meses, y=dados_kpis[kpi], mode="lines+markers", name=kpi))
+        
+        fig_kpis.update_layout(
+            title="KPIs de Performance (últimos 6 meses)",
+            xaxis_title="Meses",
+            yaxis_title="Valor",
+            legend_title="KPI"
+        )
+        st.plotly_chart(fig_kpis)
+
+    # Subbloco de Integridade de Conectores
+    st.subheader("Integridade de Conectores")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.success("Google Ads")
+    with col2:
+        st.success("Meta")
+    with col3:
+        st.success("HubSpot")
+    with col4:
+        st.success("Azure")
+
+    # Subbloco de Modelo de LTV Core
+    st.subheader("Modelo de LTV Core")
+    
+    # Acurácia (1 - WAPE) por mês da última transação: cada mês é previsto pelo pipeline treinado só com os
+    # clientes de meses mais antigos (validação rolling-origin do flag.validation)
+    with etapa("flag:validacao"):
+        validacao = default_cache().get_or_fit(
+            chave_validacao, lambda: cross_validate(df, hiperparametros['ltv_backend'], hiperparametros,
+                                                    scheme='rolling', months=N_MONTHS))
+    colunas_acuracia = st.columns(3)
+    for mes, acuracia in validacao['monthly_accuracy'].items():
+        colunas_acuracia[(mes - 1) % 3].metric(
+            f"Acurácia - Mês {mes}", f"{acuracia:.1%}",
+            help=f"Última transação há {(mes - 1) * MONTH_DAYS + 1}-{mes * MONTH_DAYS} dias")
+
+    with st.expander(f"Número de clusters: k = {selecao_k['k']}"):
+        st.caption(f"k no cotovelo da inércia entre k = {selecao_k['scores'].index.min()} e "
+                   f"{selecao_k['scores'].index.max()}, em {selecao_k['fit_rows']:,} clientes amostrados "
+                   f"(silhueta em {selecao_k['silhouette_batches']} lotes de {selecao_k['silhouette_rows']:,})")
+        st.dataframe(selecao_k['scores'].rename(columns={
+            'inertia': 'Inércia por cliente', 'silhouette': 'Silhueta', 'silhouette_std': 'Desvio da silhueta',
+            'calinski_harabasz': 'Calinski-Harabasz', 'seconds': 'Segundos'}))
+
+    # Tempo gasto em cada etapa do último treino (o treino só roda quando o cache de modelos é invalidado)
+    with st.expander("Tempos de treino por etapa"):
+        st.dataframe(pd.Series(artefatos['timings'], name='segundos').to_frame())
+
+    # Gráfico de "Conversion Value" por Clusters usando Plotly
+    st.subheader("Conversion Value Próximos 180 dias vs Cluster")
+    
+    # Convertendo os dados para gráfico
+    avg_conversion_per_cluster_income['income_level_numerico'] = avg_conversion_per_cluster_income['income_level_numerico'].map({
+        'Alta Renda': 'Alta Renda',
+        'Mass Market Medium': 'Média Renda',
+        'Mass Market Low': 'Baixa Renda'
+    })
+
+    fig_conversion = px.bar(
+        avg_conversion_per_cluster_income,
+        x='cluster_label',
+        y='conversion_value',
+        color='income_level_numerico',
+        title='Conversion Value próximos 180 dias vs Cluster & Renda',
+        labels={
+            'cluster_label': 'Cluster',
+            'conversion_value': 'Conversion Value Médio (R$)',
+            'income_level_numerico': 'Renda'
+        },
+        text='conversion_value'
+    )
+    fig_conversion.update_traces(texttemplate="R$ %{text:.2s}", textposition="outside")
+    fig_conversion.update_layout(
+        yaxis_tickformat="R$",
+        xaxis_title="Cluster",
+        yaxis_title="Conversion Value Médio",
+        legend_title="Nível de Renda",
+        height=500
+    )
+
+    # A serialização da figura do Plotly acontece dentro do st.plotly_chart
+    with etapa("flag:grafico_conversion_value"):
+        st.plotly_chart(fig_conversion)
@@ -0,0 +1,95 @@
+# Aba MERIDIO: Segmentação e Personas
+import plotly.graph_objects as go
+import streamlit as st
+
+
+def renderizar():
+    st.header("QUAIS AS PERSONAS NO SEU MERCADO E QUAIS AS ALAVANCAS DE CONSUMO?")
+    
+    # Bloco de seleção de personas
+    st.subheader("Personas")
+    cluster_selecionado = st.multiselect(
+        "Selecione um ou dois clusters para visualizar", 
+        ["Cluster A", "Cluster B", "Cluster C", "Cluster D"]
+    )
+
+    # Descrições de cada cluster
+    descricoes_clusters = {
+        "Cluster A": "Alta Renda A: Consumidores focados em investimentos robustos e personalizados. Valorizam atendimento premium e acesso rápido a produtos de crédito.",
+        "Cluster B": "Alta Renda B: Investidores conservadores que preferem produtos de baixo risco. Valorizam segurança e estabilidade.",
+        "Cluster C": "Mass Market A: Focados em construção de patrimônio com produtos acessíveis. Importante para eles é a facilidade de uso e diversidade de canais.",
+        "Cluster D": "Mass Market B: Consumidores de renda média interessados em crédito rápido e soluções práticas. Valorizam o custo-benefício."
+    }
+    verbatim_clusters = {
+        "Cluster A": "“Quero soluções rápidas e exclusivas para meus investimentos.”",
+        "Cluster B": "“Prefiro segurança e estabilidade nas minhas escolhas.”",
+        "Cluster C": "“Preciso de uma plataforma acessível e prática para crescer.”",
+        "Cluster D": "“Opções de crédito acessível são o que mais busco.”"
+    }
+
+    # Exibe a descrição do cluster e verbatim se um único cluster for selecionado
+    if len(cluster_selecionado) == 1:
+        st.write(f"**Descrição do {cluster_selecionado[0]}**")
+        st.write(descricoes_clusters[cluster_selecionado[0]])
+        st.write(f"*Verbatim:* {verbatim_clusters[cluster_selecionado[0]]}")
+    
+    # Bloco de seleção de tópicos para visualizar gráficos
+    st.subheader("Tópicos de Interesse")
+    topico_selecionado = st.selectbox(
+        "Selecione um tópico para visualizar",
+        ["Quais critérios mais importantes na hora de abrir uma conta?", 
+         "Quais são os produtos mais buscados?",
+         "Quais são as alavancas de principalidade?",
+         "Quantas contas a pessoa tem aberta entre digitais e tradicionais?"]
+    )
+
+    # Dados fictícios para os gráficos de cada tópico
+    dados_topicos = {
+        "Quais critérios mais importantes na hora de abrir uma conta?": {
+            "Acessibilidade": [80, 70, 60, 75],
+            "Segurança": [90, 85, 70, 80],
+            "Atendimento": [85, 65, 60, 70],
+        },
+        "Quais são os produtos mais buscados?": {
+            "Investimentos": [95, 90, 50, 45],
+            "Crédito": [60, 65, 85, 80],
+            "Poupança": [40, 50, 75, 70],
+        },
+        "Quais são as alavancas de principalidade?": {
+            "Programas de Fidelidade": [70, 55, 60, 65],
+            "Benefícios de Conta": [85, 80, 75, 70],
+            "Facilidade de Uso": [90, 85, 80, 75],
+        },
+        "Quantas contas a pessoa tem aberta entre digitais e tradicionais?": {
+            "Digitais": [1.5, 1.2, 2.0, 1.8],
+            "Tradicionais": [1.8, 1.5, 1.0, 0.9],
+        }
+    }
+    
+    # Exibição dos gráficos
+    if topico_selecionado and cluster_selecionado:
+        st.subheader(f"Resultados para: {topico_selecionado}")
+
+        # Preparar os dados para visualização de clusters
+        dados_topico = dados_topicos[topico_selecionado]
+        clusters_indices = {"Cluster A": 0, "Cluster B": 1, "Cluster C": 2, "Cluster D": 3}
+
+        fig = go.Figure()
+
+        # Gráfico de barras para visualização de até dois clusters selecionados
+        for cluster in cluster_selecionado:
+            indice = clusters_indices[cluster]
+            valores = [dados_topico[fator][indice] for fator in dados_topico]
+            fig.add_trace(go.Bar(
+                x=list(dados_topico.keys()), 
+                y=valores, 
+                name=cluster
+            ))
+
+        fig.update_layout(
+            title=f"Análise do Tópico: {topico_selecionado}",
+            xaxis_title="Fatores",
+            yaxis_title="Pontuação",
+            barmode='group'
+        )
+        st.plotly_chart(fig)
@@ -0,0 +1,81 @@
+# Configuração compartilhada pelas abas do MMM: alocação de referência e curvas de resposta, ajustadas no
+# histórico semanal quando ele existe ou as curvas padrão de demonstração sem ele
+import hashlib
+import os
+
+from cache_modelos import ModelCache, cache_key
+from mmm.ajuste import INICIOS_PADRAO, ajustar_mmm, carregar_historico
+from mmm.curvas import curvas_padrao
+
+
+# Definindo os canais e investimentos iniciais
+investimentos_iniciais = {
+    "Google Ads": 100,
+    "Meta Ads": 100,
+    "Out of Home": 50,
+    "Rádio": 75,
+    "TV Paga": 150,
+    "TV Aberta": 200,
+    "Influenciadores": 120
+}
+
+# Histórico semanal do MMM: uma coluna de gasto por canal (mil R$) e a coluna `acessos`. Sem o arquivo não há
+# ajuste: as abas usam as curvas padrão (mmm.curvas.PARAMETROS_PADRAO) e as identificam como demonstração
+HISTORICO_MMM = os.environ.get('MMM_HISTORICO', 'mmm_historico.csv')
+# Versão do ajuste; incrementar quando o modelo mudar para não reaproveitar ajustes antigos do cache
+VERSAO_AJUSTE = 1
+_cache_ajustes = ModelCache(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache',
+                                         'mmm_models'))
+
+
+# Modelo carregado por assinatura do histórico (caminho, tamanho, mtime; None sem arquivo)
+_modelos = {}
+
+
+# Ajuste do MMM no histórico, reaproveitado do cache (memória + disco) enquanto os dados não mudarem
+def ajustar_historico(path=None):
+    canais, gastos, kpi = carregar_historico(path or HISTORICO_MMM, 'acessos', list(investimentos_iniciais))
+    conteudo = hashlib.sha256(gastos.tobytes() + kpi.tobytes()).hexdigest()
+    chave = cache_key(conteudo, {'canais': canais, 'inicios': INICIOS_PADRAO}, version=f"mmm-ajuste-{VERSAO_AJUSTE}")
+    return _cache_ajustes.get_or_fit(chave, lambda: ajustar_mmm(gastos, kpi, canais))
+
+
+# (ajuste, curvas de resposta por canal) usados pelas abas. Com o histórico, o ajuste nele (mmm.ajuste.AjusteMMM)
+# e as curvas ajustadas; sem ele, ajuste None e as curvas padrão calibradas na alocação inicial. Calculado na
+# primeira chamada (não no import) e de novo só quando o arquivo do histórico muda
+def modelo_mmm():
+    assinatura = None
+    if os.path.exists(HISTORICO_MMM):
+        stat = os.stat(HISTORICO_MMM)
+        assinatura = (os.path.abspath(HISTORICO_MMM), stat.st_size, stat.st_mtime_ns)
+    if assinatura not in _modelos:
+        if assinatura is None:
+            modelo = (None, curvas_padrao(investimentos_iniciais))
+        else:
+            ajuste = ajustar_historico()
+            modelo = (ajuste, ajuste.curvas())
+        _modelos.clear()
+        _modelos[assinatura] = modelo
+    return _modelos[assinatura]
+
+
+# Legenda da origem das curvas, para as abas deixarem claro quando são só a demonstração
+def descricao_curvas(ajuste):
+    if ajuste is None:
+        return (f"Curvas padrão de demonstração: sem histórico do MMM ({HISTORICO_MMM}), os parâmetros não foram "
+                f"ajustados em dados")
+    return f"Curvas ajustadas em {len(ajuste.kpi)} semanas de histórico (R² {ajuste.r2:.2f}, MAPE {ajuste.mape:.1f}%)"
+
+# Função para calcular métricas com base nos investimentos
+def calcular_metricas(investimentos):
+    curvas_mmm = modelo_mmm()[1]
+    resultado = curvas_mmm.simular([investimentos[canal] for canal in curvas_mmm.canais])
+    return float(resultado["acessos"]), float(resultado["leads"]), float(resultado["vendas"])
+
+# Valores de referência para o cálculo das mudanças percentuais
+valor_base_acessos = 300
+valor_base_leads = 100
+valor_base_vendas = 10
+
+# Valor médio de uma venda (R$), usado no ROI
+valor_medio_venda = 150000
@@ -0,0 +1,66 @@
+# Aba MMM Media Behavior: curvas de resposta por canal e previsto vs. realizado
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from abas.mmm_comum import HISTORICO_MMM, descricao_curvas, modelo_mmm
+
+
+def renderizar():
+    st.header("Comportamento de Mídia")
+    ajuste_mmm, curvas_mmm = modelo_mmm()
+
+    # Inicialização da variável investimentos com valores padrão
+    investimentos = {
+        "Google Ads": 100,
+        "Meta Ads": 100,
+        "Out of Home": 50,
+        "Rádio": 75,
+        "TV Paga": 150,
+        "TV Aberta": 200,
+        "Influenciadores": 120
+    }
+
+    # Curva de resposta de mídia com ponto de investimento
+    st.subheader("Curva de Resposta de Mídia")
+    canal_selecionado = st.selectbox("Selecione o Canal de Mídia", options=list(investimentos.keys()))
+
+    # Curva de resposta do canal (adstock + saturação), avaliada de uma vez para toda a grade de investimentos
+    x = np.linspace(0, 500, 500)
+    y = curvas_mmm.curva_canal(canal_selecionado, x)
+    y_atual = curvas_mmm.curva_canal(canal_selecionado, [investimentos[canal_selecionado]])[0]
+
+    # Gráfico da curva de resposta com ponto de investimento destacado
+    fig_resposta = go.Figure()
+    fig_resposta.add_trace(go.Scatter(x=x, y=y, mode="lines", name="Curva de Resposta"))
+    fig_resposta.add_trace(go.Scatter(
+        x=[investimentos[canal_selecionado]],
+        y=[y_atual],
+        mode="markers", marker=dict(color="red", size=10), name="Investimento Atual"
+    ))
+    fig_resposta.update_layout(
+        title=f"Curva de Resposta para {canal_selecionado}",
+        xaxis_title="Investimento (mil R$)",
+        yaxis_title="Efeito (acessos)"
+    )
+    st.plotly_chart(fig_resposta)
+    st.caption(descricao_curvas(ajuste_mmm))
+
+    # KPI previsto pelo modelo ajustado vs. realizado, semana a semana no histórico usado no ajuste
+    st.subheader("Previsto vs. Realizado")
+    if ajuste_mmm is None:
+        st.info(f"Sem histórico do MMM: o previsto vs. realizado aparece quando {HISTORICO_MMM} (gasto semanal por "
+                f"canal e a coluna `acessos`) estiver disponível.")
+        return
+    datas = pd.date_range(end=pd.Timestamp.today().normalize(), periods=len(ajuste_mmm.kpi), freq="W")
+
+    fig_previsto_realizado = go.Figure()
+    fig_previsto_realizado.add_trace(go.Scatter(x=datas, y=ajuste_mmm.previsto, mode='lines', name='Acessos Previstos'))
+    fig_previsto_realizado.add_trace(go.Scatter(x=datas, y=ajuste_mmm.kpi, mode='lines+markers', name='Acessos Reais'))
+    fig_previsto_realizado.update_layout(
+        title=f"Acessos Previstos vs. Realizados (R² {ajuste_mmm.r2:.2f}, MAPE {ajuste_mmm.mape:.1f}%)",
+        xaxis_title="Semana",
+        yaxis_title="Acessos"
+    )
+    st.plotly_chart(fig_previsto_realizado)
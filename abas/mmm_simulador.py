@@ -0,0 +1,167 @@
+# Aba MMM SIMULADOR: simulação, otimização de orçamento e incerteza do Marketing Mix Modeling
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from abas.mmm_comum import (calcular_metricas, descricao_curvas, investimentos_iniciais, modelo_mmm,
+                            valor_base_acessos, valor_base_leads, valor_base_vendas, valor_medio_venda)
+from mmm.incerteza import bandas_quantis, simular_incerteza
+from mmm.otimizador import OtimizadorOrcamento, fronteira_eficiente
+from perfil import etapa
+
+
+def renderizar():
+    st.header("Simulador Marketing Mix Modeling")
+    ajuste_mmm, curvas_mmm = modelo_mmm()
+
+    # Bloco Inicial: KPIs Principais (preenchidos depois da leitura dos sliders, com a alocação atual)
+    st.subheader("Principais KPIs de Mídia")
+    col_kpi1, col_kpi2, col_kpi3, col_kpi4 = st.columns(4)
+
+    # Bloco 1: Alocação de Investimento por Canal
+    st.subheader("Alocação de Investimento por Canal")
+    col1, col2, col3 = st.columns(3)
+
+    investimentos = {}
+    with col1:
+        investimentos["Google Ads"] = st.slider("Google Ads (mil R$)", 0, 500, investimentos_iniciais["Google Ads"])
+        investimentos["Meta Ads"] = st.slider("Meta Ads (mil R$)", 0, 500, investimentos_iniciais["Meta Ads"])
+        investimentos["Out of Home"] = st.slider("Out of Home (mil R$)", 0, 500, investimentos_iniciais["Out of Home"])
+    with col2:
+        investimentos["Rádio"] = st.slider("Rádio (mil R$)", 0, 500, investimentos_iniciais["Rádio"])
+        investimentos["TV Paga"] = st.slider("TV Paga (mil R$)", 0, 500, investimentos_iniciais["TV Paga"])
+    with col3:
+        investimentos["TV Aberta"] = st.slider("TV Aberta (mil R$)", 0, 500, investimentos_iniciais["TV Aberta"])
+        investimentos["Influenciadores"] = st.slider("Influenciadores (mil R$)", 0, 500, investimentos_iniciais["Influenciadores"])
+
+    investimento_total = sum(investimentos.values())
+    rois = curvas_mmm.roi([investimentos[canal] for canal in curvas_mmm.canais], valor_medio_venda)
+    roi_geral, roi_online, roi_offline = (float(rois[chave]) for chave in ("roi_geral", "roi_online", "roi_offline"))
+
+    with col_kpi1:
+        st.metric(label="Investimento Total (mil R$)", value=f"{investimento_total:.0f}", delta="",
+                  delta_color="off")
+    with col_kpi2:
+        st.metric(label="ROI Geral de Marketing", value=f"{roi_geral:.1f}%", delta="",
+                  delta_color="off")
+    with col_kpi3:
+        st.metric(label="ROI Online", value=f"{roi_online:.1f}%", delta="",
+                  delta_color="off")
+    with col_kpi4:
+        st.metric(label="ROI Offline", value=f"{roi_offline:.1f}%", delta="",
+                  delta_color="off")
+
+    # Bloco 2: Simulação de Resultados
+    st.subheader("Simulação de Resultados")
+    acessos, leads, vendas = calcular_metricas(investimentos)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Acessos", f"{acessos:.0f}", f"{(acessos / valor_base_acessos - 1) * 100:.0f}%", delta_color="normal")
+    col2.metric("Leads", f"{leads:.0f}", f"{(leads / valor_base_leads - 1) * 100:.0f}%", delta_color="normal")
+    col3.metric("Vendas", f"{vendas:.0f}", f"{(vendas / valor_base_vendas - 1) * 100:.0f}%", delta_color="normal")
+
+    # Modo incerteza: Monte Carlo sobre os parâmetros das curvas e as taxas de conversão
+    if st.checkbox("Modo incerteza (Monte Carlo)"):
+        col1, col2 = st.columns(2)
+        with col1:
+            n_amostras = st.selectbox("Amostras", [10_000, 100_000, 1_000_000], index=1)
+        with col2:
+            semente = st.number_input("Semente", min_value=0, value=42, step=1)
+        with etapa("mmm:monte_carlo", amostras=n_amostras):
+            amostras = simular_incerteza(curvas_mmm, [investimentos[canal] for canal in curvas_mmm.canais],
+                                         n_amostras, seed=int(semente), valor_venda=valor_medio_venda)
+            bandas = bandas_quantis(amostras)
+        bandas.index = ["Acessos", "Leads", "Vendas", "ROI Geral (%)", "ROI Online (%)", "ROI Offline (%)"]
+        st.dataframe(bandas.style.format("{:.1f}"))
+
+        contagens, bordas = np.histogram(amostras["vendas"], bins=60)
+        fig_incerteza = go.Figure(go.Bar(x=(bordas[:-1] + bordas[1:]) / 2, y=contagens, marker=dict(color="red")))
+        for quantil in bandas.loc["Vendas"]:
+            fig_incerteza.add_vline(x=quantil, line_dash="dash")
+        fig_incerteza.update_layout(title="Distribuição das Vendas Simuladas (P5, P50, P95)",
+                                    xaxis_title="Vendas", yaxis_title="Amostras", bargap=0)
+        st.plotly_chart(fig_incerteza)
+
+    # Bloco 3: ROI MIX Marketing com mudança entre matriz e pesos, a partir das curvas ajustadas
+    st.subheader("ROI Mix Marketing")
+    st.caption(descricao_curvas(ajuste_mmm))
+    matriz_ou_pesos = st.radio("Selecione a visualização:", ("Matrix", "Pesos"))
+    alocacao_atual = np.array([investimentos[canal] for canal in curvas_mmm.canais], dtype=np.float64)
+
+    if matriz_ou_pesos == "Matrix":
+        participacao = alocacao_atual / max(alocacao_atual.sum(), 1e-9) * 100
+        roi_canais = curvas_mmm.roi_por_canal(alocacao_atual, valor_medio_venda)
+        fig_matrix = go.Figure()
+        fig_matrix.add_trace(go.Scatter(
+            x=participacao,
+            y=roi_canais,
+            mode='markers+text',
+            text=curvas_mmm.canais,
+            textposition="top center",
+            marker=dict(size=[v * 0.1 for v in alocacao_atual], color='red')
+        ))
+        fig_matrix.update_layout(title="Distribuição de ROI por Canal", xaxis_title="Investimento (%)", yaxis_title="ROI (%)")
+        st.plotly_chart(fig_matrix)
+
+    else:
+        contribuicoes = curvas_mmm.resposta_por_canal(alocacao_atual)
+        fig_pesos = go.Figure(go.Bar(
+            x=contribuicoes / max(contribuicoes.sum(), 1e-9) * 100,
+            y=curvas_mmm.canais,
+            orientation='h',
+            marker=dict(color="red")
+        ))
+        fig_pesos.update_layout(title="Pesos dos Canais de Mídia", xaxis_title="Participação nos acessos de mídia (%)")
+        st.plotly_chart(fig_pesos)
+
+    # Bloco 4: Otimização do orçamento entre os canais (equalização do retorno marginal nas curvas de resposta)
+    st.subheader("Otimização de Orçamento")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        orcamento_total = st.number_input("Orçamento total (mil R$)", min_value=0, max_value=500 * len(investimentos),
+                                          value=int(sum(investimentos.values())), step=10)
+    with col2:
+        limite_minimo, limite_maximo = st.slider("Limites por canal (mil R$)", 0, 500, (0, 500))
+    with col3:
+        objetivo = st.radio("Objetivo", ("Vendas", "Lucro"))
+        valor_venda = None
+        if objetivo == "Lucro":
+            valor_venda = st.number_input("Valor médio por venda (R$)", min_value=1000, value=valor_medio_venda, step=1000)
+
+    otimizador = OtimizadorOrcamento(curvas_mmm)
+    canais = curvas_mmm.canais
+    if not limite_minimo * len(canais) <= orcamento_total <= limite_maximo * len(canais):
+        st.warning("O orçamento total não cabe nos limites por canal escolhidos.")
+    else:
+        with etapa("mmm:otimizacao"):
+            alocacao_otima = otimizador.alocar([orcamento_total], limite_minimo, limite_maximo, valor_venda)[0]
+        _, _, vendas_otimas = calcular_metricas(dict(zip(canais, alocacao_otima)))
+
+        col1, col2 = st.columns(2)
+        col1.metric("Vendas com alocação otimizada", f"{vendas_otimas:.1f}",
+                    f"{(vendas_otimas / vendas - 1) * 100:.1f}% vs. alocação atual", delta_color="normal")
+        col2.metric("Investimento otimizado (mil R$)", f"{alocacao_otima.sum():.0f}",
+                    f"{alocacao_otima.sum() - sum(investimentos.values()):.0f} vs. alocação atual", delta_color="off")
+
+        fig_otimizacao = go.Figure()
+        fig_otimizacao.add_trace(go.Bar(x=canais, y=[investimentos[canal] for canal in canais], name="Atual"))
+        fig_otimizacao.add_trace(go.Bar(x=canais, y=alocacao_otima, name="Otimizada", marker=dict(color="red")))
+        fig_otimizacao.update_layout(title="Alocação Atual vs. Otimizada", barmode="group",
+                                     yaxis_title="Investimento (mil R$)")
+        st.plotly_chart(fig_otimizacao)
+
+        # Fronteira eficiente: melhor resultado possível para cada nível de orçamento, numa única chamada
+        totais = np.linspace(limite_minimo * len(canais), limite_maximo * len(canais), 60)
+        with etapa("mmm:fronteira", orcamentos=len(totais)):
+            alocacoes_fronteira, resultados_fronteira = fronteira_eficiente(curvas_mmm, totais, limite_minimo,
+                                                                            limite_maximo, valor_venda)
+        fig_fronteira = go.Figure()
+        fig_fronteira.add_trace(go.Scatter(x=alocacoes_fronteira.sum(axis=1), y=resultados_fronteira["vendas"],
+                                           mode="lines", name="Fronteira Eficiente"))
+        fig_fronteira.add_trace(go.Scatter(x=[sum(investimentos.values())], y=[vendas], mode="markers",
+                                           marker=dict(size=10), name="Alocação Atual"))
+        fig_fronteira.add_trace(go.Scatter(x=[alocacao_otima.sum()], y=[vendas_otimas], mode="markers",
+                                           marker=dict(color="red", size=10), name="Alocação Otimizada"))
+        fig_fronteira.update_layout(title="Fronteira Eficiente de Investimento",
+                                    xaxis_title="Investimento total (mil R$)", yaxis_title="Vendas")
+        st.plotly_chart(fig_fronteira)
@@ -0,0 +1,74 @@
+# Aba MMX: Satisfação e Modelo de Equação Estrutural
+import plotly.graph_objects as go
+import streamlit as st
+
+
+def renderizar():
+    st.header("QUAIS AS ALAVANCAS DE LEALDADE E MONETIZAÇÃO NO SEU MERCADO?")
+
+    # Bloco de métricas gerais de satisfação
+    st.subheader("Métricas Gerais de Satisfação")
+    col1, col2, col3, col4, col5 = st.columns(5)
+
+    # Valores fictícios para os scores de satisfação
+    satisfacao = 88
+    nps = 72
+    score_qualidade = 85
+    score_facilidade = 78
+    score_valor = 82
+
+    # Exibindo as métricas principais em blocos
+    with col1:
+        st.metric(label="Satisfação", value=f"{satisfacao}%")
+    with col2:
+        st.metric(label="NPS", value=f"{nps}")
+    with col3:
+        st.metric(label="Qualidade", value=f"{score_qualidade}")
+    with col4:
+        st.metric(label="Facilidade", value=f"{score_facilidade}")
+    with col5:
+        st.metric(label="Valor", value=f"{score_valor}")
+
+    # Bloco de evolução das métricas em ondas
+    st.subheader("Evolução das Métricas por Onda")
+    ondas = ["Onda 1", "Onda 2", "Onda 3"]
+    evolucao_qualidade = [80, 83, 85]
+    evolucao_facilidade = [75, 76, 78]
+    evolucao_valor = [78, 80, 82]
+
+    fig_evolucao = go.Figure()
+    fig_evolucao.add_trace(go.Scatter(x=ondas, y=evolucao_qualidade, mode="lines+markers", name="Qualidade", line=dict(color="red")))
+    fig_evolucao.add_trace(go.Scatter(x=ondas, y=evolucao_facilidade, mode="lines+markers", name="Facilidade", line=dict(color="blue")))
+    fig_evolucao.add_trace(go.Scatter(x=ondas, y=evolucao_valor, mode="lines+markers", name="Valor", line=dict(color="yellow")))
+    fig_evolucao.update_layout(title="Evolução das Métricas por Onda", xaxis_title="Onda", yaxis_title="Pontuação")
+    st.plotly_chart(fig_evolucao)
+
+    # Bloco de prioridades e retorno
+    st.subheader("Prioridades e Retorno")
+
+    col1, col2 = st.columns(2)
+
+    # Matriz de performance e importância dos fatores
+    with col1:
+        st.write("Matriz de Performance vs. Importância dos Fatores")
+        fatores = ["Atendimento", "Disponibilidade", "Personalização", "Interfaces", "Processos", "Omnichannel", "Custo Benefício", "Competitividade", "Benefícios"]
+        performance = [0.6, 0.8, 0.75, 0.9, 0.7, 0.85, 0.65, 0.6, 0.8]
+        importancia = [0.7, 0.85, 0.9, 0.75, 0.8, 0.7, 0.9, 0.65, 0.8]
+        fig_matriz = go.Figure()
+        fig_matriz.add_trace(go.Scatter(
+            x=performance, y=importancia, mode='markers+text', text=fatores, textposition="top center",
+            marker=dict(size=12, color="purple")
+        ))
+        fig_matriz.update_layout(title="Performance vs. Importância", xaxis_title="Performance", yaxis_title="Importância")
+        st.plotly_chart(fig_matriz)
+
+    # Gráfico de R-quadrado dos constructos para resultados específicos
+    with col2:
+        st.write("Impacto da Satisfação em Resultados Estratégicos")
+        resultados = ["Abertura de Conta", "Uso do App", "Crédito", "Investimentos"]
+        r_quadrado = [0.8, 0.65, 0.7, 0.6]
+        fig_rquadrado = go.Figure(go.Bar(
+            x=r_quadrado, y=resultados, orientation='h', marker=dict(color="green")
+        ))
+        fig_rquadrado.update_layout(title="R² da Satisfação por Resultado", xaxis_title="Impacto (R²)", yaxis_title="Resultados")
+        st.plotly_chart(fig_rquadrado)
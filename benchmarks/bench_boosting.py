@@ -0,0 +1,67 @@
+# Benchmark dos backends de LTV do FLAG: GLMs Gamma por cluster vs. gradient boosting (flag.boosting).
+# MAE e acurácia (1 - WAPE) num holdout de 20% do dataset do app; tempo de treino do pipeline e vazão do
+# scoring (`predict_conversion_values` num df_novo já transformado) em clientes do gerador sintético
+# (flag.synthetic) ajustado no mesmo dataset.
+#
+# Uso: python benchmarks/bench_boosting.py [--sizes 100000 1000000] [--repeat 3]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flag.ingest import add_encodings, load_dataset
+from flag.pipeline import LTV_BACKENDS, fit_pipeline, transform
+from flag.scoring import ltv_models, predict_conversion_values
+from flag.synthetic import fit_generator
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'digital_wallet_ltv_dataset.csv')
+
+
+def holdout(df, backend, fracao_teste=0.2, seed=42):
+    teste = np.random.default_rng(seed).random(len(df)) < fracao_teste
+    artefatos = fit_pipeline(df[~teste], ltv_backend=backend)
+    y = df['LTV'].to_numpy(dtype=np.float64)[teste]
+    previsto = predict_conversion_values(transform(df[teste], artefatos), ltv_models(artefatos))
+    return np.abs(previsto - y).mean(), 1 - np.abs(previsto - y).sum() / y.sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark GLM vs. gradient boosting no LTV do FLAG')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--backends', nargs='+', choices=LTV_BACKENDS, default=list(LTV_BACKENDS))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = load_dataset(DATASET)
+    print(f"Holdout de 20% ({len(df):,} clientes)")
+    print(f"{'backend':>8} {'MAE':>10} {'acurácia':>9}")
+    for backend in args.backends:
+        mae, acuracia = holdout(df, backend)
+        print(f"{backend:>8} {mae:10,.0f} {acuracia:9.2%}")
+
+    gerador = fit_generator(df)
+    print(f"\n{'linhas':>10} {'backend':>8} {'treino s':>9} {'scoring s':>9} {'linhas/s':>12} {'árvores':>8}")
+    for n in args.sizes:
+        clientes = add_encodings(gerador.sample(n, 0))
+        for backend in args.backends:
+            inicio = time.perf_counter()
+            artefatos = fit_pipeline(clientes, ltv_backend=backend)
+            treino = time.perf_counter() - inicio
+            df_novo = transform(clientes, artefatos)
+            modelos = ltv_models(artefatos)
+            tempos = []
+            for _ in range(args.repeat):
+                inicio = time.perf_counter()
+                predict_conversion_values(df_novo, modelos)
+                tempos.append(time.perf_counter() - inicio)
+            scoring = min(tempos)
+            arvores = artefatos['boosted_model'].best_iteration + 1 if backend != 'glm' else '-'
+            print(f"{n:10,} {backend:>8} {treino:9.2f} {scoring:9.3f} {n / scoring:12,.0f} {arvores:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# Benchmark dos backends de clustering do FLAG: KMeans completo vs. mini-batch vs. warm start / fold-in
+#
+# Uso: python benchmarks/bench_clustering.py [--sizes 70000 700000]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flag.clustering import align_to_reference, cluster_counts, fit_clusters, fold_in
+from flag.ingest import load_dataset
+from flag.pipeline import encode_features, fit_payment_scores, model_features
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'digital_wallet_ltv_dataset.csv')
+
+
+# Matriz de features do KMeans ampliada para `n_linhas`, com um ruído pequeno para não repetir pontos
+def features_ampliadas(n_linhas, seed=0):
+    df = load_dataset(DATASET)
+    base = model_features(encode_features(df, fit_payment_scores(df))).to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(base), n_linhas)
+    return base[idx] * rng.normal(1.0, 0.01, (n_linhas, base.shape[1]))
+
+
+# Fração de clientes no mesmo cluster que o KMeans completo, depois de alinhar os ids pelos centróides
+def concordancia(labels, centers, labels_ref, centers_ref):
+    permutacao = align_to_reference(centers, centers_ref)
+    return np.mean(permutacao[labels] == labels_ref)
+
+
+def medir(func):
+    inicio = time.perf_counter()
+    resultado = func()
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos backends de clustering do FLAG')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[70_000, 700_000])
+    parser.add_argument('--new-fraction', type=float, default=0.1,
+                        help='fração de clientes novos incorporados via fold-in')
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        X = features_ampliadas(n)
+        n_novos = int(n * args.new_fraction)
+        antigos, novos = X[:-n_novos], X[-n_novos:]
+        print(f"{n:>10,} clientes ({n_novos:,} novos)")
+
+        t_full, (ref, labels_ref) = medir(lambda: fit_clusters(X, 'kmeans'))
+        print(f"  kmeans completo           {t_full:7.2f}s  concordância 1.000")
+
+        t_mb, (mb, labels_mb) = medir(lambda: fit_clusters(X, 'minibatch'))
+        print(f"  mini-batch                {t_mb:7.2f}s  concordância "
+              f"{concordancia(labels_mb, mb.cluster_centers_, labels_ref, ref.cluster_centers_):.3f}")
+
+        # Cenário incremental: modelo dos clientes antigos + novos clientes chegando
+        base_model, labels_base = fit_clusters(antigos, 'kmeans')
+        t_warm, (warm, labels_warm) = medir(lambda: fit_clusters(
+            X, 'kmeans', init_centers=base_model.cluster_centers_, reference_centers=base_model.cluster_centers_))
+        print(f"  kmeans warm start         {t_warm:7.2f}s  concordância "
+              f"{concordancia(labels_warm, warm.cluster_centers_, labels_ref, ref.cluster_centers_):.3f}")
+
+        counts = cluster_counts(labels_base, len(base_model.cluster_centers_))
+        t_fold, (folded, _, _) = medir(lambda: fold_in(base_model, counts, novos))
+        labels_fold = folded.predict(X)
+        print(f"  fold-in dos novos         {t_fold:7.2f}s  concordância "
+              f"{concordancia(labels_fold, folded.cluster_centers_, labels_ref, ref.cluster_centers_):.3f}")
+
+
+if __name__ == '__main__':
+    main()
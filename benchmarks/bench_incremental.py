@@ -0,0 +1,88 @@
+# Benchmark do rescoring incremental do FLAG contra o rescoring completo: um snapshot sintético é pontuado,
+# uma fração dos clientes muda (features alteradas, clientes novos e removidos) e o snapshot seguinte é
+# pontuado das duas formas. Mede a mesma ordem de exportação e a ordem embaralhada, e confere os resultados
+#
+# Uso: python benchmarks/bench_incremental.py [--rows 1000000] [--churn 0.001 0.01 0.1] [--repeat 3]
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flag.incremental import refresh_scores
+from flag.streaming import DEFAULT_TRAIN_PATH, fit_on_sample, score_file
+from flag.ingest import load_dataset
+from flag.synthetic import fit_generator, write_synthetic
+
+
+# Próximo snapshot: `churn` dos clientes com Total_Spent alterado, metade disso de novos no fim e de removidos
+def proximo_snapshot(df, churn, seed=1):
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    n = int(len(df) * churn)
+    df.loc[rng.choice(len(df), n, replace=False), 'Total_Spent'] *= 1.1
+    novos = df.iloc[:n // 2].copy()
+    novos['Customer_ID'] = 'N' + novos['Customer_ID'].astype(str)
+    removidos = rng.choice(len(df), n // 2, replace=False)
+    return pd.concat([df.drop(index=removidos), novos], ignore_index=True)
+
+
+def medir(func, repeat):
+    melhor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        resultado = func()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do rescoring incremental do FLAG')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--churn', type=float, nargs='+', default=[0.001, 0.01, 0.1])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    artefatos, chave = fit_on_sample(DEFAULT_TRAIN_PATH, 500_000)
+    diretorio = tempfile.mkdtemp(prefix='flag-incremental-')
+    try:
+        anterior = os.path.join(diretorio, 'anterior.parquet')
+        write_synthetic(anterior, args.rows, fit_generator(load_dataset(DEFAULT_TRAIN_PATH)))
+        base = pd.read_parquet(anterior)
+        estado = os.path.join(diretorio, 'estado.parquet')
+        inicial = os.path.join(diretorio, 'inicial.parquet')
+        refresh_scores(anterior, inicial, artefatos, chave)
+
+        for churn in args.churn:
+            proximo = proximo_snapshot(base, churn)
+            for ordem, snapshot in (('mesma ordem', proximo), ('embaralhado', proximo.sample(frac=1, random_state=0))):
+                caminho = os.path.join(diretorio, 'snapshot.parquet')
+                snapshot.to_parquet(caminho, index=False)
+                completo = os.path.join(diretorio, 'completo.parquet')
+                t_completo, _ = medir(lambda: score_file(caminho, completo, artefatos), args.repeat)
+
+                def incremental():
+                    shutil.copyfile(inicial, estado)
+                    inicio = time.perf_counter()
+                    stats = refresh_scores(caminho, estado, artefatos, chave)
+                    return time.perf_counter() - inicio, stats
+
+                t_incremental, stats = min((incremental() for _ in range(args.repeat)), key=lambda r: r[0])
+                a, b = pd.read_parquet(estado), pd.read_parquet(completo)
+                assert (a['Customer_ID'].to_numpy() == b['Customer_ID'].to_numpy()).all()
+                diferenca = np.max(np.abs(a['conversion_value'] - b['conversion_value']) / b['conversion_value'])
+                repontuados = stats['new'] + stats['changed']
+                print(f"churn {churn:6.1%} {ordem:<12} repontuados {repontuados:>9,}  completo {t_completo:6.2f}s  "
+                      f"incremental {t_incremental:6.2f}s  dif. máxima {diferenca:.1e}")
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# Benchmark do ingest do FLAG: pd.read_csv + .map vs. cache Parquet tipado (flag.ingest)
+#
+# Uso: python benchmarks/bench_ingest.py [--rows 7000 1000000]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flag.ingest import APP_USAGE_MAP, INCOME_LEVEL_MAP, LOCATION_MAP, load_dataset
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'digital_wallet_ltv_dataset.csv')
+
+
+# Caminho antigo do app: texto -> tipos inferidos -> encodings por string
+def leitura_antiga(path):
+    df = pd.read_csv(path)
+    df['app_usage_numerico'] = df['App_Usage_Frequency'].map(APP_USAGE_MAP)
+    df['income_level_numerico'] = df['Income_Level'].map(INCOME_LEVEL_MAP)
+    df['location_numerico'] = df['Location'].map(LOCATION_MAP)
+    return df
+
+
+# Gera um CSV com `n_linhas` repetindo o dataset original
+def csv_ampliado(n_linhas, diretorio):
+    base = pd.read_csv(DATASET)
+    if n_linhas == len(base):
+        return DATASET
+    path = os.path.join(diretorio, f"ltv_{n_linhas}.csv")
+    repeticoes = -(-n_linhas // len(base))
+    pd.concat([base] * repeticoes, ignore_index=True).iloc[:n_linhas].to_csv(path, index=False)
+    return path
+
+
+def medir(func):
+    inicio = time.perf_counter()
+    resultado = func()
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do ingest tipado do FLAG')
+    parser.add_argument('--rows', type=int, nargs='+', default=[7_000, 1_000_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, 'ingest')
+        for n in args.rows:
+            path = csv_ampliado(n, tmp)
+
+            t_csv, antigo = medir(lambda: leitura_antiga(path))
+            mem_antiga = antigo.memory_usage(deep=True).sum() / 1e6
+            del antigo
+
+            t_build, _ = medir(lambda: load_dataset(path, cache_dir=cache_dir))
+            t_parquet, novo = medir(lambda: load_dataset(path, cache_dir=cache_dir))
+            mem_nova = novo.memory_usage(deep=True).sum() / 1e6
+            del novo
+
+            print(f"{n:>10,} linhas")
+            print(f"  read_csv + map        {t_csv:7.3f}s  {mem_antiga:9.1f} MB")
+            print(f"  1ª carga (gera cache) {t_build:7.3f}s")
+            print(f"  cache Parquet tipado  {t_parquet:7.3f}s  {mem_nova:9.1f} MB")
+            print(f"  speedup {t_csv / t_parquet:.1f}x, memória {mem_antiga / mem_nova:.1f}x menor")
+
+
+if __name__ == '__main__':
+    main()
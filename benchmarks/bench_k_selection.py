@@ -0,0 +1,45 @@
+# Benchmark da escolha automática de k do FLAG (flag.k_selection) em tabelas grandes: tempo de parede de
+# `select_k_frame` por tamanho (primeiras N linhas do arquivo), comparado a um orçamento fixo, e a conferência
+# de que o k e as métricas não mudam com o número de processos. O custo deve ficar estável com o tamanho, já
+# que as amostras do clustering e da silhueta têm tamanho fixo.
+#
+# Uso: python benchmarks/bench_k_selection.py clientes.parquet [--rows 1000000 10000000] [--budget 60]
+#                                            [--processes 1 4]
+#      (o arquivo pode ser gerado com `python -m flag.synthetic clientes.parquet --rows 10000000`)
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_memory import carregar
+from flag.k_selection import select_k_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da escolha automática de k do FLAG')
+    parser.add_argument('path', help='arquivo de clientes com LTV (CSV ou Parquet)')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--budget', type=float, default=60.0, help='orçamento de tempo por seleção (s)')
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    print(f"{'linhas':>11} {'processos':>9} {'segundos':>9} {'k':>3} {'cotovelo':>8} {'orçamento':>9} {'igual':>6}")
+    for rows in args.rows:
+        df = carregar(args.path, rows)
+        referencia = None
+        for processes in dict.fromkeys(args.processes):
+            inicio = time.perf_counter()
+            selecao = select_k_frame(df, processes=processes)
+            segundos = time.perf_counter() - inicio
+            metricas = selecao['scores'].drop(columns='seconds')
+            igual = referencia is None or metricas.equals(referencia)
+            referencia = metricas if referencia is None else referencia
+            print(f"{len(df):11,} {processes:9d} {segundos:9.1f} {selecao['k']:3d} {selecao['elbow_k']:8d} "
+                  f"{'ok' if segundos <= args.budget else 'estourou':>9} {str(igual):>6}")
+        del df
+
+
+if __name__ == '__main__':
+    main()
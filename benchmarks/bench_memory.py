@@ -0,0 +1,107 @@
+# Perfil de memória do FLAG: pico de RSS do treino (fit_pipeline) e do scoring (transform + previsões) sobre
+# um arquivo de clientes, comparado ao tamanho dos dados crus carregados. Uma thread amostra o RSS do processo
+# e cada amostra é atribuída às etapas do perfil (perfil.etapa) abertas naquele instante.
+#
+# Uso: python benchmarks/bench_memory.py clientes.parquet [--rows 3000000] [--intervalo 0.005]
+#      (o arquivo pode ser gerado com `python -m flag.synthetic clientes.parquet --rows 10000000`)
+import argparse
+import os
+import sys
+import threading
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flag.ingest import add_encodings, iter_dataset
+from flag.pipeline import DEFAULT_HYPERPARAMETERS, fit_pipeline, transform
+from flag.scoring import predict_conversion_values
+from perfil import etapa, execucao
+
+PAGINA = os.sysconf('SC_PAGE_SIZE')
+
+
+def rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * PAGINA
+
+
+# Amostra o RSS em segundo plano: lista de (instante perf_counter, bytes)
+class AmostradorRSS(threading.Thread):
+    def __init__(self, intervalo):
+        super().__init__(daemon=True)
+        self.intervalo = intervalo
+        self.amostras = []
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.is_set():
+            self.amostras.append((time.perf_counter(), rss()))
+            self._parar.wait(self.intervalo)
+
+    def parar(self):
+        self._parar.set()
+        self.join()
+        self.amostras.append((time.perf_counter(), rss()))
+
+
+# Primeiras `rows` linhas do arquivo (todas com None), com os tipos e encodings de flag.ingest. A memória
+# que o pyarrow reservou na leitura volta para o sistema antes das medições
+def carregar(path, rows=None):
+    import pandas as pd
+    import pyarrow as pa
+
+    blocos = []
+    total = 0
+    for bloco in iter_dataset(path):
+        blocos.append(bloco.iloc[:None if rows is None else rows - total])
+        total += len(blocos[-1])
+        if rows is not None and total >= rows:
+            break
+    df = add_encodings(pd.concat(blocos, ignore_index=True))
+    del blocos
+    pa.default_memory_pool().release_unused()
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pico de memória do treino e do scoring do FLAG')
+    parser.add_argument('input', help='arquivo de clientes (Parquet)')
+    parser.add_argument('--rows', type=int, help='usa só as primeiras linhas do arquivo')
+    parser.add_argument('--intervalo', type=float, default=0.005, help='segundos entre amostras de RSS')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    inicial = rss()
+    df = carregar(args.input, args.rows)
+    carregado = rss()
+    dados = df.memory_usage(deep=True).sum()
+    print(f"{len(df):,} clientes; DataFrame: {dados / 2 ** 20:,.0f} MB (RSS depois da carga: "
+          f"{carregado / 2 ** 20:,.0f} MB)")
+
+    amostrador = AmostradorRSS(args.intervalo)
+    amostrador.start()
+    with execucao('bench_memory', memoria=False) as ex:
+        with etapa('flag:treino'):
+            artefatos = fit_pipeline(df, **DEFAULT_HYPERPARAMETERS)
+        with etapa('flag:scoring'):
+            df_novo = transform(df, artefatos)
+            predict_conversion_values(df_novo, artefatos['glm_models'])
+            del df_novo
+    amostrador.parar()
+
+    base = carregado
+    print(f"{'etapa':<28} {'segundos':>9} {'pico RSS':>10} {'acima dos dados':>16}")
+    for registro in sorted(ex.etapas, key=lambda r: r['inicio_s']):
+        inicio = ex.inicio + registro['inicio_s']
+        fim = inicio + registro['wall_s']
+        pico = max((valor for instante, valor in amostrador.amostras if inicio <= instante <= fim), default=rss())
+        nome = '  ' * registro['profundidade'] + registro['nome']
+        print(f"{nome:<28} {registro['wall_s']:9.2f} {pico / 2 ** 20:8,.0f}MB {(pico - base) / 2 ** 20:14,.0f}MB")
+    pico = max(valor for _, valor in amostrador.amostras)
+    print(f"pico total {pico / 2 ** 20:,.0f} MB; acima do RSS inicial: {(pico - inicial) / 2 ** 20:,.0f} MB "
+          f"= {(pico - inicial) / dados:.1f}x o DataFrame")
+
+
+if __name__ == '__main__':
+    main()
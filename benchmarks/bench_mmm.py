@@ -0,0 +1,109 @@
+# Micro-benchmarks do motor de curvas de resposta do MMM (mmm.curvas), do otimizador de orçamento
+# (mmm.otimizador), do Monte Carlo de incerteza (mmm.incerteza) e do ajuste no histórico (mmm.ajuste)
+#
+# Uso: python benchmarks/bench_mmm.py [--scenarios 1 1000 10000 100000] [--budgets 1 100 1000]
+#                                     [--draws 10000 100000 1000000] [--fits 7x156 24x300 48x300] [--repeat 5]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from mmm.ajuste import ajustar_mmm, historico_sintetico
+from mmm.curvas import CurvasResposta, adstock, curvas_padrao, hill, pesos_geometricos, pesos_weibull
+from mmm.incerteza import simular_incerteza
+from mmm.otimizador import OtimizadorOrcamento
+
+INVESTIMENTOS_INICIAIS = {
+    "Google Ads": 100,
+    "Meta Ads": 100,
+    "Out of Home": 50,
+    "Rádio": 75,
+    "TV Paga": 150,
+    "TV Aberta": 200,
+    "Influenciadores": 120
+}
+
+
+def medir(func, repeat):
+    tempos = []
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+# Curvas sorteadas para `n_canais` canais (um em cada três com adstock Weibull) e o histórico gerado por elas
+def problema_sintetico(n_canais, semanas, seed=0):
+    rng = np.random.default_rng(seed)
+    canais = [f"canal_{i}" for i in range(n_canais)]
+    tipos = ['weibull' if i % 3 == 0 else 'geometrico' for i in range(n_canais)]
+    pesos = np.vstack([pesos_weibull(rng.uniform(1.0, 2.5), rng.uniform(1.5, 3.0)) if tipo == 'weibull'
+                       else pesos_geometricos(rng.uniform(0.1, 0.6)) for tipo in tipos])
+    curvas = CurvasResposta(canais, pesos, rng.uniform(2, 20, n_canais), rng.uniform(5, 20, n_canais),
+                            rng.uniform(0.8, 2.0, n_canais))
+    gastos, kpi = historico_sintetico(curvas, dict(zip(canais, rng.uniform(50, 200, n_canais))), semanas,
+                                      base_semanal=20.0, seed=seed)
+    return canais, dict(zip(canais, tipos)), gastos, kpi
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks do motor de curvas de resposta do MMM')
+    parser.add_argument('--scenarios', type=int, nargs='+', default=[1, 1_000, 10_000, 100_000])
+    parser.add_argument('--budgets', type=int, nargs='+', default=[1, 100, 1_000],
+                        help='quantidade de orçamentos totais otimizados numa única chamada (fronteira eficiente)')
+    parser.add_argument('--draws', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='amostras do Monte Carlo de incerteza')
+    parser.add_argument('--fits', nargs='+', default=['7x156', '24x300', '48x300'],
+                        help='ajustes do MMM no formato CANAISxSEMANAS')
+    parser.add_argument('--processos', type=int, help='processos do multi-start do ajuste (padrão: CPUs)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    curvas = curvas_padrao(INVESTIMENTOS_INICIAIS)
+    rng = np.random.default_rng(0)
+    n_canais = len(curvas.canais)
+
+    print(f"{'componente':<12} {'cenários':>10} {'tempo':>10} {'cenários/s':>14}")
+    for n in args.scenarios:
+        orcamentos = rng.uniform(0, 500, (n, n_canais))
+        gastos = np.ascontiguousarray(curvas.gastos_uniformes(orcamentos))
+
+        t_adstock = medir(lambda: adstock(gastos, curvas.pesos), args.repeat)
+        t_hill = medir(lambda: hill(gastos, curvas.meia_saturacao[:, None], curvas.inclinacao[:, None]), args.repeat)
+        t_simular = medir(lambda: curvas.simular(orcamentos), args.repeat)
+
+        for nome, t in [('adstock', t_adstock), ('hill', t_hill), ('simular', t_simular)]:
+            print(f"{nome:<12} {n:>10,} {t * 1000:>8.2f}ms {n / t:>14,.0f}")
+
+    otimizador = OtimizadorOrcamento(curvas)
+    print()
+    print(f"{'otimizador':<12} {'orçamentos':>10} {'tempo':>10} {'orçamentos/s':>14}")
+    for n in args.budgets:
+        totais = np.linspace(100, 3000, n)
+        t = medir(lambda: otimizador.alocar(totais, 0, 500), args.repeat)
+        print(f"{'alocar':<12} {n:>10,} {t * 1000:>8.2f}ms {n / t:>14,.0f}")
+
+    alocacao = list(INVESTIMENTOS_INICIAIS.values())
+    print()
+    print(f"{'monte carlo':<12} {'amostras':>10} {'tempo':>10} {'amostras/s':>14}")
+    for n in args.draws:
+        t = medir(lambda: simular_incerteza(curvas, alocacao, n, seed=0, valor_venda=150000), args.repeat)
+        print(f"{'incerteza':<12} {n:>10,} {t * 1000:>8.2f}ms {n / t:>14,.0f}")
+
+    print()
+    print(f"{'ajuste':<12} {'canais':>7} {'semanas':>8} {'tempo':>9} {'R²':>6} {'iterações':>10}")
+    for formato in args.fits:
+        n_canais, semanas = (int(v) for v in formato.lower().split('x'))
+        canais, tipos, gastos, kpi = problema_sintetico(n_canais, semanas)
+        ajuste = ajustar_mmm(gastos, kpi, canais, tipos, processos=args.processos)
+        print(f"{'ajustar_mmm':<12} {n_canais:>7} {semanas:>8} {ajuste.segundos:>8.2f}s {ajuste.r2:>6.3f} "
+              f"{ajuste.iteracoes:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# Benchmark da projeção PCA do FLAG (flag.projection) em tabelas grandes: tempo de parede e pico de memória
+# (tracemalloc, alocações do NumPy incluídas) de ajuste + aplicação em blocos para cada solver, sobre a matriz
+# de features já montada, contra o caminho anterior (`PCA(n_components=2).fit_transform`). A linha 'stream'
+# aprende os componentes lendo o arquivo em blocos (flag.projection.fit_projection_stream), sem a matriz
+# inteira na memória; a diferença máxima dos componentes para o solver exato vai na última coluna. O solver
+# 'randomized' centraliza uma cópia da matriz e chega a ~3x o tamanho dela: em 10M de linhas precisa de mais
+# de 5 GB (use --solvers exact incremental em máquinas menores).
+#
+# Uso: python benchmarks/bench_projection.py clientes.parquet [--rows 1000000 10000000]
+#                                            [--solvers exact randomized incremental] [--sample-fraction 0.1]
+#      (o arquivo pode ser gerado com `python -m flag.synthetic clientes.parquet --rows 10000000`)
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_memory import carregar
+from flag.pipeline import encode_features, feature_columns, feature_matrix, fit_payment_scores
+from flag.projection import SOLVERS, fit_projection, fit_projection_stream, project
+
+
+# (segundos, pico em MB, resultado) de `funcao()`
+def medir(funcao):
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    segundos = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return segundos, pico, resultado
+
+
+def anterior(features):
+    from sklearn.decomposition import PCA
+
+    pca = PCA(n_components=2)
+    return pca, pca.fit_transform(features)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos solvers da projeção PCA do FLAG')
+    parser.add_argument('path', help='arquivo de clientes com LTV (CSV ou Parquet)')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--solvers', nargs='+', choices=SOLVERS, default=list(SOLVERS))
+    parser.add_argument('--sample-fraction', type=float, default=0.1, help='amostra da linha stream-amostra')
+    args = parser.parse_args()
+
+    print(f"{'linhas':>11} {'modo':>16} {'segundos':>9} {'pico MB':>9} {'matriz MB':>9} {'dif. componentes':>16}")
+    for rows in args.rows:
+        df = carregar(args.path, rows)
+        payment_scores = fit_payment_scores(df)
+        df_novo = encode_features(df, payment_scores)
+        colunas = feature_columns(df_novo)
+        features = feature_matrix(df_novo, colunas)
+        del df, df_novo
+        matriz_mb = features.nbytes / 2 ** 20
+
+        segundos, pico, (exato, _) = medir(lambda: anterior(features))
+        print(f"{rows:11,} {'anterior':>16} {segundos:9.2f} {pico:9.0f} {matriz_mb:9.0f} {0.0:16.1e}")
+        for solver in args.solvers:
+            segundos, pico, (pca, _) = medir(lambda: (p := fit_projection(features, solver), project(p, features)))
+            diferenca = np.abs(pca.components_ - exato.components_).max()
+            print(f"{rows:11,} {solver:>16} {segundos:9.2f} {pico:9.0f} {matriz_mb:9.0f} {diferenca:16.1e}")
+        del features
+        gc.collect()
+
+        # Componentes aprendidos lendo o arquivo em blocos: a matriz inteira nunca existe
+        for nome, fracao in (('stream', 1.0), ('stream-amostra', args.sample_fraction)):
+            segundos, pico, (pca, _) = medir(
+                lambda: fit_projection_stream(args.path, payment_scores, colunas, sample_fraction=fracao,
+                                              max_rows=rows))
+            diferenca = np.abs(pca.components_ - exato.components_).max()
+            print(f"{rows:11,} {nome:>16} {segundos:9.2f} {pico:9.0f} {'-':>9} {diferenca:16.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# Benchmark do scoring vetorizado do FLAG (apply_predictions) em 7k, 700k e 7M linhas
+#
+# Uso: python benchmarks/bench_scoring.py [--sizes 7000 700000 7000000] [--repeat 3]
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flag.scoring import GLM_FEATURES, predict_conversion_values
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'digital_wallet_ltv_dataset.csv')
+NUM_CLUSTERS = 5
+
+
+# Monta uma base com o mesmo layout de colunas do df_novo do app, com clusters aleatórios
+def preparar_base(seed=42):
+    df = pd.read_csv(DATASET)
+    rng = np.random.default_rng(seed)
+    base = pd.DataFrame({'const': 1.0}, index=df.index)
+    for col in ['App_Usage_Frequency', 'Income_Level', 'Location', 'Preferred_Payment_Method']:
+        base[col] = pd.factorize(df[col])[0] + 1
+    base = base.rename(columns={'App_Usage_Frequency': 'app_usage_numerico',
+                                'Income_Level': 'income_level_numerico',
+                                'Location': 'location_numerico',
+                                'Preferred_Payment_Method': 'payment_score_per_client'})
+    for col in GLM_FEATURES:
+        if col in df.columns:
+            base[col] = df[col]
+
+    numericas = base[[c for c in GLM_FEATURES if c not in ('const', 'PCA_1', 'PCA_2')]].to_numpy(dtype=np.float64)
+    centradas = numericas - numericas.mean(axis=0)
+    _, _, vt = np.linalg.svd(centradas, full_matrices=False)
+    componentes = centradas @ vt[:2].T
+    base['PCA_1'] = componentes[:, 0]
+    base['PCA_2'] = componentes[:, 1]
+    base['cluster_label'] = rng.integers(0, NUM_CLUSTERS, len(base))
+    return base, df['LTV']
+
+
+# Ajusta um GLM Gamma por cluster, como no app
+def treinar_modelos(base, ltv):
+    modelos = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for cluster, idx in base.groupby('cluster_label').indices.items():
+            X = base.iloc[idx][GLM_FEATURES]
+            modelos[cluster] = sm.GLM(ltv.iloc[idx], X, family=sm.families.Gamma()).fit()
+    return modelos
+
+
+# Versão original: uma chamada de model.predict por linha
+def predict_linha_a_linha(data, modelos):
+    valores = []
+    for _, row in data.iterrows():
+        valores.append(np.asarray(modelos[row['cluster_label']].predict(row[GLM_FEATURES]))[0])
+    return np.array(valores)
+
+
+def ampliar(base, n_linhas):
+    repeticoes = -(-n_linhas // len(base))
+    return pd.concat([base] * repeticoes, ignore_index=True).iloc[:n_linhas]
+
+
+def medir(func, repeat):
+    tempos = []
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        resultado = func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do scoring vetorizado do FLAG')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[7_000, 700_000, 7_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--legacy-rows', type=int, default=7_000,
+                        help='linhas usadas para medir o loop original (iterrows)')
+    args = parser.parse_args()
+
+    base, ltv = preparar_base()
+    modelos = treinar_modelos(base, ltv)
+
+    # Conferência contra o loop original e medição da versão antiga
+    amostra = base.iloc[:args.legacy_rows]
+    t_legacy, esperado = medir(lambda: predict_linha_a_linha(amostra, modelos), 1)
+    obtido = predict_conversion_values(amostra, modelos)
+    diferenca = np.max(np.abs(obtido - esperado) / np.abs(esperado))
+    print(f"iterrows  {len(amostra):>10,} linhas  {t_legacy:8.3f}s  {len(amostra) / t_legacy:>14,.0f} linhas/s")
+    print(f"diferença relativa máxima vs. iterrows: {diferenca:.2e}")
+
+    for n in args.sizes:
+        data = ampliar(base, n)
+        t, _ = medir(lambda: predict_conversion_values(data, modelos), args.repeat)
+        print(f"vetorizado {n:>10,} linhas  {t:8.3f}s  {n / t:>14,.0f} linhas/s")
+        del data
+
+
+if __name__ == '__main__':
+    main()
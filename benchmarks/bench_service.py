@@ -0,0 +1,167 @@
+# Gerador de carga do serviço de scoring do FLAG (flag.service), todo em localhost: sobe o serviço num
+# subprocesso (ou usa um já rodando com --port) e dispara requisições POST /score em taxa fixa (carga aberta),
+# em conexões keep-alive. A latência é medida a partir do instante agendado de cada requisição, então a fila
+# do lado do cliente entra na conta quando o serviço não acompanha a taxa.
+#
+# Uso: python benchmarks/bench_service.py [--model modelo.npz] [--rate 500 1000 2000 4000] [--duration 10]
+#                                         [--connections 64] [--batch 1] [--max-wait-ms 0]
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+
+from flag.streaming import DEFAULT_TRAIN_PATH
+
+
+# Corpos JSON das requisições: clientes do dataset, `batch` por requisição
+def corpos(batch, quantidade=2000):
+    registros = pd.read_csv(DEFAULT_TRAIN_PATH).drop(columns='LTV').head(quantidade * batch).to_dict('records')
+    if batch == 1:
+        return [json.dumps(r).encode() for r in registros]
+    return [json.dumps(registros[i:i + batch]).encode() for i in range(0, len(registros), batch)]
+
+
+def requisicao(caminho, corpo=None, host='127.0.0.1'):
+    metodo = 'POST' if corpo is not None else 'GET'
+    corpo = corpo or b''
+    return (f"{metodo} {caminho} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(corpo)}\r\n\r\n").encode() + corpo
+
+
+async def ler_resposta(reader):
+    status = int((await reader.readline()).split()[1])
+    tamanho = 0
+    while True:
+        linha = await reader.readline()
+        if linha in (b'\r\n', b''):
+            break
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        if nome.strip().lower() == 'content-length':
+            tamanho = int(valor)
+    return status, await reader.readexactly(tamanho)
+
+
+async def health(port):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(requisicao('/health'))
+    _, corpo = await ler_resposta(reader)
+    writer.close()
+    return json.loads(corpo)
+
+
+# Uma rodada em taxa fixa: devolve (latências em segundos, erros, segundos de envio)
+async def rodada(port, payloads, rate, duration, connections):
+    fila = asyncio.Queue()
+    latencias = []
+    erros = [0]
+
+    async def conexao():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            while True:
+                agendado, i = await fila.get()
+                if agendado is None:
+                    break
+                writer.write(requisicao('/score', payloads[i % len(payloads)]))
+                status, _ = await ler_resposta(reader)
+                latencias.append(time.perf_counter() - agendado)
+                if status != 200:
+                    erros[0] += 1
+        finally:
+            writer.close()
+
+    tarefas = [asyncio.create_task(conexao()) for _ in range(connections)]
+    total = int(rate * duration)
+    inicio = time.perf_counter()
+    enviados = 0
+    while enviados < total:
+        # Todas as requisições cujo horário já passou entram na fila de uma vez
+        devidos = min(total, int((time.perf_counter() - inicio) * rate) + 1)
+        for i in range(enviados, devidos):
+            fila.put_nowait((inicio + i / rate, i))
+        enviados = devidos
+        await asyncio.sleep(0.0005)
+    for _ in tarefas:
+        fila.put_nowait((None, None))
+    await asyncio.gather(*tarefas)
+    return np.array(latencias), erros[0], time.perf_counter() - inicio
+
+
+def subir_servico(model, port, max_wait_ms, max_batch):
+    processo = subprocess.Popen([sys.executable, '-m', 'flag.service', model, '--port', str(port),
+                                 '--max-wait-ms', str(max_wait_ms), '--max-batch', str(max_batch)], cwd=RAIZ)
+    for _ in range(300):
+        try:
+            asyncio.run(health(port))
+            return processo
+        except OSError:
+            if processo.poll() is not None:
+                raise RuntimeError("O serviço de scoring não subiu")
+            time.sleep(0.1)
+    processo.terminate()
+    raise RuntimeError("O serviço de scoring não respondeu ao /health")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gerador de carga do serviço de scoring do FLAG')
+    parser.add_argument('--model', help='modelo exportado (.npz); sem ele, exporta o treino padrão')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--external', action='store_true', help='usa um serviço já rodando em --port')
+    parser.add_argument('--rate', type=float, nargs='+', default=[500, 1000, 2000, 4000],
+                        help='requisições por segundo')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--connections', type=int, default=64)
+    parser.add_argument('--batch', type=int, default=1, help='clientes por requisição')
+    parser.add_argument('--max-wait-ms', type=float, default=0.0)
+    parser.add_argument('--max-batch', type=int, default=256)
+    args = parser.parse_args()
+
+    payloads = corpos(args.batch)
+    processo = None
+    diretorio = tempfile.mkdtemp(prefix='flag-service-')
+    try:
+        if not args.external:
+            model = args.model
+            if model is None:
+                from flag.export import export_model
+                from flag.streaming import fit_on_sample
+
+                model = os.path.join(diretorio, 'modelo.npz')
+                export_model(*fit_on_sample(DEFAULT_TRAIN_PATH, 500_000), model)
+            processo = subir_servico(model, args.port, args.max_wait_ms, args.max_batch)
+
+        # Aquecimento: conexões abertas e primeiros lotes fora da medição
+        asyncio.run(rodada(args.port, payloads, 200, 1, 8))
+        print(f"{'taxa':>7} {'obtida':>8} {'p50 ms':>7} {'p90 ms':>7} {'p99 ms':>7} {'p99.9 ms':>8} "
+              f"{'máx ms':>7} {'erros':>6} {'req/lote':>8}")
+        for rate in args.rate:
+            antes = asyncio.run(health(args.port))
+            latencias, erros, segundos = asyncio.run(
+                rodada(args.port, payloads, rate, args.duration, args.connections))
+            depois = asyncio.run(health(args.port))
+            lotes = max(depois['batches'] - antes['batches'], 1)
+            ms = np.percentile(latencias, [50, 90, 99, 99.9]) * 1e3
+            print(f"{rate:7,.0f} {len(latencias) / segundos:8,.0f} {ms[0]:7.2f} {ms[1]:7.2f} {ms[2]:7.2f} "
+                  f"{ms[3]:8.2f} {latencias.max() * 1e3:7.2f} {erros:6,} "
+                  f"{(depois['requests'] - antes['requests']) / lotes:8.1f}")
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+        for nome in os.listdir(diretorio):
+            os.remove(os.path.join(diretorio, nome))
+        os.rmdir(diretorio)
+
+
+if __name__ == '__main__':
+    main()
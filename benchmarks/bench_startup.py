@@ -0,0 +1,94 @@
+# Benchmark de inicialização do app: tempo de cold start, pico de RSS e bibliotecas pesadas carregadas por aba.
+# Cada medição roda num interpretador novo (Streamlit AppTest): primeiro a aba padrão (o que todo usuário paga
+# ao abrir o app) e, para as outras abas, a troca de aba em seguida.
+#
+# Uso: python benchmarks/bench_startup.py [--baseline-rev <commit>] [--tabs "MMM SIMULADOR" FLAG]
+#   --baseline-rev compara com o app.py de outro commit (ex.: o monolito anterior às abas lazy)
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+ABAS_PADRAO = ["MMM SIMULADOR", "MMM Media Behavior", "BRAIN", "MERIDIO", "MMX", "UXM", "FLAG"]
+BIBLIOTECAS_PESADAS = ['pandas', 'sklearn', 'statsmodels', 'xgboost', 'matplotlib', 'seaborn', 'scipy']
+
+
+def rss_pico_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Executado no processo filho: mede uma aba de um app e imprime o resultado em JSON
+def medir_aba(app_path, aba):
+    from streamlit.testing.v1 import AppTest
+
+    rss_harness = rss_pico_mb()
+    at = AppTest.from_file(app_path, default_timeout=600)
+    inicio = time.perf_counter()
+    at.run()
+    cold_start = time.perf_counter() - inicio
+
+    troca = 0.0
+    seletor = at.sidebar.selectbox[0]
+    if aba != seletor.value:
+        inicio = time.perf_counter()
+        seletor.select(aba).run()
+        troca = time.perf_counter() - inicio
+
+    print(json.dumps({
+        'cold_start': cold_start,
+        'troca': troca,
+        'rss_mb': rss_pico_mb(),
+        'rss_app_mb': rss_pico_mb() - rss_harness,
+        'excecoes': [str(e.value) for e in at.exception],
+        'bibliotecas': [nome for nome in BIBLIOTECAS_PESADAS if nome in sys.modules],
+    }))
+
+
+def rodar_filho(app_path, aba):
+    saida = subprocess.run([sys.executable, '-W', 'ignore', os.path.abspath(__file__), '--child', app_path, aba],
+                           cwd=RAIZ, capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de inicialização do app por aba')
+    parser.add_argument('--app', default=os.path.join(RAIZ, 'app.py'))
+    parser.add_argument('--baseline-rev', help='commit cujo app.py é medido como referência ("antes")')
+    parser.add_argument('--tabs', nargs='+', default=ABAS_PADRAO)
+    parser.add_argument('--child', nargs=2, metavar=('APP', 'ABA'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        medir_aba(*args.child)
+        return
+
+    apps = [('atual', args.app)]
+    baseline_path = None
+    if args.baseline_rev:
+        # O app antigo precisa ficar na raiz do repositório para importar os pacotes locais e achar o dataset
+        baseline_path = os.path.join(RAIZ, f'.bench_app_{args.baseline_rev}.py')
+        codigo = subprocess.run(['git', 'show', f'{args.baseline_rev}:app.py'], cwd=RAIZ, capture_output=True,
+                                text=True, check=True).stdout
+        with open(baseline_path, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(codigo)
+        apps.insert(0, (args.baseline_rev, baseline_path))
+
+    try:
+        print(f"{'app':<10} {'aba':<20} {'cold start':>11} {'troca':>8} {'RSS pico':>10} {'RSS app':>9}  bibliotecas")
+        for nome, path in apps:
+            for aba in args.tabs:
+                r = rodar_filho(path, aba)
+                erro = '  (erro na aba)' if r['excecoes'] else ''
+                print(f"{nome:<10} {aba:<20} {r['cold_start']:>10.2f}s {r['troca']:>7.2f}s {r['rss_mb']:>8.0f}MB "
+                      f"{r['rss_app_mb']:>7.0f}MB  {', '.join(r['bibliotecas']) or '-'}{erro}")
+    finally:
+        if baseline_path and os.path.exists(baseline_path):
+            os.remove(baseline_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+# Suíte de benchmarks headless de todas as abas: o cálculo por trás de cada aba roda sem navegador
+# (MMM: calcular_metricas, curvas de resposta, otimizador e Monte Carlo; FLAG: gerador sintético, treino
+# KMeans/PCA/GLM e scoring em clientes do flag.synthetic ajustado no digital_wallet_ltv_dataset.csv;
+# BRAIN/MERIDIO/MMX/UXM e MMM Media Behavior: montagem e serialização das figuras, com o Streamlit em modo bare).
+#
+# Para cada caso: vazão (no p50), percentis de latência (p50/p95/p99) e pico de memória (tracemalloc, numa
+# execução separada para não inflar os tempos). Com uma baseline salva, a suíte compara cada caso e termina com
+# código 1 se algum ficou mais lento ou mais pesado que a tolerância (ou se um caso da baseline passou a falhar).
+#
+# Uso: python benchmarks/bench_suite.py [--grupos mmm flag figuras] [--sizes 7000 100000]
+#                                       [--baseline benchmarks/baseline.json] [--salvar-baseline]
+#                                       [--tolerancia 0.3] [--tolerancia-memoria 0.2]
+#   Escala de milhões (vários minutos por caso do FLAG): --sizes 7000 100000 1000000 7000000
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import warnings
+
+import numpy as np
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, RAIZ)
+
+from perfil import etapa, execucao
+
+DATASET = os.path.join(RAIZ, 'digital_wallet_ltv_dataset.csv')
+BASELINE_PADRAO = os.path.join(RAIZ, 'benchmarks', 'baseline.json')
+GRUPOS = ('mmm', 'flag', 'figuras')
+ABAS_FIGURAS = ('brain', 'meridio', 'mmx', 'uxm', 'mmm_media_behavior')
+# Memória abaixo disso (MB) não conta como regressão: ruído de alocações pequenas do interpretador
+FOLGA_MEMORIA_MB = 1.0
+
+
+# Dataset com `n_linhas` no layout tipado do flag.ingest: o CSV original quando o tamanho é o dele, senão
+# clientes do gerador sintético ajustado nele (flag.synthetic)
+def dataset_sintetico(n_linhas, seed=0):
+    from flag.ingest import add_encodings, load_dataset
+    from flag.synthetic import fit_generator
+
+    base = load_dataset(DATASET)
+    if n_linhas == len(base):
+        return base.copy()
+    return add_encodings(fit_generator(base).sample(n_linhas, seed))
+
+
+# Casos do MMM: (nome, n, unidade, preparar), onde preparar() devolve a função medida
+def casos_mmm(sizes):
+    from abas.mmm_comum import calcular_metricas, investimentos_iniciais, modelo_mmm, valor_medio_venda
+    from mmm.incerteza import bandas_quantis, simular_incerteza
+    from mmm.otimizador import OtimizadorOrcamento, fronteira_eficiente
+
+    curvas_mmm = modelo_mmm()[1]
+    alocacao = [investimentos_iniciais[canal] for canal in curvas_mmm.canais]
+    n_canais = len(curvas_mmm.canais)
+
+    def cenarios(n):
+        orcamentos = np.random.default_rng(0).uniform(0, 500, (n, n_canais))
+        return lambda: curvas_mmm.simular(orcamentos)
+
+    def monte_carlo(n):
+        return lambda: bandas_quantis(simular_incerteza(curvas_mmm, alocacao, n, seed=0,
+                                                        valor_venda=valor_medio_venda))
+
+    def otimizacao():
+        otimizador = OtimizadorOrcamento(curvas_mmm)
+        return lambda: otimizador.alocar([sum(alocacao)], 0, 500)
+
+    casos = [
+        ('calcular_metricas', 1, 'chamadas', lambda: (lambda: calcular_metricas(investimentos_iniciais))),
+        ('otimizacao', 1, 'orçamentos', otimizacao),
+        ('fronteira', 60, 'orçamentos', lambda: (lambda: fronteira_eficiente(curvas_mmm, np.linspace(0, 3500, 60),
+                                                                             0, 500))),
+    ]
+    casos += [('curvas_resposta', n, 'cenários', lambda n=n: cenarios(n)) for n in sizes]
+    casos += [('monte_carlo', n, 'amostras', lambda n=n: monte_carlo(n)) for n in sizes]
+    return casos
+
+
+# Casos do FLAG: treino completo (encoding, scaler, KMeans, PCA, GLMs) e scoring com modelos já treinados
+def casos_flag(sizes):
+    from flag.ingest import load_dataset
+    from flag.cube import build_cube
+    from flag.pipeline import DEFAULT_HYPERPARAMETERS, fit_pipeline, transform
+    from flag.scoring import apply_predictions
+    from flag.synthetic import fit_generator
+
+    # Avisos numéricos do treino (KMeans, GLMs de clusters pequenos) só poluiriam a tabela
+    warnings.simplefilter('ignore')
+    artefatos = {}
+
+    def treino(n):
+        df = dataset_sintetico(n)
+        return lambda: fit_pipeline(df, **DEFAULT_HYPERPARAMETERS)
+
+    def treinados():
+        if not artefatos:
+            artefatos.update(fit_pipeline(dataset_sintetico(7_000), **DEFAULT_HYPERPARAMETERS))
+        return artefatos
+
+    def scoring(n):
+        treinados()
+        df = dataset_sintetico(n, seed=1)
+        return lambda: apply_predictions(transform(df, artefatos), artefatos['glm_models'])
+
+    # Cubo de agregados: montagem a partir dos clientes pontuados e uma consulta com todos os filtros
+    # (a consulta não depende do número de clientes no cubo)
+    def pontuados(n):
+        treinados()
+        return apply_predictions(transform(dataset_sintetico(n, seed=1), artefatos), artefatos['glm_models'])
+
+    def cubo_montagem(n):
+        df_novo = pontuados(n)
+        return lambda: build_cube(df_novo, artefatos)
+
+    def cubo_consulta(n):
+        cubo = build_cube(pontuados(n), artefatos)
+        return lambda: cubo.query(locations=[1, 3], payment_scores=[2, 4], days=(30, 180))
+
+    def gerador(n):
+        gerador = fit_generator(load_dataset(DATASET))
+        return lambda: gerador.sample(n, 0)
+
+    casos = [('gerador_sintetico', n, 'linhas', lambda n=n: gerador(n)) for n in sizes]
+    casos += [('fit_pipeline', n, 'linhas', lambda n=n: treino(n)) for n in sizes]
+    casos += [('scoring', n, 'linhas', lambda n=n: scoring(n)) for n in sizes]
+    casos += [('cubo_montagem', n, 'linhas', lambda n=n: cubo_montagem(n)) for n in sizes]
+    casos += [('cubo_consulta', n, 'clientes', lambda n=n: cubo_consulta(n)) for n in sizes]
+    return casos
+
+
+# Casos das abas de figuras: renderizar() inteiro com o Streamlit em modo bare (sem servidor nem navegador);
+# o st.plotly_chart continua serializando as figuras, que é o custo real dessas abas
+def casos_figuras():
+    import importlib
+
+    from streamlit import config
+    from streamlit.logger import set_log_level
+
+    # Sem isso o modo bare avisa "missing ScriptRunContext" a cada elemento desenhado. A configuração é lida
+    # antes de ajustar o nível porque a leitura (preguiçosa) redefine o nível dos loggers do Streamlit
+    config.get_option('logger.level')
+    set_log_level('error')
+
+    def aba(modulo):
+        return importlib.import_module(f"abas.{modulo}").renderizar
+
+    return [(modulo, 1, 'renders', lambda modulo=modulo: aba(modulo)) for modulo in ABAS_FIGURAS]
+
+
+# Mede um caso: uma chamada de aquecimento, depois chamadas até somar `tempo_min` segundos (no mínimo
+# `repeat`), e por fim uma chamada com tracemalloc para o pico de memória
+def medir_caso(func, repeat, tempo_min, max_chamadas=10_000):
+    func()
+    latencias = []
+    inicio = time.perf_counter()
+    while len(latencias) < repeat or (time.perf_counter() - inicio < tempo_min and len(latencias) < max_chamadas):
+        t0 = time.perf_counter()
+        func()
+        latencias.append(time.perf_counter() - t0)
+
+    gc.collect()
+    with execucao('bench', memoria=True) as atual:
+        with etapa('caso'):
+            func()
+    latencias = np.asarray(latencias)
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+    return {
+        'chamadas': len(latencias),
+        'min_s': float(latencias.min()),
+        'p50_s': float(p50),
+        'p95_s': float(p95),
+        'p99_s': float(p99),
+        'pico_mb': atual.etapas[-1]['pico_mb'],
+    }
+
+
+def maquina():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'processador': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def carregar_baseline(caminho):
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+# Compara um resultado com a baseline; devolve a lista de problemas (vazia quando está dentro da tolerância).
+# O tempo comparado é a melhor chamada: os percentis variam bem mais com a carga da máquina
+def comparar(resultado, referencia, tolerancia, tolerancia_memoria):
+    problemas = []
+    if 'erro' in resultado:
+        return [f"falhou: {resultado['erro']}"]
+    if resultado['min_s'] > referencia['min_s'] * (1 + tolerancia):
+        problemas.append(f"melhor chamada {resultado['min_s'] * 1000:.2f}ms vs {referencia['min_s'] * 1000:.2f}ms")
+    limite_memoria = referencia['pico_mb'] * (1 + tolerancia_memoria) + FOLGA_MEMORIA_MB
+    if resultado['pico_mb'] > limite_memoria:
+        problemas.append(f"pico {resultado['pico_mb']:.1f}MB vs {referencia['pico_mb']:.1f}MB")
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Suíte de benchmarks headless de todas as abas')
+    parser.add_argument('--grupos', nargs='+', choices=GRUPOS, default=list(GRUPOS))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[7_000, 100_000],
+                        help='linhas dos datasets sintéticos do FLAG, cenários e amostras do MMM')
+    parser.add_argument('--repeat', type=int, default=3, help='chamadas medidas no mínimo por caso')
+    parser.add_argument('--tempo-min', type=float, default=0.5, help='segundos medidos no mínimo por caso')
+    parser.add_argument('--baseline', default=BASELINE_PADRAO)
+    parser.add_argument('--salvar-baseline', action='store_true',
+                        help='grava os resultados como a nova baseline (só os casos medidos nesta rodada)')
+    parser.add_argument('--tolerancia', type=float, default=0.3, help='piora relativa aceita no tempo')
+    parser.add_argument('--tolerancia-memoria', type=float, default=0.2, help='piora relativa aceita no pico')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    baseline = carregar_baseline(args.baseline)
+    referencias = baseline['casos'] if baseline else {}
+    if baseline and baseline.get('maquina') != maquina():
+        print(f"aviso: baseline gravada em outra máquina/ambiente ({baseline.get('maquina')})")
+
+    construtores = {'mmm': lambda: casos_mmm(args.sizes), 'flag': lambda: casos_flag(args.sizes),
+                    'figuras': casos_figuras}
+    resultados = {}
+    falhas = []
+    print(f"{'caso':<28} {'n':>10} {'chamadas':>8} {'mín':>10} {'p50':>10} {'p95':>10} {'p99':>10} {'vazão':>22} "
+          f"{'pico':>9}  vs. baseline")
+    for grupo in args.grupos:
+        for nome, n, unidade, preparar in construtores[grupo]():
+            chave = f"{grupo}/{nome}/{n}"
+            try:
+                resultado = medir_caso(preparar(), args.repeat, args.tempo_min)
+            except Exception as erro:
+                resultado = {'erro': f"{type(erro).__name__}: {erro}"}
+            gc.collect()
+
+            referencia = referencias.get(chave)
+            problemas = comparar(resultado, referencia, args.tolerancia, args.tolerancia_memoria) \
+                if referencia else []
+            if problemas:
+                falhas.append((chave, problemas))
+
+            if 'erro' in resultado:
+                situacao = 'FALHOU' if referencia else 'erro (sem baseline)'
+                print(f"{grupo + '/' + nome:<28} {n:>10,} {'-':>8} {resultado['erro'][:60]}  {situacao}")
+                continue
+            resultados[chave] = resultado
+            if referencia:
+                delta = (resultado['min_s'] / referencia['min_s'] - 1) * 100
+                situacao = f"{delta:+.0f}%" + ('  REGRESSÃO' if problemas else '')
+            else:
+                situacao = 'sem baseline'
+            vazao = n / resultado['p50_s']
+            tempos = ' '.join(f"{resultado[campo] * 1000:>8.2f}ms" for campo in ('min_s', 'p50_s', 'p95_s', 'p99_s'))
+            print(f"{grupo + '/' + nome:<28} {n:>10,} {resultado['chamadas']:>8} {tempos} "
+                  f"{vazao:>12,.0f} {unidade + '/s':<9} {resultado['pico_mb']:>7.1f}MB  {situacao}")
+
+    if args.salvar_baseline:
+        casos = {**referencias, **resultados}
+        with open(args.baseline, 'w', encoding='utf-8') as arquivo:
+            json.dump({'maquina': maquina(), 'casos': dict(sorted(casos.items()))}, arquivo, indent=2,
+                      ensure_ascii=False)
+            arquivo.write('\n')
+        print(f"\nbaseline gravada em {args.baseline} ({len(resultados)} casos medidos)")
+
+    if falhas:
+        print(f"\n{len(falhas)} REGRESSÃO(ÕES) em relação à baseline (tolerância tempo {args.tolerancia:.0%}, "
+              f"pico {args.tolerancia_memoria:.0%}):")
+        for chave, problemas in falhas:
+            print(f"  {chave}: {'; '.join(problemas)}")
+        if not args.salvar_baseline:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
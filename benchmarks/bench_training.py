@@ -0,0 +1,128 @@
+# Benchmark do treino dos GLMs por cluster do FLAG: três passes antigos vs. ajuste único, e o ajuste em série
+# vs. o pool de processos do flag.training com um modelo por cluster x região (--rows usa dados sintéticos)
+#
+# Uso: python benchmarks/bench_training.py [--repeat 3] [--rows 1000000] [--processes 4]
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flag.ingest import add_encodings, load_dataset
+from flag.pipeline import encode_features, fit_cluster_glms, fit_payment_scores, model_features
+from flag.scoring import GLM_FEATURES
+from flag.synthetic import fit_generator
+from flag.training import fit_glm_groups
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'digital_wallet_ltv_dataset.csv')
+
+
+# df_novo com clusters e PCA, igual ao que chega na etapa dos GLMs (`rows` troca o CSV por clientes sintéticos)
+def preparar_df_novo(rows=None):
+    df = pd.read_csv(DATASET) if rows is None else add_encodings(fit_generator(load_dataset(DATASET)).sample(rows, 0))
+    df_novo = encode_features(df, fit_payment_scores(df))
+    features = model_features(df_novo)
+    df_novo['cluster_label'] = KMeans(n_clusters=5, random_state=42).fit_predict(features)
+    componentes = PCA(n_components=2).fit_transform(features)
+    df_novo['PCA_1'] = componentes[:, 0]
+    df_novo['PCA_2'] = componentes[:, 1]
+    return df_novo
+
+
+# Versão anterior: cluster_models, evaluation_metrics e glm_models, cada um refiltrando o df_novo inteiro
+def treino_em_tres_passes(df_novo):
+    timings = {}
+
+    inicio = time.perf_counter()
+    cluster_models = {}
+    for cluster in df_novo['cluster_label'].unique():
+        cluster_data = df_novo[df_novo['cluster_label'] == cluster]
+        X = sm.add_constant(cluster_data.drop(columns=['Customer_ID', 'cluster_label', 'LTV']))
+        cluster_models[cluster] = sm.GLM(cluster_data['LTV'], X, family=sm.families.Gamma()).fit()
+    timings['cluster_models'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for cluster in df_novo['cluster_label'].unique():
+        cluster_data = df_novo[df_novo['cluster_label'] == cluster]
+        X_cluster = sm.add_constant(cluster_data.drop(columns=['Customer_ID', 'cluster_label', 'LTV']))
+        predictions = cluster_models[cluster].predict(X_cluster)
+        mse = mean_squared_error(cluster_data['LTV'], predictions)
+        mean_absolute_error(cluster_data['LTV'], predictions), np.sqrt(mse)
+    timings['evaluation_metrics'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for cluster in df_novo['cluster_label'].unique():
+        cluster_data = df_novo[df_novo['cluster_label'] == cluster].copy()
+        cluster_data['const'] = 1
+        sm.GLM(cluster_data['LTV'], cluster_data[GLM_FEATURES], family=sm.families.Gamma()).fit()
+    timings['glm_models'] = time.perf_counter() - inicio
+    return timings
+
+
+# Um GLM por cluster x região, em série e no pool; confere que os coeficientes saem idênticos
+def serie_vs_pool(df_novo, processes, repeat):
+    X = df_novo.reindex(columns=GLM_FEATURES, fill_value=1).to_numpy(dtype=np.float64)
+    y = df_novo['LTV'].to_numpy(dtype=np.float64)
+    groups = df_novo.groupby(['cluster_label', 'location_numerico'], sort=True).indices
+
+    tempos = {}
+    modelos = {}
+    for nome, processos in (('série', 1), (f"pool ({processes} processos)", processes)):
+        melhor = float('inf')
+        for _ in range(repeat):
+            inicio = time.perf_counter()
+            modelos[nome] = fit_glm_groups(X, y, groups, GLM_FEATURES, processes=processos, min_rows_parallel=0)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        tempos[nome] = melhor
+
+    serie, pool = (modelos[nome] for nome in tempos)
+    iguais = all(np.array_equal(serie[0][k].params, pool[0][k].params) for k in groups)
+    iguais = iguais and np.array_equal(serie[2], pool[2])
+    print(f"{len(groups)} GLMs (cluster x região), {len(y):,} linhas, {os.cpu_count()} CPUs")
+    for nome, segundos in tempos.items():
+        print(f"  {nome:<20} {segundos * 1000:8.1f} ms")
+    print(f"speedup: {tempos['série'] / tempos[nome]:.1f}x; resultados idênticos: {iguais}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do treino dos GLMs por cluster do FLAG')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--rows', type=int, default=None, help='clientes sintéticos no lugar do CSV')
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    df_novo = preparar_df_novo(args.rows)
+
+    antigo = min((treino_em_tres_passes(df_novo) for _ in range(args.repeat)), key=lambda t: sum(t.values()))
+    novo = {}
+    for _ in range(args.repeat):
+        timings = {}
+        fit_cluster_glms(df_novo, timings)
+        if not novo or sum(timings.values()) < sum(novo.values()):
+            novo = timings
+
+    print("três passes (antes)")
+    for etapa, segundos in antigo.items():
+        print(f"  {etapa:<20} {segundos * 1000:8.1f} ms")
+    print(f"  {'total':<20} {sum(antigo.values()) * 1000:8.1f} ms")
+    print("ajuste único (fit_cluster_glms)")
+    for etapa, segundos in novo.items():
+        print(f"  {etapa:<20} {segundos * 1000:8.1f} ms")
+    print(f"  {'total':<20} {sum(novo.values()) * 1000:8.1f} ms")
+    print(f"speedup: {sum(antigo.values()) / sum(novo.values()):.1f}x")
+    print()
+    serie_vs_pool(df_novo, max(args.processes, 2), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# Benchmark da busca de hiperparâmetros do flag.validation no dataset do app: tempo de parede de `--trials`
+# trials x folds com 1..N processos, a melhor acurácia e a conferência de que o resultado não muda com o
+# número de processos
+#
+# Uso: python benchmarks/bench_validation.py [--models gbm glm] [--scheme kfold] [--trials 50] [--processes 1 4]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flag.ingest import load_dataset
+from flag.validation import MODELS, SCHEMES, search
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'digital_wallet_ltv_dataset.csv')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da validação cruzada do FLAG')
+    parser.add_argument('--models', nargs='+', choices=MODELS, default=list(MODELS))
+    parser.add_argument('--scheme', choices=SCHEMES, default='kfold')
+    parser.add_argument('--trials', type=int, default=50)
+    parser.add_argument('--splits', type=int, default=5)
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    df = load_dataset(DATASET)
+    print(f"{'modelo':>6} {'processos':>9} {'segundos':>9} {'trials/s':>8} {'melhor acurácia':>15} {'igual':>6}")
+    for model in args.models:
+        referencia = None
+        for processes in dict.fromkeys(args.processes):
+            inicio = time.perf_counter()
+            tabela, melhor = search(df, model, args.trials, args.scheme, args.splits, processes=processes)
+            segundos = time.perf_counter() - inicio
+            metricas = tabela.drop(columns='seconds')
+            igual = referencia is None or metricas.equals(referencia)
+            referencia = metricas if referencia is None else referencia
+            print(f"{model:>6} {processes:9d} {segundos:9.1f} {args.trials / segundos:8.2f} "
+                  f"{melhor['accuracy']:15.2%} {str(igual):>6}")
+
+
+if __name__ == '__main__':
+    main()
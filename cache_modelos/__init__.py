@@ -0,0 +1,159 @@
+# Cache de modelos em memória + disco, compartilhado pelo FLAG (flag.model_cache) e pelas abas do MMM: chave
+# pelo conteúdo dos dados, pelos hiperparâmetros e pela versão do código que gerou o modelo
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Fingerprints já calculados, indexados por (caminho, tamanho, mtime) para não reler o arquivo a cada rerun
+_fingerprints = {}
+_fingerprints_lock = threading.Lock()
+
+
+# Hash do conteúdo do dataset; só é recalculado quando o arquivo muda no disco
+def dataset_fingerprint(path, chunk_size=1 << 20):
+    stat = os.stat(path)
+    assinatura = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _fingerprints_lock:
+        if assinatura in _fingerprints:
+            return _fingerprints[assinatura]
+
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bloco in iter(lambda: f.read(chunk_size), b''):
+            sha.update(bloco)
+    fingerprint = sha.hexdigest()
+
+    with _fingerprints_lock:
+        _fingerprints[assinatura] = fingerprint
+    return fingerprint
+
+
+# Chave do cache: conteúdo do dataset + hiperparâmetros do treino + versão do pipeline que gerou os artefatos
+def cache_key(fingerprint, hyperparameters, version=None):
+    payload = json.dumps({'dataset': fingerprint, 'hyperparameters': hyperparameters, 'version': version},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+# Cache de artefatos treinados: LRU em memória (compartilhado entre reruns e sessões do Streamlit)
+# com persistência em disco, para que um restart do app não precise retreinar
+class ModelCache:
+    def __init__(self, directory, max_memory_entries=4, max_disk_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        # Um lock por chave evita que duas sessões treinem o mesmo modelo ao mesmo tempo
+        self._fit_locks = {}
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Arquivo corrompido ou de uma versão incompatível do código: descarta e retreina
+            self._remove_file(path)
+            return None
+
+        # Marca o uso para a política de despejo do disco
+        os.utime(path)
+        with self._lock:
+            self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+
+        os.makedirs(self.directory, exist_ok=True)
+        # Escrita atômica: grava num arquivo temporário e renomeia
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            self._remove_file(tmp_path)
+            raise
+        self._evict_disk()
+
+    def get_or_fit(self, key, fit):
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            fit_lock = self._fit_locks.setdefault(key, threading.Lock())
+        with fit_lock:
+            # Outra sessão pode ter treinado enquanto esperávamos o lock
+            value = self.get(key)
+            if value is None:
+                value = fit()
+                self.put(key, value)
+        return value
+
+    # Remove uma chave específica, ou tudo quando key=None
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._memory.clear()
+            else:
+                self._memory.pop(key, None)
+
+        if key is not None:
+            self._remove_file(self._path(key))
+        elif os.path.isdir(self.directory):
+            for nome in os.listdir(self.directory):
+                if nome.endswith('.pkl'):
+                    self._remove_file(os.path.join(self.directory, nome))
+
+    # Mantém o diretório abaixo de max_disk_bytes apagando os artefatos usados há mais tempo
+    def _evict_disk(self):
+        arquivos = []
+        for nome in os.listdir(self.directory):
+            if nome.endswith('.pkl'):
+                path = os.path.join(self.directory, nome)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                arquivos.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in arquivos)
+        restantes = len(arquivos)
+        for _, size, path in sorted(arquivos):
+            # O artefato mais recente nunca é apagado, mesmo que sozinho passe do limite
+            if total <= self.max_disk_bytes or restantes <= 1:
+                break
+            self._remove_file(path)
+            restantes -= 1
+            total -= size
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1 @@
+# FLAG: pipeline de previsão de LTV e conversion values para VBB
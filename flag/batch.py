@@ -0,0 +1,104 @@
+# Scoring em lote do FLAG a partir de um modelo exportado (flag.export), para os jobs noturnos de VBB/ROAS:
+# sem treino, sem o app e com vários processos. Cada worker carrega o modelo uma vez; em arquivos Parquet o
+# worker lê os próprios row groups (só os scores voltam pelo pool), em CSV o processo principal lê os blocos
+# e os distribui. A saída sai na ordem do arquivo de entrada, com o conversion value já dividido pelo fator
+# que o app aplica (CONVERSION_VALUE_DIVISOR), pronta para subir como sinal de value-based bidding.
+#
+# Uso: python -m flag.batch modelo.npz clientes.parquet scores.parquet [--workers 4] [--chunksize 200000]
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from flag.export import load_model
+from flag.ingest import iter_dataset, write_chunks
+from flag.streaming import DEFAULT_CHUNKSIZE, score_chunk
+
+# Modelo carregado em cada worker pelo initializer do pool
+_modelo = None
+
+
+def _iniciar_worker(model_path, threads):
+    from threadpoolctl import threadpool_limits
+
+    global _modelo
+    threadpool_limits(threads)
+    _modelo = load_model(model_path)
+
+
+def _pontuar_bloco(chunk):
+    return score_chunk(chunk, _modelo)
+
+
+def _pontuar_row_groups(path, row_groups):
+    import pyarrow.parquet as pq
+
+    return score_chunk(pq.ParquetFile(path).read_row_groups(row_groups).to_pandas(), _modelo)
+
+
+# Tarefas do pool: (função, argumentos). Row groups consecutivos do Parquet são agrupados até ~`chunksize`
+# linhas (um row group maior que isso vira uma tarefa sozinho)
+def _tarefas(input_path, chunksize):
+    if input_path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        metadados = pq.ParquetFile(input_path).metadata
+        grupos, linhas = [], 0
+        for i in range(metadados.num_row_groups):
+            grupos.append(i)
+            linhas += metadados.row_group(i).num_rows
+            if linhas >= chunksize:
+                yield _pontuar_row_groups, (input_path, grupos)
+                grupos, linhas = [], 0
+        if grupos:
+            yield _pontuar_row_groups, (input_path, grupos)
+    else:
+        for chunk in iter_dataset(input_path, chunksize):
+            yield _pontuar_bloco, (chunk,)
+
+
+# Pontua `input_path` com o modelo exportado em `model_path` e grava em `output_path` (CSV ou Parquet);
+# devolve o total de clientes. Com `workers=1` roda no próprio processo. No máximo 2 blocos por worker
+# ficam em voo, então a memória não cresce com o arquivo
+def score_batch(model_path, input_path, output_path, workers=None, chunksize=DEFAULT_CHUNKSIZE, progress=None):
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        artefatos = load_model(model_path)
+        chunks = (score_chunk(chunk, artefatos) for chunk in iter_dataset(input_path, chunksize))
+        return write_chunks(chunks, output_path, progress)
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker,
+                             initargs=(model_path, threads)) as pool:
+        def resultados():
+            pendentes = deque()
+            for funcao, argumentos in _tarefas(input_path, chunksize):
+                pendentes.append(pool.submit(funcao, *argumentos))
+                if len(pendentes) >= 2 * workers:
+                    yield pendentes.popleft().result()
+            while pendentes:
+                yield pendentes.popleft().result()
+
+        return write_chunks(resultados(), output_path, progress)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scoring em lote dos conversion values do FLAG')
+    parser.add_argument('model', help='modelo exportado com `python -m flag.export` (.npz)')
+    parser.add_argument('input', help='arquivo de clientes (CSV ou Parquet)')
+    parser.add_argument('output', help='arquivo de saída (.csv ou .parquet)')
+    parser.add_argument('--workers', type=int, help='processos de scoring (padrão: número de CPUs)')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    total = score_batch(args.model, args.input, args.output, args.workers, args.chunksize,
+                        progress=lambda n: print(f"\r{n:,} clientes pontuados", end='', file=sys.stderr))
+    segundos = time.perf_counter() - inicio
+    print(f"\n{total:,} clientes em {segundos:.1f}s ({total / max(segundos, 1e-9):,.0f}/s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
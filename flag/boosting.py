@@ -0,0 +1,87 @@
+# Backend de gradient boosting do LTV do FLAG, alternativo aos GLMs Gamma por cluster: um único modelo XGBoost
+# sobre as mesmas colunas da matriz de desenho dos GLMs (sem a constante) mais o cluster como feature. As
+# árvores não sofrem com as colunas colineares que os GLMs engolem (Total_Spent, médias e máximos das
+# transações, PCA_1/PCA_2).
+#
+# Treino: `tree_method='hist'` (cada feature é discretizada uma única vez em até `max_bin` faixas, num
+# QuantileDMatrix float32), todos os núcleos e early stopping numa fração separada do treino. Previsão:
+# `inplace_predict` direto no código compilado, em blocos de linhas float32 montados das colunas do working
+# set, sem DMatrix nem a matriz inteira. `predict_conversion_values` (flag.scoring) aceita o BoostedLTV no
+# lugar do dicionário de GLMs, então conversion value, cubo e gráficos saem de qualquer um dos backends.
+import os
+
+import numpy as np
+
+from flag.scoring import GLM_FEATURES, design_columns, take_rows
+
+# Colunas do modelo, na ordem do treino
+BOOSTING_FEATURES = [col for col in GLM_FEATURES if col != 'const'] + ['cluster_label']
+
+# Hiperparâmetros padrão; `n_estimators` é o teto de árvores, o early stopping decide quantas ficam
+DEFAULT_BOOSTING_PARAMETERS = {'objective': 'reg:squarederror', 'learning_rate': 0.1, 'max_depth': 6,
+                               'min_child_weight': 1.0, 'subsample': 0.8, 'colsample_bytree': 0.8,
+                               'reg_lambda': 1.0, 'max_bin': 256, 'n_estimators': 1000}
+# Fração do treino separada para o early stopping e rodadas sem melhora antes de parar
+VALIDATION_FRACTION = 0.1
+EARLY_STOPPING_ROUNDS = 20
+# Linhas por bloco na previsão (limita a matriz float32 temporária)
+PREDICT_CHUNK_ROWS = 262_144
+
+
+# Matriz float32 das linhas [inicio, fim) (todas, com None) de uma matriz ou lista de colunas
+def _float32_rows(X, inicio=0, fim=None):
+    if isinstance(X, np.ndarray):
+        return np.ascontiguousarray(X[inicio:fim], dtype=np.float32)
+    fim = len(X[0]) if fim is None else min(fim, len(X[0]))
+    return take_rows(X, np.arange(inicio, fim), out=np.empty((fim - inicio, len(X)), dtype=np.float32))
+
+
+# Modelo de boosting treinado: o Booster do XGBoost, as colunas de entrada e a melhor iteração do early stopping
+class BoostedLTV:
+    def __init__(self, booster, features, best_iteration, params):
+        self.booster = booster
+        self.features = list(features)
+        self.best_iteration = int(best_iteration)
+        self.params = dict(params)
+
+    # LTV previsto para uma matriz (n, features) ou lista de colunas na ordem de `features`
+    def predict(self, X, chunksize=PREDICT_CHUNK_ROWS):
+        n = len(X) if isinstance(X, np.ndarray) else len(X[0])
+        predicted = np.empty(n)
+        for inicio in range(0, n, chunksize):
+            bloco = _float32_rows(X, inicio, inicio + chunksize)
+            predicted[inicio:inicio + len(bloco)] = self.booster.inplace_predict(
+                bloco, iteration_range=(0, self.best_iteration + 1))
+        return predicted
+
+    # LTV previsto direto de um DataFrame já transformado (com cluster_label e PCA)
+    def predict_frame(self, data, chunksize=PREDICT_CHUNK_ROWS):
+        faltando = [col for col in self.features if col not in data]
+        if faltando:
+            raise KeyError(f"Colunas ausentes para o scoring: {faltando}")
+        return self.predict(design_columns(data, self.features), chunksize)
+
+    # Importância (ganho total) de cada feature, na ordem de `features`
+    def feature_importance(self):
+        ganhos = self.booster.get_score(importance_type='total_gain')
+        return {nome: ganhos.get(f"f{j}", 0.0) for j, nome in enumerate(self.features)}
+
+
+# Treina o modelo em X (matriz ou lista de colunas na ordem de `features`) e y. `params` sobrescreve
+# DEFAULT_BOOSTING_PARAMETERS; `threads` limita o treino (None = todos os núcleos)
+def fit_boosted(X, y, features=BOOSTING_FEATURES, params=None, random_state=42, threads=None):
+    import xgboost as xgb
+
+    params = {**DEFAULT_BOOSTING_PARAMETERS, **(params or {})}
+    treino = dict(params)
+    rodadas = int(treino.pop('n_estimators'))
+    treino.update(tree_method='hist', seed=random_state, nthread=threads or os.cpu_count() or 1)
+
+    X = _float32_rows(X)
+    y = np.asarray(y, dtype=np.float64)
+    validacao = np.random.default_rng(random_state).random(len(y)) < VALIDATION_FRACTION
+    dtrain = xgb.QuantileDMatrix(X[~validacao], y[~validacao], max_bin=treino['max_bin'])
+    dvalid = xgb.QuantileDMatrix(X[validacao], y[validacao], ref=dtrain)
+    booster = xgb.train(treino, dtrain, rodadas, evals=[(dvalid, 'validation')],
+                        early_stopping_rounds=EARLY_STOPPING_ROUNDS, verbose_eval=False)
+    return BoostedLTV(booster, features, booster.best_iteration, params)
@@ -0,0 +1,116 @@
+import copy
+import os
+import tempfile
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+BACKENDS = ('kmeans', 'minibatch')
+
+# Nomes dos segmentos do FLAG, do maior para o menor LTV médio
+CLUSTER_NAMES_BY_RANK = ['Alto-Potencial', 'Bons-Clientes', 'Medianos', 'Clientes-Ruins', 'Muito-Ruins']
+
+
+# Cria o estimador de clustering; com `init_centers` o treino parte de centróides já conhecidos (warm start).
+# `copy_x=False` deixa o KMeans centralizar os dados no próprio array (e restaurá-los no fim) em vez de copiá-los
+def make_clusterer(backend='kmeans', num_clusters=5, random_state=42, init_centers=None, batch_size=4096,
+                   copy_x=True):
+    init = 'k-means++' if init_centers is None else np.asarray(init_centers, dtype=np.float64)
+    n_init = 'auto' if init_centers is None else 1
+    if backend == 'kmeans':
+        return KMeans(n_clusters=num_clusters, random_state=random_state, init=init, n_init=n_init, copy_x=copy_x)
+    if backend == 'minibatch':
+        return MiniBatchKMeans(n_clusters=num_clusters, random_state=random_state, init=init, n_init=n_init,
+                               batch_size=batch_size)
+    raise ValueError(f"Backend de clustering desconhecido: {backend!r} (opções: {', '.join(BACKENDS)})")
+
+
+# Permutação que leva cada centróide novo ao centróide de referência mais próximo (atribuição ótima)
+def align_to_reference(centers, reference_centers):
+    distancias = np.linalg.norm(centers[:, None, :] - reference_centers[None, :, :], axis=2)
+    novos, referencias = linear_sum_assignment(distancias)
+    permutacao = np.empty(len(centers), dtype=np.intp)
+    permutacao[novos] = referencias
+    return permutacao
+
+
+# Renumera os clusters de um modelo já treinado: o cluster i passa a ser permutacao[i]
+def relabel(model, permutacao):
+    ordem = np.argsort(permutacao)
+    model.cluster_centers_ = model.cluster_centers_[ordem]
+    if hasattr(model, 'labels_'):
+        model.labels_ = permutacao[model.labels_].astype(model.labels_.dtype)
+    if hasattr(model, '_counts'):
+        model._counts = model._counts[ordem]
+    return model
+
+
+# Treina o clustering; com centróides de referência, os ids dos clusters ficam iguais aos do modelo anterior
+def fit_clusters(features, backend='kmeans', num_clusters=5, random_state=42, init_centers=None,
+                 reference_centers=None, copy_x=True):
+    model = make_clusterer(backend, num_clusters, random_state, init_centers, copy_x=copy_x)
+    model.fit(features)
+    if reference_centers is not None and len(reference_centers) == num_clusters:
+        relabel(model, align_to_reference(model.cluster_centers_, np.asarray(reference_centers)))
+    return model, model.labels_
+
+
+# Nomes dos clusters ordenados pelo LTV médio, para que o nome não dependa do id que o KMeans sorteou. Com
+# menos clusters que nomes (k escolhido automaticamente), os nomes são espaçados do melhor ao pior segmento
+def name_clusters(labels, ltv):
+    ids = np.unique(labels)
+    medias = np.array([ltv[labels == cluster].mean() for cluster in ids])
+    ordem = ids[np.argsort(-medias, kind='stable')]
+    if 1 < len(ordem) <= len(CLUSTER_NAMES_BY_RANK):
+        posicoes = np.linspace(0, len(CLUSTER_NAMES_BY_RANK) - 1, len(ordem)).round().astype(int)
+        nomes = [CLUSTER_NAMES_BY_RANK[p] for p in posicoes]
+    else:
+        nomes = [f"Segmento {posicao + 1}" for posicao in range(len(ordem))]
+    return {int(cluster): nome for cluster, nome in zip(ordem, nomes)}
+
+
+# Quantidade de clientes por cluster (peso de cada centróide nas atualizações online)
+def cluster_counts(labels, num_clusters):
+    return np.bincount(labels, minlength=num_clusters).astype(np.float64)
+
+
+# Incorpora novos clientes aos centróides existentes sem retreinar: cada centróide vira a média
+# ponderada entre os clientes que ele já representava (`counts`) e os novos atribuídos a ele.
+# Devolve um novo modelo (o original pode estar compartilhado no cache) e as novas contagens
+def fold_in(model, counts, features):
+    X = np.asarray(features, dtype=np.float64)
+    novo = copy.deepcopy(model)
+    labels = novo.predict(features)
+
+    k, n_features = novo.cluster_centers_.shape
+    somas = np.zeros((k, n_features))
+    np.add.at(somas, labels, X)
+    novos = np.bincount(labels, minlength=k).astype(np.float64)
+
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts + novos
+    atualizados = novos > 0
+    novo.cluster_centers_ = novo.cluster_centers_.copy()
+    novo.cluster_centers_[atualizados] = (
+        counts[atualizados, None] * novo.cluster_centers_[atualizados] + somas[atualizados]
+    ) / total[atualizados, None]
+    return novo, total, labels
+
+
+# Persistência dos centróides (arrays puros, sem pickle) para warm start em outro processo
+def save_centroids(path, centers, counts, names):
+    ids = sorted(names)
+    diretorio = os.path.dirname(os.path.abspath(path))
+    os.makedirs(diretorio, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=diretorio, suffix='.npz')
+    os.close(fd)
+    np.savez(tmp_path, centers=np.asarray(centers), counts=np.asarray(counts),
+             name_ids=np.array(ids), names=np.array([names[i] for i in ids]))
+    os.replace(tmp_path, path)
+
+
+def load_centroids(path):
+    with np.load(path, allow_pickle=False) as dados:
+        names = {int(i): str(nome) for i, nome in zip(dados['name_ids'], dados['names'])}
+        return dados['centers'], dados['counts'], names
@@ -0,0 +1,187 @@
+# Cubo de agregados dos conversion values pontuados: soma e contagem por cluster x renda x localização x meio
+# de pagamento x dias desde a última transação, em arrays densos (o dataset tem poucas categorias por eixo).
+#
+# O cubo é montado uma vez depois do scoring e aceita novos clientes pontuados incrementalmente (`add`). Cada
+# cliente entra uma vez só: o cubo guarda, pelo hash de 64 bits do Customer_ID, a célula e o valor com que ele
+# entrou, e um cliente acrescentado de novo (o mesmo arquivo pontuado duas vezes, ou um cliente repontuado pelo
+# rescoring incremental) tem a contribuição antiga trocada pela nova em vez de ser contado em dobro.
+# As consultas dos filtros do app não tocam na tabela de clientes: somas prefixadas no eixo dos dias
+# respondem qualquer intervalo de datas com duas leituras, e os filtros de localização e pagamento só
+# somam células do cubo; o custo independe do número de clientes.
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from flag.ingest import INCOME_LEVEL_MAP, LOCATION_MAP
+
+CUBE_VERSION = 3
+# Último dia do eixo de dias; transações mais antigas caem nessa última posição
+MAX_DAYS = 365
+DAYS_COLUMN = 'Last_Transaction_Days_Ago'
+ID_COLUMN = 'Customer_ID'
+
+
+# Hash de 64 bits de cada Customer_ID (a chave do cliente dentro do cubo)
+def customer_keys(ids):
+    return pd.util.hash_array(np.asarray(ids, dtype=object))
+
+
+class ConversionCube:
+    # `model_key` é a chave do cache de modelos que pontuou os clientes do cubo: ids de cluster de modelos
+    # diferentes não são comparáveis, mesmo com o mesmo k
+    def __init__(self, clusters, income_levels, locations, payment_scores, max_days=MAX_DAYS, model_key=None):
+        # Eixos categóricos: códigos numéricos do df_novo (os mesmos do pipeline) na ordem do cubo
+        self.axes = {
+            'cluster_label': np.asarray(clusters, dtype=np.int64),
+            'income_level_numerico': np.asarray(income_levels, dtype=np.int64),
+            'location_numerico': np.asarray(locations, dtype=np.int64),
+            'payment_score_per_client': np.asarray(payment_scores, dtype=np.int64),
+        }
+        self.max_days = max_days
+        self.model_key = model_key
+        self.version = CUBE_VERSION
+        shape = tuple(len(valores) for valores in self.axes.values()) + (max_days + 1,)
+        self.sums = np.zeros(shape)
+        self.counts = np.zeros(shape, dtype=np.int64)
+        # Clientes já acrescentados, ordenados pela chave: célula (índice plano) e valor de cada um
+        self.customer_keys = np.empty(0, dtype=np.uint64)
+        self.customer_cells = np.empty(0, dtype=np.int64)
+        self.customer_values = np.empty(0, dtype=np.float64)
+        self._prefix = None
+
+    # Cubo vazio com os eixos dos artefatos do pipeline (clusters treinados, encodings e scores de pagamento)
+    @classmethod
+    def for_artifacts(cls, artifacts, max_days=MAX_DAYS, model_key=None):
+        return cls(range(len(artifacts['cluster_counts'])), sorted(INCOME_LEVEL_MAP.values()),
+                   sorted(LOCATION_MAP.values()), sorted(artifacts['payment_scores'].values()), max_days, model_key)
+
+    # Posição de cada código no eixo; códigos fora do eixo são erro (o cubo ficaria incompleto em silêncio)
+    def _positions(self, dimension, codes):
+        eixo = self.axes[dimension]
+        codes = np.asarray(codes, dtype=np.int64)
+        posicoes = np.searchsorted(eixo, codes)
+        posicoes = np.minimum(posicoes, len(eixo) - 1)
+        if not np.array_equal(eixo[posicoes], codes):
+            raise ValueError(f"Valores fora do cubo em {dimension!r}: {sorted(set(codes[eixo[posicoes] != codes]))}")
+        return posicoes
+
+    def _accumulate(self, celulas, values, sinal):
+        self.sums += sinal * np.bincount(celulas, weights=values, minlength=self.sums.size).reshape(self.sums.shape)
+        self.counts += sinal * np.bincount(celulas, minlength=self.counts.size).reshape(self.counts.shape)
+
+    # Acrescenta clientes pontuados: `df_novo` com o Customer_ID e as colunas dos eixos e `values` com os
+    # conversion values. Um cliente que já está no cubo tem a contribuição anterior substituída
+    def add(self, df_novo, values):
+        values = np.asarray(values, dtype=np.float64)
+        chaves = customer_keys(df_novo[ID_COLUMN].to_numpy())
+        ordem = np.argsort(chaves, kind='stable')
+        chaves = chaves[ordem]
+        if len(chaves) > 1 and (chaves[1:] == chaves[:-1]).any():
+            raise ValueError("Customer_ID repetido entre os clientes acrescentados ao cubo")
+
+        posicoes = [self._positions(dim, df_novo[dim].to_numpy()) for dim in self.axes]
+        dias = np.clip(df_novo[DAYS_COLUMN].to_numpy(dtype=np.int64), 0, self.max_days)
+        celulas = np.ravel_multi_index((*posicoes, dias), self.sums.shape)[ordem]
+        values = values[ordem]
+
+        onde = np.searchsorted(self.customer_keys, chaves)
+        existentes = onde < len(self.customer_keys)
+        existentes[existentes] = self.customer_keys[onde[existentes]] == chaves[existentes]
+        if existentes.any():
+            # Tira a contribuição antiga dos clientes que já estavam no cubo e guarda a nova no lugar dela
+            antigos = onde[existentes]
+            self._accumulate(self.customer_cells[antigos], self.customer_values[antigos], -1)
+            self.customer_cells[antigos] = celulas[existentes]
+            self.customer_values[antigos] = values[existentes]
+        novos = ~existentes
+        if novos.any():
+            self.customer_keys = np.insert(self.customer_keys, onde[novos], chaves[novos])
+            self.customer_cells = np.insert(self.customer_cells, onde[novos], celulas[novos])
+            self.customer_values = np.insert(self.customer_values, onde[novos], values[novos])
+        self._accumulate(celulas, values, 1)
+        self._prefix = None
+        return self
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    # Somas acumuladas no eixo dos dias, com um zero na frente: o intervalo [a, b] é prefix[b + 1] - prefix[a]
+    def _prefix_sums(self):
+        if self._prefix is None:
+            zeros = [(0, 0)] * (self.sums.ndim - 1) + [(1, 0)]
+            self._prefix = (np.pad(np.cumsum(self.sums, axis=-1), zeros),
+                            np.pad(np.cumsum(self.counts, axis=-1), zeros))
+        return self._prefix
+
+    # Soma, contagem e média por cluster x renda dentro dos filtros (None = sem filtro naquele eixo).
+    # `days` é o intervalo (mínimo, máximo) de dias desde a última transação, inclusivo
+    def query(self, locations=None, payment_scores=None, days=None):
+        somas, contagens = self._prefix_sums()
+        inicio, fim = (0, self.max_days) if days is None else (max(days[0], 0), min(days[1], self.max_days))
+        if inicio > fim:
+            somas = np.zeros(self.sums.shape[:-1])
+            contagens = np.zeros(self.counts.shape[:-1], dtype=np.int64)
+        else:
+            somas = somas[..., fim + 1] - somas[..., inicio]
+            contagens = contagens[..., fim + 1] - contagens[..., inicio]
+
+        for eixo, (dim, selecionados) in enumerate((('location_numerico', locations),
+                                                    ('payment_score_per_client', payment_scores)), start=2):
+            if selecionados is not None:
+                posicoes = self._positions(dim, list(selecionados))
+                somas = np.take(somas, posicoes, axis=eixo)
+                contagens = np.take(contagens, posicoes, axis=eixo)
+        somas = somas.sum(axis=(2, 3))
+        contagens = contagens.sum(axis=(2, 3))
+
+        clusters, rendas = np.nonzero(contagens)
+        return pd.DataFrame({
+            'cluster_label': self.axes['cluster_label'][clusters],
+            'income_level_numerico': self.axes['income_level_numerico'][rendas],
+            'conversion_value_sum': somas[clusters, rendas],
+            'customers': contagens[clusters, rendas],
+            'conversion_value': somas[clusters, rendas] / contagens[clusters, rendas],
+        })
+
+    # Persistência sem pickle: eixos, medidas, clientes, chave do modelo e versão do cubo num .npz. Grava num
+    # temporário no mesmo diretório e troca pelo definitivo, como o cache de modelos; o arquivo é escrito por um
+    # handle aberto, então o caminho fica exatamente o dado (o np.savez acrescentaria .npz a um caminho sem extensão)
+    def save(self, path):
+        diretorio = os.path.dirname(os.path.abspath(path))
+        os.makedirs(diretorio, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=diretorio, suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as arquivo:
+                np.savez(arquivo, max_days=self.max_days, sums=self.sums, counts=self.counts,
+                         cube_version=self.version, model_key=np.array(self.model_key or ''),
+                         customer_keys=self.customer_keys, customer_cells=self.customer_cells,
+                         customer_values=self.customer_values, **self.axes)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    # Cubos gravados antes da versão e da chave do modelo irem para o arquivo voltam com versão 0 e chave None
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as dados:
+            model_key = str(dados['model_key']) if 'model_key' in dados.files else ''
+            cube = cls(dados['cluster_label'], dados['income_level_numerico'], dados['location_numerico'],
+                       dados['payment_score_per_client'], int(dados['max_days']), model_key or None)
+            cube.version = int(dados['cube_version']) if 'cube_version' in dados.files else 0
+            cube.sums[...] = dados['sums']
+            cube.counts[...] = dados['counts']
+            if 'customer_keys' in dados.files:
+                cube.customer_keys = dados['customer_keys']
+                cube.customer_cells = dados['customer_cells']
+                cube.customer_values = dados['customer_values']
+        return cube
+
+
+# Cubo dos clientes de um df_novo já pontuado (coluna `values_column` com os conversion values)
+def build_cube(df_novo, artifacts, values_column='conversion_value', max_days=MAX_DAYS, model_key=None):
+    cube = ConversionCube.for_artifacts(artifacts, max_days, model_key)
+    return cube.add(df_novo, df_novo[values_column].to_numpy(dtype=np.float64))
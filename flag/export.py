@@ -0,0 +1,224 @@
+# Exportação dos artefatos do FLAG para um arquivo versionado e compacto, sem pickle: scaler, centróides do
+# KMeans, projeção do PCA e coeficientes dos GLMs por cluster vão como arrays num .npz, e o resto (ordem das
+# colunas, scores de pagamento, nomes dos clusters, família do GLM, diagnósticos e versões) como um JSON
+# dentro do mesmo arquivo. No backend de boosting (flag.boosting), o lugar dos GLMs fica com o modelo do
+# XGBoost no formato JSON dele, gravado como bytes.
+#
+# `load_model` devolve um dicionário com as mesmas chaves que `transform` e `predict_conversion_values` usam,
+# com equivalentes em NumPy do KMeans e do PCA: o scoring em lote (flag.batch) roda sem o treino e sem o app.
+#
+# Uso: python -m flag.export modelo.npz [--train digital_wallet_ltv_dataset.csv] [--sample-size 500000]
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from flag.glm import FAMILIES, GLMResult
+from flag.pipeline import PIPELINE_VERSION
+from flag.projection import Projection
+from flag.scoring import CONVERSION_VALUE_DIVISOR, GLM_FEATURES, model_coefficients
+
+# Versão do formato do arquivo exportado; incrementar quando o layout mudar (2: backend de boosting;
+# 3: faixa do LTV de treino de cada GLM)
+EXPORT_VERSION = 3
+
+
+# Predição do KMeans a partir dos centróides: cluster de menor distância euclidiana, com a mesma expansão
+# ||c||^2 - 2 x.c que o sklearn usa
+class Centroids:
+    def __init__(self, centers):
+        self.cluster_centers_ = np.asarray(centers, dtype=np.float64)
+        self.n_clusters = len(self.cluster_centers_)
+
+    def predict(self, X):
+        distancias = np.asarray(X, dtype=np.float64) @ (-2.0 * self.cluster_centers_.T)
+        distancias += np.einsum('ij,ij->i', self.cluster_centers_, self.cluster_centers_)
+        return distancias.argmin(axis=1).astype(np.int32)
+
+
+# Padronização do StandardScaler (média e desvio do treino)
+class Standardization:
+    def __init__(self, mean, scale, var):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+        self.var_ = np.asarray(var, dtype=np.float64)
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+# Família do GLM como dicionário serializável em JSON (e de volta)
+def _family_spec(family):
+    spec = {'name': family.name, 'link': family.link.name}
+    if hasattr(family, 'var_power'):
+        spec['var_power'] = family.var_power
+    return spec
+
+
+def _family_from_spec(spec):
+    argumentos = {'link': spec['link']}
+    if 'var_power' in spec:
+        argumentos['var_power'] = spec['var_power']
+    return FAMILIES[spec['name']](**argumentos)
+
+
+# Grava os artefatos de `fit_pipeline` em `path` (caminho ou arquivo aberto em modo binário). `model_key` é a
+# chave do cache de modelos que gerou os artefatos e `metadata` entra como está no JSON do arquivo
+def export_model(artifacts, path, model_key=None, metadata=None):
+    backend = artifacts.get('ltv_backend', 'glm')
+    info = {
+        'export_version': EXPORT_VERSION,
+        'pipeline_version': PIPELINE_VERSION,
+        'model_key': model_key,
+        'ltv_backend': backend,
+        'feature_columns': list(artifacts['feature_columns']),
+        'cluster_names': {str(cluster): nome for cluster, nome in artifacts['cluster_names'].items()},
+        'payment_scores': {str(metodo): int(score) for metodo, score in artifacts['payment_scores'].items()},
+        'conversion_value_divisor': CONVERSION_VALUE_DIVISOR,
+    }
+    arrays = {
+        'scaler_mean': artifacts['scaler'].mean_,
+        'scaler_scale': artifacts['scaler'].scale_,
+        'scaler_var': artifacts['scaler'].var_,
+        'kmeans_centers': artifacts['kmeans'].cluster_centers_,
+        'pca_components': artifacts['pca'].components_,
+        'pca_mean': artifacts['pca'].mean_,
+        'pca_explained_variance': artifacts['pca'].explained_variance_,
+        'cluster_counts': np.asarray(artifacts['cluster_counts']),
+    }
+
+    if backend == 'glm':
+        clusters = sorted(artifacts['glm_models'])
+        modelos = [artifacts['glm_models'][cluster] for cluster in clusters]
+        familias = {json.dumps(_family_spec(modelo.family), sort_keys=True) for modelo in modelos}
+        if len(familias) != 1:
+            raise ValueError("Os GLMs dos clusters precisam ter a mesma família para serem exportados")
+
+        diagnosticos = {str(cluster): {chave: valor.item() if hasattr(valor, 'item') else valor
+                                       for chave, valor in artifacts['glm_diagnostics'][cluster].items()}
+                        for cluster in clusters}
+        for cluster, modelo in zip(clusters, modelos):
+            diagnosticos[str(cluster)]['rank'] = int(modelo.rank)
+        info.update(glm_features=GLM_FEATURES, glm_family=json.loads(familias.pop()),
+                    clusters=[int(cluster) for cluster in clusters], glm_diagnostics=diagnosticos)
+        arrays['glm_params'] = np.stack([model_coefficients(modelo) for modelo in modelos])
+        # Faixa do LTV de treino de cada GLM, que limita as previsões (flag.glm.GLMResult.bound)
+        arrays['glm_support'] = np.array([getattr(modelo, 'support', None) or (-np.inf, np.inf)
+                                          for modelo in modelos], dtype=np.float64)
+    else:
+        modelo = artifacts['boosted_model']
+        info['boosting'] = {'features': modelo.features, 'best_iteration': modelo.best_iteration,
+                            'params': modelo.params}
+        arrays['boosting_model'] = np.frombuffer(bytes(modelo.booster.save_raw('json')), dtype=np.uint8)
+
+    info.update(metadata or {})
+    arrays['metadata'] = np.array(json.dumps(info, ensure_ascii=False))
+
+    if not isinstance(path, (str, os.PathLike)):
+        np.savez_compressed(path, **arrays)
+        return
+    # Grava num temporário no mesmo diretório e troca pelo definitivo, como o cache de modelos
+    diretorio = os.path.dirname(os.path.abspath(path))
+    os.makedirs(diretorio, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=diretorio, suffix='.npz')
+    os.close(fd)
+    try:
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# Metadados (JSON) de um modelo exportado, sem carregar os arrays
+def read_metadata(path):
+    with np.load(path, allow_pickle=False) as dados:
+        return json.loads(dados['metadata'].item())
+
+
+def _load_glms(info, arrays):
+    if arrays['glm_params'].shape != (len(info['clusters']), len(info['glm_features'])):
+        raise ValueError("Coeficientes e colunas dos GLMs do modelo exportado não batem")
+    familia = _family_from_spec(info['glm_family'])
+    suportes = arrays.get('glm_support', np.full((len(info['clusters']), 2), [-np.inf, np.inf]))
+    glm_models = {}
+    for cluster, params, suporte in zip(info['clusters'], arrays['glm_params'], suportes):
+        d = info['glm_diagnostics'][str(cluster)]
+        glm_models[cluster] = GLMResult(pd.Series(params, index=info['glm_features']), familia, d['deviance'],
+                                        d['llf'], d['aic'], d['scale'], d['rank'], d['n_obs'], d['iterations'],
+                                        d['converged'], (float(suporte[0]), float(suporte[1])))
+    return glm_models
+
+
+def _load_boosted(info, arrays):
+    import xgboost as xgb
+
+    from flag.boosting import BoostedLTV
+
+    booster = xgb.Booster()
+    booster.load_model(bytearray(arrays['boosting_model'].tobytes()))
+    if booster.num_features() != len(info['boosting']['features']):
+        raise ValueError("Modelo de boosting e colunas do modelo exportado não batem")
+    return BoostedLTV(booster, info['boosting']['features'], info['boosting']['best_iteration'],
+                      info['boosting']['params'])
+
+
+# Carrega um modelo exportado como artefatos prontos para `transform` e `predict_conversion_values`
+def load_model(path):
+    with np.load(path, allow_pickle=False) as dados:
+        info = json.loads(dados['metadata'].item())
+        if info['export_version'] > EXPORT_VERSION:
+            raise ValueError(f"Modelo exportado no formato {info['export_version']}; "
+                             f"esta versão do FLAG lê até o formato {EXPORT_VERSION}")
+        # Como no cache de modelos, outra versão do pipeline invalida o modelo: o encoding, o clustering e o
+        # scoring atuais podem não ser os do treino que gerou o arquivo
+        if info.get('pipeline_version') != PIPELINE_VERSION:
+            raise ValueError(f"Modelo exportado pelo pipeline versão {info.get('pipeline_version')}; esta versão "
+                             f"do FLAG pontua com o pipeline {PIPELINE_VERSION} (exporte o modelo de novo)")
+        arrays = {nome: dados[nome] for nome in dados.files if nome != 'metadata'}
+
+    if arrays['kmeans_centers'].shape[1] != len(info['feature_columns']):
+        raise ValueError("Centróides e colunas de features do modelo exportado não batem")
+    backend = info.get('ltv_backend', 'glm')
+    if backend == 'glm':
+        modelos = {'glm_models': _load_glms(info, arrays)}
+    else:
+        modelos = {'boosted_model': _load_boosted(info, arrays)}
+
+    return {
+        'ltv_backend': backend,
+        **modelos,
+        'payment_scores': info['payment_scores'],
+        'feature_columns': info['feature_columns'],
+        'scaler': Standardization(arrays['scaler_mean'], arrays['scaler_scale'], arrays['scaler_var']),
+        'kmeans': Centroids(arrays['kmeans_centers']),
+        'cluster_names': {int(cluster): nome for cluster, nome in info['cluster_names'].items()},
+        'cluster_counts': arrays['cluster_counts'],
+        'pca': Projection(arrays['pca_components'], arrays['pca_mean'], arrays['pca_explained_variance'],
+                          info['feature_columns']),
+        'metadata': info,
+    }
+
+
+def main(argv=None):
+    from flag.streaming import DEFAULT_TRAIN_PATH, fit_on_sample
+
+    parser = argparse.ArgumentParser(description='Exporta os modelos do FLAG para scoring em lote')
+    parser.add_argument('output', help='arquivo do modelo exportado (.npz)')
+    parser.add_argument('--train', default=DEFAULT_TRAIN_PATH, help='dataset com LTV usado no treino')
+    parser.add_argument('--sample-size', type=int, default=500_000, help='linhas amostradas para o treino')
+    args = parser.parse_args(argv)
+
+    artefatos, chave_modelo = fit_on_sample(args.train, args.sample_size)
+    export_model(artefatos, args.output, chave_modelo,
+                 metadata={'train_path': os.path.basename(args.train), 'sample_size': args.sample_size})
+    print(f"modelo {chave_modelo[:16]} exportado em {args.output} ({os.path.getsize(args.output):,} bytes)",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+# GLM enxuto em NumPy (IRLS) para os modelos de LTV do FLAG: família Gamma (ligação inversa, como o
+# sm.families.Gamma() usado até aqui, ou log) e Tweedie.
+#
+# Reproduz o IRLS do statsmodels (mesmo chute inicial, mesma escala de Pearson, mesmo critério de parada na
+# deviance escalada e o mesmo ajuste final por pseudo-inversa), sem o custo fixo dele por modelo: wrappers,
+# alinhamento de índices do pandas, cópias dos dados e estatísticas de resumo que o FLAG não usa. As iterações
+# resolvem as equações normais (p, p) no lugar de uma SVD (n, p) por iteração.
+# `fit_glm_batch` ajusta de uma vez vários problemas do mesmo formato (k, n, p), com álgebra linear empilhada.
+#
+# A ligação inversa da Gamma não é limitada: fora do suporte do treino o preditor linear pode chegar perto de 0
+# (previsões de dezenas de milhões) ou mudar de sinal (LTV negativo). Cada resultado guarda a faixa [mínimo,
+# máximo] do y do ajuste (`support`) e `predict` limita a média prevista a ela; todo o scoring do FLAG
+# (flag.scoring, o serviço e os modelos exportados) passa por essa mesma regra.
+import numpy as np
+import pandas as pd
+from scipy.linalg import svd
+from scipy.special import gammaln
+
+FLOAT_EPS = np.finfo(np.float64).eps
+# Autovalores da matriz de Gram equilibrada (relativos ao maior): abaixo de GRAM_NULL é colinearidade exata,
+# acima de GRAM_MIN a solução pelas equações normais é precisa. Um autovalor entre os dois deixa o problema
+# ambíguo e aquela iteração volta para a SVD
+GRAM_NULL = 1e-14
+GRAM_MIN = 1e-9
+# Corte da pseudo-inversa nas iterações (lstsq com rcond=-1 no statsmodels) e no ajuste final (pinv_extended)
+RCOND_ITERATIONS = FLOAT_EPS
+RCOND_FINAL = 1e-15
+
+
+class InversePowerLink:
+    name = 'inverse_power'
+
+    def __call__(self, mu):
+        return 1.0 / mu
+
+    def inverse(self, eta):
+        return 1.0 / eta
+
+    def deriv(self, mu):
+        return -1.0 / mu ** 2
+
+
+class LogLink:
+    name = 'log'
+
+    def __call__(self, mu):
+        return np.log(np.clip(mu, FLOAT_EPS, np.inf))
+
+    def inverse(self, eta):
+        return np.exp(eta)
+
+    def deriv(self, mu):
+        return 1.0 / mu
+
+
+LINKS = {'inverse_power': InversePowerLink, 'log': LogLink}
+
+
+# Gamma: variância mu^2, escala estimada pelo qui-quadrado de Pearson
+class Gamma:
+    name = 'gamma'
+    default_link = 'inverse_power'
+
+    def __init__(self, link=None):
+        self.link = LINKS[link or self.default_link]()
+
+    def variance(self, mu):
+        return mu ** 2
+
+    def resid_dev(self, y, mu):
+        y_mu = np.clip(y / mu, FLOAT_EPS, np.inf)
+        return 2 * ((y - mu) / mu - np.log(y_mu))
+
+    def loglike(self, y, mu, scale):
+        y_mu = np.clip(y / mu, FLOAT_EPS, np.inf)
+        peso = 1.0 / scale[..., None]
+        ll = peso * np.log(peso * y_mu) - peso * y_mu - gammaln(peso) - np.log(y)
+        return ll.sum(axis=-1)
+
+
+# Tweedie com potência da variância `var_power` (1 < p < 2 é a Poisson composta, que aceita LTV zero).
+# A verossimilhança da Tweedie não tem forma fechada: llf e AIC saem como NaN, como no uso habitual da deviance
+class Tweedie:
+    name = 'tweedie'
+    default_link = 'log'
+
+    def __init__(self, var_power=1.5, link=None):
+        self.var_power = var_power
+        self.link = LINKS[link or self.default_link]()
+
+    def variance(self, mu):
+        return np.fabs(mu) ** self.var_power
+
+    def resid_dev(self, y, mu):
+        p = self.var_power
+        if p == 1:
+            dev = np.where(y == 0, mu, y * np.log(np.where(y == 0, 1.0, y) / mu) + (mu - y))
+        elif p == 2:
+            dev = (y - mu) / mu - np.log(np.clip(y, FLOAT_EPS, np.inf) / mu)
+        else:
+            dev = y ** (2 - p) / ((1 - p) * (2 - p)) - y * mu ** (1 - p) / (1 - p) + mu ** (2 - p) / (2 - p)
+        return 2 * dev
+
+    def loglike(self, y, mu, scale):
+        return np.full(y.shape[:-1], np.nan)
+
+
+FAMILIES = {'gamma': Gamma, 'tweedie': Tweedie}
+
+
+# Resultado de um ajuste: só o que o FLAG usa (coeficientes, família/ligação, predição e diagnósticos).
+# `support` é a faixa (mínimo, máximo) do y do treino que limita as previsões (None: sem limite)
+class GLMResult:
+    def __init__(self, params, family, deviance, llf, aic, scale, rank, n_obs, iterations, converged,
+                 support=None):
+        self.params = params
+        self.family = family
+        self.deviance = deviance
+        self.llf = llf
+        self.aic = aic
+        self.scale = scale
+        self.rank = rank
+        self.n_obs = n_obs
+        self.iterations = iterations
+        self.converged = converged
+        self.support = support
+
+    def predict(self, X):
+        return self.bound(self.family.link.inverse(np.asarray(X, dtype=np.float64) @ np.asarray(self.params)))
+
+    # Limita médias previstas à faixa do y do treino
+    def bound(self, mu):
+        if self.support is None:
+            return mu
+        return np.clip(mu, self.support[0], self.support[1])
+
+
+def _deviance(family, y, mu):
+    return family.resid_dev(y, mu).sum(axis=-1)
+
+
+def _pearson_scale(family, y, mu, df_resid):
+    return ((y - mu) ** 2 / family.variance(mu)).sum(axis=-1) / df_resid
+
+
+# Mínimos quadrados ponderados pela pseudo-inversa (solução de norma mínima quando a matriz de desenho não tem
+# posto completo, como no statsmodels), pela SVD e sem formar a pseudo-inversa (p, n). Num problema único (os
+# clusters grandes) a cópia ponderada de X já nasce em ordem Fortran e a SVD trabalha sobre ela: o pico fica
+# em X, essa cópia e U, em vez das quatro matrizes (n, p) do np.linalg.pinv
+def _wls_pinv(X, z, w, rcond):
+    raiz = np.sqrt(w)
+    if X.shape[0] == 1:
+        ponderada = np.multiply(X[0], raiz[0][:, None], out=np.empty(X.shape[1:], order='F'))
+        U, valores, Vt = (m[None] for m in svd(ponderada, full_matrices=False, overwrite_a=True,
+                                                  check_finite=False))
+        del ponderada
+    else:
+        U, valores, Vt = np.linalg.svd(X * raiz[..., None], full_matrices=False)
+    grandes = valores > rcond * valores.max(axis=-1, keepdims=True)
+    inversos = np.divide(1.0, valores, out=np.zeros_like(valores), where=grandes)
+    projecao = (np.swapaxes(U, -1, -2) @ (raiz * z)[..., None])[..., 0]
+    return (np.swapaxes(Vt, -1, -2) @ (inversos * projecao)[..., None])[..., 0]
+
+
+# Mínimos quadrados ponderados das iterações pelas equações normais: X'WX é só (p, p), bem mais barato que a
+# SVD de uma matriz (n, p) a cada iteração. As colunas são equilibradas antes (diagonal unitária) para o número
+# de condição não explodir com escalas tão diferentes quanto Age e Total_Spent. O IRLS só depende de X @ beta,
+# que não muda com a componente no espaço nulo: a escolha dela fica para o ajuste final. Como a Gram eleva o
+# número de condição ao quadrado, problemas com pesos muito desiguais (autovalores ambíguos) usam a SVD
+def _wls_gram(X, z, w):
+    Xw = X * w[..., None]
+    gram = np.swapaxes(X, -1, -2) @ Xw
+    rhs = (np.swapaxes(Xw, -1, -2) @ z[..., None])[..., 0]
+    d = np.sqrt(np.diagonal(gram, axis1=-2, axis2=-1))
+    d = np.where(d > 0, d, 1.0)
+    gram = gram / (d[..., :, None] * d[..., None, :])
+    finitos = np.isfinite(gram).all(axis=(-2, -1))
+    gram[~finitos] = np.eye(gram.shape[-1])
+
+    autovalores, V = np.linalg.eigh(gram)
+    razao = autovalores / autovalores[..., -1:]
+    inversos = np.where(razao >= GRAM_MIN, 1.0 / autovalores, 0.0)
+    beta = (V @ (inversos * (np.swapaxes(V, -1, -2) @ (rhs / d)[..., None])[..., 0])[..., None])[..., 0] / d
+
+    ambiguos = ~finitos | ((razao > GRAM_NULL) & (razao < GRAM_MIN)).any(axis=-1)
+    if ambiguos.any():
+        beta[ambiguos] = _wls_pinv(X[ambiguos], z[ambiguos], w[ambiguos], RCOND_ITERATIONS)
+    return beta
+
+
+# Ajusta k GLMs do mesmo formato de uma vez: X (k, n, p) e y (k, n). Os problemas que convergem saem das
+# iterações seguintes; devolve uma lista de GLMResult na ordem de entrada
+def fit_glm_batch(X, y, family=None, feature_names=None, maxiter=100, tol=1e-8):
+    family = family or Gamma()
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    k, n, p = X.shape
+    link = family.link
+
+    rank = np.atleast_1d(np.linalg.matrix_rank(X))
+    df_resid = n - rank
+    mu = (y + y.mean(axis=1, keepdims=True)) / 2.0
+    eta = link(mu)
+    scale = _pearson_scale(family, y, mu, df_resid)
+    dev = _deviance(family, y, mu) / scale
+
+    z = np.empty_like(y)
+    w = np.empty_like(y)
+    iterations = np.zeros(k, dtype=np.int64)
+    converged = np.zeros(k, dtype=bool)
+    ativos = np.arange(k)
+    for iteracao in range(maxiter):
+        todos = len(ativos) == k
+        Xa = X if todos else X[ativos]
+        ya = y if todos else y[ativos]
+        mua = mu if todos else mu[ativos]
+
+        deriv = link.deriv(mua)
+        w[ativos] = 1.0 / (deriv ** 2 * family.variance(mua))
+        z[ativos] = (eta if todos else eta[ativos]) + deriv * (ya - mua)
+        beta = _wls_gram(Xa, z[ativos], w[ativos])
+
+        eta_a = (Xa @ beta[..., None])[..., 0]
+        mu_a = link.inverse(eta_a)
+        # Como no statsmodels: a deviance da iteração é escalada pela escala da iteração anterior
+        novo_dev = _deviance(family, ya, mu_a) / scale[ativos]
+        eta[ativos] = eta_a
+        mu[ativos] = mu_a
+        scale[ativos] = _pearson_scale(family, ya, mu_a, df_resid[ativos])
+        iterations[ativos] = iteracao + 1
+
+        convergiu = np.abs(novo_dev - dev[ativos]) <= tol
+        dev[ativos] = novo_dev
+        converged[ativos] = convergiu
+        ativos = ativos[~convergiu]
+        if not len(ativos):
+            break
+
+    # Ajuste final pela pseudo-inversa no último problema ponderado, como o WLS que o statsmodels refaz no fim
+    params = _wls_pinv(X, z, w, RCOND_FINAL)
+    mu = link.inverse((X @ params[..., None])[..., 0])
+    deviance = _deviance(family, y, mu)
+    llf = family.loglike(y, mu, scale)
+    aic = -2 * llf + 2 * rank
+
+    nomes = list(feature_names) if feature_names is not None else None
+    return [
+        GLMResult(pd.Series(params[i], index=nomes) if nomes is not None else params[i], family,
+                  float(deviance[i]), float(llf[i]), float(aic[i]), float(scale[i]), int(rank[i]), n,
+                  int(iterations[i]), bool(converged[i]), (float(y[i].min()), float(y[i].max())))
+        for i in range(k)
+    ]
+
+
+# Ajusta um único GLM: X (n, p) e y (n,)
+def fit_glm(X, y, family=None, feature_names=None, maxiter=100, tol=1e-8):
+    return fit_glm_batch(np.asarray(X)[None], np.asarray(y)[None], family, feature_names, maxiter, tol)[0]
@@ -0,0 +1,161 @@
+# Rescoring incremental do FLAG: entre dois snapshots da base de clientes, só os clientes novos ou com alguma
+# feature alterada passam de novo por encoding -> cluster -> PCA -> GLM; os demais reaproveitam o score gravado.
+#
+# A tabela pontuada (Parquet) guarda, por Customer_ID, o hash das features usadas no scoring, o cluster e o
+# conversion value, e leva nos metadados a chave do modelo que a gerou: se o modelo muda, tudo é repontuado.
+# O custo passa a acompanhar a rotatividade da base, não o tamanho dela.
+#
+# Uso: python -m flag.incremental snapshot.csv scores.parquet [--train digital_wallet_ltv_dataset.csv]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from flag.ingest import CSV_DTYPES, iter_dataset, write_chunks
+from flag.streaming import DEFAULT_CHUNKSIZE, DEFAULT_TRAIN_PATH, fit_on_sample, score_chunk
+
+# Colunas que entram no hash: tudo que o pipeline lê do cliente (o LTV é o alvo, não entra no scoring)
+FEATURE_COLUMNS = [col for col in CSV_DTYPES if col not in ('Customer_ID', 'LTV')]
+SCORE_COLUMNS = ['Customer_ID', 'feature_hash', 'cluster_label', 'conversion_value']
+MODEL_KEY_METADATA = b'flag_model_key'
+
+
+# Hash de 64 bits das features de cada linha; os tipos são normalizados antes para que o mesmo cliente lido
+# de CSV ou de Parquet tenha o mesmo hash
+def feature_hashes(df):
+    features = df[FEATURE_COLUMNS].astype({col: CSV_DTYPES[col] for col in FEATURE_COLUMNS})
+    return pd.util.hash_pandas_object(features, index=False).to_numpy()
+
+
+# Tabela pontuada anterior, se existir e tiver sido gerada pelo mesmo modelo; senão None (rescoring completo)
+def load_scores(path, model_key):
+    if not os.path.exists(path):
+        return None
+    import pyarrow.parquet as pq
+
+    metadados = pq.read_schema(path).metadata or {}
+    if metadados.get(MODEL_KEY_METADATA, b'').decode() != model_key:
+        return None
+    return pd.read_parquet(path, columns=SCORE_COLUMNS)
+
+
+# Tabela anterior em arrays (hash, cluster e conversion value, para cópia por posição) com a localização dos
+# clientes de cada bloco do snapshot. Exportações sucessivas da base costumam vir na mesma ordem: um cursor
+# compara os Customer_ID do bloco com os da mesma posição na tabela anterior e, se batem, as posições saem de
+# graça. Só quando a ordem diverge (inserções, remoções, reordenação) o índice por Customer_ID é montado e o
+# cursor volta a se alinhar depois do último cliente encontrado
+class ScoreIndex:
+    def __init__(self, previous):
+        previous = previous if previous is not None else pd.DataFrame(
+            {'Customer_ID': pd.array([], dtype='string'), 'feature_hash': np.empty(0, np.uint64),
+             'cluster_label': np.empty(0, np.int32), 'conversion_value': np.empty(0)})
+        self.ids = previous['Customer_ID'].astype('string').array
+        self.hashes = previous['feature_hash'].to_numpy()
+        self.clusters = previous['cluster_label'].to_numpy()
+        self.values = previous['conversion_value'].to_numpy()
+        self.seen = np.zeros(len(self.ids), dtype=bool)
+        self.cursor = 0
+        self._index = None
+
+    def _lookup(self, ids):
+        if self._index is None:
+            self._index = pd.Index(self.ids)
+            if not self._index.is_unique:
+                raise ValueError("Customer_ID repetido na tabela pontuada anterior")
+        return self._index.get_indexer(ids)
+
+    # Posição de cada Customer_ID na tabela anterior (-1 para clientes novos). Linhas além do fim da tabela
+    # anterior só precisam do índice se ainda faltar encontrar algum cliente antigo
+    def positions(self, ids):
+        ids = pd.array(ids, dtype='string')
+        inicio = self.cursor
+        n = min(len(ids), len(self.ids) - inicio)
+        alinhados = (self.ids[inicio:inicio + n] == ids[:n]).to_numpy(dtype=bool, na_value=False)
+        if alinhados.all():
+            posicoes = np.full(len(ids), -1, dtype=np.intp)
+            posicoes[:n] = np.arange(inicio, inicio + n)
+            self.seen[inicio:inicio + n] = True
+            if n < len(ids) and not self.seen.all():
+                posicoes[n:] = self._lookup(ids[n:])
+        else:
+            posicoes = self._lookup(ids)
+        if len(posicoes) and posicoes[-1] >= 0:
+            self.cursor = posicoes[-1] + 1
+        self.seen[posicoes[posicoes >= 0]] = True
+        return posicoes
+
+    @property
+    def removed(self):
+        return int((~self.seen).sum())
+
+
+# Pontua um bloco do snapshot: linhas com o mesmo hash do score anterior são copiadas, as demais repontuadas.
+# Devolve (bloco pontuado na ordem do snapshot, {'new': ..., 'changed': ..., 'unchanged': ...})
+def score_incremental(chunk, artifacts, index):
+    hashes = feature_hashes(chunk)
+    posicoes = index.positions(chunk['Customer_ID'])
+    existentes = posicoes >= 0
+    iguais = existentes.copy()
+    iguais[existentes] = index.hashes[posicoes[existentes]] == hashes[existentes]
+
+    clusters = np.zeros(len(chunk), dtype=np.int32)
+    valores = np.zeros(len(chunk))
+    clusters[iguais] = index.clusters[posicoes[iguais]]
+    valores[iguais] = index.values[posicoes[iguais]]
+    if not iguais.all():
+        pontuados = score_chunk(chunk[~iguais], artifacts)
+        clusters[~iguais] = pontuados['cluster_label'].to_numpy()
+        valores[~iguais] = pontuados['conversion_value'].to_numpy()
+
+    resultado = pd.DataFrame({'Customer_ID': chunk['Customer_ID'].array, 'feature_hash': hashes,
+                              'cluster_label': clusters, 'conversion_value': valores})
+    return resultado, {'new': int((~existentes).sum()), 'changed': int((existentes & ~iguais).sum()),
+                       'unchanged': int(iguais.sum())}
+
+
+# Atualiza `scores_path` (Parquet) a partir do snapshot completo da base em `snapshot_path`. Clientes que
+# sumiram do snapshot saem da tabela. Devolve as contagens de novos, alterados, inalterados e removidos
+def refresh_scores(snapshot_path, scores_path, artifacts, model_key, chunksize=DEFAULT_CHUNKSIZE, progress=None):
+    if not scores_path.endswith('.parquet'):
+        raise ValueError("A tabela pontuada do rescoring incremental precisa ser .parquet")
+    index = ScoreIndex(load_scores(scores_path, model_key))
+    stats = {'new': 0, 'changed': 0, 'unchanged': 0}
+
+    def blocos():
+        for chunk in iter_dataset(snapshot_path, chunksize):
+            pontuado, contagens = score_incremental(chunk, artifacts, index)
+            for chave, valor in contagens.items():
+                stats[chave] += valor
+            yield pontuado
+
+    write_chunks(blocos(), scores_path, progress, metadata={MODEL_KEY_METADATA: model_key.encode()})
+    stats['removed'] = index.removed
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rescoring incremental dos conversion values do FLAG')
+    parser.add_argument('snapshot', help='snapshot completo da base de clientes (CSV ou Parquet)')
+    parser.add_argument('scores', help='tabela pontuada (.parquet), atualizada no lugar')
+    parser.add_argument('--train', default=DEFAULT_TRAIN_PATH, help='dataset com LTV usado no treino')
+    parser.add_argument('--sample-size', type=int, default=500_000, help='linhas amostradas para o treino')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    artefatos, chave_modelo = fit_on_sample(args.train, args.sample_size, args.chunksize)
+    print(f"modelos prontos em {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
+
+    inicio = time.perf_counter()
+    stats = refresh_scores(args.snapshot, args.scores, artefatos, chave_modelo, args.chunksize,
+                           progress=lambda n: print(f"\r{n:,} clientes processados", end='', file=sys.stderr))
+    segundos = time.perf_counter() - inicio
+    print(f"\n{stats['new']:,} novos, {stats['changed']:,} alterados, {stats['unchanged']:,} inalterados, "
+          f"{stats['removed']:,} removidos em {segundos:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+import importlib.util
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from flag.model_cache import dataset_fingerprint
+
+DEFAULT_INGEST_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'ingest')
+
+# Categorias fixas das colunas de texto: viram `category` (códigos int8 + dicionário) em vez de strings
+CATEGORIES = {
+    'Location': ['Rural', 'Suburban', 'Urban'],
+    'Income_Level': ['Low', 'Middle', 'High'],
+    'App_Usage_Frequency': ['Monthly', 'Weekly', 'Daily'],
+    'Preferred_Payment_Method': ['Credit Card', 'Debit Card', 'UPI', 'Wallet Balance'],
+}
+
+# Tipos estreitos por coluna. Contagens e dias cabem em int16/int32; valores monetários e o LTV continuam
+# em float64 porque alimentam o KMeans (sem escala) e o GLM, e float32 mudaria os clusters de borda
+CSV_DTYPES = {
+    'Customer_ID': 'string',
+    'Age': 'int16',
+    'Total_Transactions': 'int32',
+    'Avg_Transaction_Value': 'float64',
+    'Max_Transaction_Value': 'float64',
+    'Min_Transaction_Value': 'float64',
+    'Total_Spent': 'float64',
+    'Active_Days': 'int16',
+    'Last_Transaction_Days_Ago': 'int16',
+    'Loyalty_Points_Earned': 'int32',
+    'Referral_Count': 'int16',
+    'Cashback_Received': 'float32',
+    'Support_Tickets_Raised': 'int16',
+    'Issue_Resolution_Time': 'float32',
+    'Customer_Satisfaction_Score': 'int16',
+    'LTV': 'float64',
+    **{col: pd.CategoricalDtype(categorias) for col, categorias in CATEGORIES.items()},
+}
+
+APP_USAGE_MAP = {'Daily': 30, 'Weekly': 4, 'Monthly': 1}
+INCOME_LEVEL_MAP = {'Low': 1, 'Middle': 5, 'High': 10}
+LOCATION_MAP = {'Urban': 3, 'Suburban': 2, 'Rural': 1}
+
+# Encodings numéricos pré-calculados no ingest, na ordem em que o pipeline cria essas colunas
+ENCODED_COLUMNS = {
+    'app_usage_numerico': ('App_Usage_Frequency', APP_USAGE_MAP),
+    'income_level_numerico': ('Income_Level', INCOME_LEVEL_MAP),
+    'location_numerico': ('Location', LOCATION_MAP),
+}
+
+
+# Converte uma coluna categórica num inteiro usando os códigos da categoria (sem comparar strings linha a linha)
+def encode_categorical(serie, mapping, dtype='int8'):
+    conhecidas = np.array([categoria in mapping for categoria in serie.cat.categories] + [False])
+    tabela = np.array([mapping.get(categoria, 0) for categoria in serie.cat.categories] + [0], dtype=dtype)
+    # Código -1 (valor ausente ou fora das categorias) cai na última posição das tabelas
+    codes = serie.cat.codes.to_numpy()
+    if not conhecidas[codes].all():
+        raise ValueError(f"Valores sem encoding conhecido em {serie.name!r}")
+    return tabela[codes]
+
+
+# Acrescenta as colunas numéricas derivadas das categóricas, na ordem usada pelo pipeline
+def add_encodings(df):
+    for coluna, (origem, mapping) in ENCODED_COLUMNS.items():
+        df[coluna] = encode_categorical(df[origem], mapping)
+    return df
+
+
+# Lê o CSV já com os tipos estreitos e os encodings; aceita `chunksize` para leitura em blocos
+def read_csv_typed(path, **kwargs):
+    leitura = pd.read_csv(path, dtype=CSV_DTYPES, **kwargs)
+    if 'chunksize' in kwargs or 'iterator' in kwargs:
+        return (add_encodings(bloco) for bloco in leitura)
+    return add_encodings(leitura)
+
+
+def parquet_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+# Carrega o dataset a partir de um cache Parquet; o CSV só é reprocessado quando o conteúdo dele muda
+def load_dataset(csv_path, cache_dir=DEFAULT_INGEST_DIR):
+    if not parquet_available():
+        return read_csv_typed(csv_path)
+
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    fingerprint = dataset_fingerprint(csv_path)
+    cache_path = os.path.join(cache_dir, f"{stem}-{fingerprint[:16]}.parquet")
+
+    if os.path.exists(cache_path):
+        return pd.read_parquet(cache_path)
+
+    df = read_csv_typed(csv_path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    os.close(fd)
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    # Versões antigas do mesmo arquivo não servem mais
+    for nome in os.listdir(cache_dir):
+        if nome.startswith(f"{stem}-") and nome.endswith('.parquet') and os.path.join(cache_dir, nome) != cache_path:
+            os.remove(os.path.join(cache_dir, nome))
+    return df
+
+
+# Percorre um dataset (CSV ou Parquet) em blocos de até `chunksize` linhas, sem carregar o arquivo inteiro
+def iter_dataset(path, chunksize=200_000):
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        arquivo = pq.ParquetFile(path)
+        for lote in arquivo.iter_batches(batch_size=chunksize):
+            yield lote.to_pandas()
+    else:
+        yield from read_csv_typed(path, chunksize=chunksize)
+
+
+# Amostra uniforme de `n_rows` linhas lida em blocos: cada linha recebe uma chave aleatória e ficam
+# as `n_rows` menores, então a memória é limitada pelo tamanho da amostra e não pelo do arquivo
+def sample_dataset(path, n_rows, chunksize=200_000, seed=42):
+    rng = np.random.default_rng(seed)
+    amostra = None
+    inicio = 0
+    for bloco in iter_dataset(path, chunksize):
+        bloco.index = pd.RangeIndex(inicio, inicio + len(bloco))
+        inicio += len(bloco)
+        bloco = bloco.assign(_chave=rng.random(len(bloco)))
+        amostra = bloco if amostra is None else pd.concat([amostra, bloco])
+        if len(amostra) > n_rows:
+            amostra = amostra.nsmallest(n_rows, '_chave')
+    if amostra is None:
+        raise ValueError(f"Dataset vazio: {path}")
+    # O índice é a posição da linha no arquivo: devolve a amostra na ordem original
+    return amostra.sort_index().drop(columns='_chave').reset_index(drop=True)
+
+
+# Gravação incremental em CSV ou Parquet (um row group por bloco). `metadata` (dict de strings) vai para os
+# metadados do schema do Parquet; o CSV não tem onde guardá-los
+class ChunkWriter:
+    def __init__(self, path, metadata=None):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self.metadata = metadata
+        self._arquivo = None
+        self._writer = None
+
+    def write(self, bloco):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+            if self.metadata:
+                tabela = tabela.replace_schema_metadata({**(tabela.schema.metadata or {}), **self.metadata})
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, tabela.schema)
+            self._writer.write_table(tabela)
+        else:
+            primeiro = self._arquivo is None
+            if primeiro:
+                self._arquivo = open(self.path, 'w', newline='')
+            bloco.to_csv(self._arquivo, header=primeiro, index=False)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._arquivo is not None:
+            self._arquivo.close()
+
+
+# Grava os blocos de `chunks` em `output_path` (CSV ou Parquet, pela extensão) e devolve o total de linhas.
+# Grava num arquivo temporário e só troca pelo definitivo quando tudo deu certo
+def write_chunks(chunks, output_path, progress=None, metadata=None):
+    tmp_path = f"{output_path}.tmp{os.path.splitext(output_path)[1]}"
+    writer = ChunkWriter(tmp_path, metadata)
+    total = 0
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+            total += len(chunk)
+            if progress is not None:
+                progress(total)
+    except BaseException:
+        writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    writer.close()
+    if total:
+        os.replace(tmp_path, output_path)
+    return total
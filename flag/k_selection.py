@@ -0,0 +1,195 @@
+# Escolha automática do número de clusters do FLAG. Cada k da faixa é treinado numa amostra limitada de
+# clientes (o mesmo backend de clustering do pipeline, nas mesmas features sem padronização) e avaliado por:
+#   - inércia por cliente, para o cotovelo (ponto da curva mais distante da corda entre o primeiro e o último k);
+#   - Calinski-Harabasz na amostra de treino (O(n));
+#   - silhueta em lotes pequenos sorteados da amostra (a silhueta completa é O(n²)): média e desvio dos lotes.
+# Os tamanhos das amostras são fixos, então o custo não cresce com o dataset: em 10M de linhas só o sorteio
+# dos índices e a montagem das linhas sorteadas dependem de n. Os k são avaliados em paralelo num pool de
+# processos (a amostra chega aos workers pelo initializer) e o resultado é o mesmo com qualquer número de
+# processos. `load_or_select_k` guarda a escolha no cache de modelos, indexada pelo fingerprint do dataset.
+#
+# Uso: python -m flag.k_selection [dataset.csv] [--k-min 2] [--k-max 10] [--criterion elbow] [--processes 4]
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from flag.clustering import make_clusterer
+from flag.model_cache import cache_key, dataset_fingerprint, default_cache
+from flag.pipeline import encode_features, feature_columns, fit_payment_scores
+from flag.scoring import design_columns, take_rows
+
+# Versão da seleção de k; incrementar quando as métricas ou a regra mudarem (faz parte da chave do cache)
+K_SELECTION_VERSION = 1
+CRITERIA = ('elbow', 'silhouette', 'calinski_harabasz')
+DEFAULT_K_VALUES = tuple(range(2, 11))
+# Clientes usados para treinar o clustering de cada k
+FIT_SAMPLE_ROWS = 100_000
+# Lotes da silhueta: cada lote custa SILHOUETTE_BATCH_ROWS² distâncias por k
+SILHOUETTE_BATCH_ROWS = 4_000
+SILHOUETTE_BATCHES = 4
+
+# Amostra do processo atual (no worker, entregue pelo initializer do pool)
+_amostra = None
+
+
+# Índices posicionais ordenados de `size` linhas sorteadas sem reposição (todas, se n <= size)
+def sample_indices(n, size, seed=42):
+    if n <= size:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(seed).choice(n, size, replace=False))
+
+
+# k no cotovelo da curva de inércia: o ponto mais distante (abaixo) da reta entre o primeiro e o último k
+def elbow_k(k_values, inertia):
+    k_values = np.asarray(k_values, dtype=np.float64)
+    inertia = np.asarray(inertia, dtype=np.float64)
+    if len(k_values) < 3 or inertia[0] == inertia[-1]:
+        return int(k_values[0])
+    x = (k_values - k_values[0]) / (k_values[-1] - k_values[0])
+    y = (inertia - inertia[-1]) / (inertia[0] - inertia[-1])
+    return int(k_values[np.argmax((1 - x) - y)])
+
+
+def _iniciar_worker(amostra, threads):
+    from threadpoolctl import threadpool_limits
+
+    global _amostra
+    threadpool_limits(threads)
+    _amostra = amostra
+
+
+# Executado no worker (ou em série): treina o clustering de um k na amostra e calcula as métricas
+def _evaluate_k(k, backend, random_state, silhouette_rows, silhouette_batches):
+    from sklearn.metrics import calinski_harabasz_score, silhouette_score
+
+    inicio = time.perf_counter()
+    X = _amostra
+    modelo = make_clusterer(backend, k, random_state).fit(X)
+    labels = modelo.labels_
+
+    rng = np.random.default_rng(random_state + k)
+    silhuetas = []
+    for _ in range(silhouette_batches):
+        lote = rng.choice(len(X), min(silhouette_rows, len(X)), replace=False)
+        if len(np.unique(labels[lote])) > 1:
+            silhuetas.append(silhouette_score(X[lote], labels[lote]))
+    return {
+        'k': k,
+        'inertia': float(modelo.inertia_ / len(X)),
+        'silhouette': float(np.mean(silhuetas)) if silhuetas else np.nan,
+        'silhouette_std': float(np.std(silhuetas)) if silhuetas else np.nan,
+        'calinski_harabasz': float(calinski_harabasz_score(X, labels)) if len(np.unique(labels)) > 1 else np.nan,
+        'seconds': time.perf_counter() - inicio,
+    }
+
+
+# Avalia os k de `k_values` numa amostra de `fit_rows` linhas de X (matriz ou lista de colunas, sem padronizar,
+# como o pipeline usa) e escolhe um pelo `criterion`. Devolve um dict com 'k', 'criterion', 'elbow_k',
+# 'scores' (DataFrame indexado por k), tamanhos das amostras e 'seconds'
+def select_k(X, k_values=DEFAULT_K_VALUES, criterion='elbow', backend='kmeans', random_state=42,
+             fit_rows=FIT_SAMPLE_ROWS, silhouette_rows=SILHOUETTE_BATCH_ROWS, silhouette_batches=SILHOUETTE_BATCHES,
+             processes=None):
+    if criterion not in CRITERIA:
+        raise ValueError(f"Critério de escolha de k desconhecido: {criterion!r} (use um de {CRITERIA})")
+    inicio = time.perf_counter()
+    n = len(X) if isinstance(X, np.ndarray) else len(X[0])
+    k_values = sorted(int(k) for k in k_values if 2 <= k < min(n, fit_rows))
+    if not k_values:
+        raise ValueError("Nenhum k avaliável: a faixa precisa de 2 <= k < linhas da amostra")
+    amostra = take_rows(X, sample_indices(n, fit_rows, random_state))
+
+    global _amostra
+    tarefas = [(k, backend, random_state, silhouette_rows, silhouette_batches) for k in k_values]
+    processes = processes or os.cpu_count() or 1
+    if processes > 1 and len(tarefas) > 1:
+        workers = min(processes, len(tarefas))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker,
+                                 initargs=(amostra, threads)) as pool:
+            # Maiores k primeiro: são os treinos mais longos
+            futuros = {tarefa[0]: pool.submit(_evaluate_k, *tarefa) for tarefa in reversed(tarefas)}
+            resultados = [futuros[k].result() for k in k_values]
+    else:
+        _amostra = amostra
+        try:
+            resultados = [_evaluate_k(*tarefa) for tarefa in tarefas]
+        finally:
+            _amostra = None
+
+    scores = pd.DataFrame(resultados).set_index('k')
+    cotovelo = elbow_k(scores.index, scores['inertia'])
+    if criterion == 'elbow':
+        escolhido = cotovelo
+    else:
+        # Maior valor do critério; empate fica com o menor k
+        escolhido = int(scores[criterion].idxmax())
+    return {
+        'k': escolhido,
+        'criterion': criterion,
+        'elbow_k': cotovelo,
+        'scores': scores,
+        'fit_rows': len(amostra),
+        'silhouette_rows': min(silhouette_rows, len(amostra)),
+        'silhouette_batches': silhouette_batches,
+        'seconds': time.perf_counter() - inicio,
+    }
+
+
+# Seleção de k direto do dataset (formato do flag.ingest): a amostra é sorteada antes do encoding, então só as
+# linhas sorteadas viram matriz float64
+def select_k_frame(df, fit_rows=FIT_SAMPLE_ROWS, random_state=42, **kwargs):
+    linhas = df.iloc[sample_indices(len(df), fit_rows, random_state)]
+    df_novo = encode_features(linhas, fit_payment_scores(linhas))
+    return select_k(design_columns(df_novo, feature_columns(df_novo)), fit_rows=fit_rows, random_state=random_state,
+                    **kwargs)
+
+
+# Escolha de k do cache de modelos (indexada pelo fingerprint do dataset e pelos parâmetros da seleção) ou
+# calculada e guardada. O app e os treinos fora dele (flag.streaming.fit_on_sample) usam a mesma chave, então
+# treinam com o mesmo k. `df` (ou uma função que o devolve, chamada só sem a escolha no cache) evita reler o
+# dataset quando quem chama já o tem carregado
+def load_or_select_k(dataset_path, df=None, cache=None, **kwargs):
+    from flag.ingest import load_dataset
+
+    cache = cache or default_cache()
+    parametros = {**kwargs, 'k_values': list(kwargs.get('k_values', DEFAULT_K_VALUES))}
+    chave = cache_key(dataset_fingerprint(dataset_path), parametros, version=f"selecao-k-{K_SELECTION_VERSION}")
+
+    def selecionar():
+        dados = load_dataset(dataset_path) if df is None else df() if callable(df) else df
+        return select_k_frame(dados, **kwargs)
+
+    return cache.get_or_fit(chave, selecionar)
+
+
+def main(argv=None):
+    from flag.streaming import DEFAULT_TRAIN_PATH
+
+    parser = argparse.ArgumentParser(description='Escolha automática do número de clusters do FLAG')
+    parser.add_argument('dataset', nargs='?', default=DEFAULT_TRAIN_PATH)
+    parser.add_argument('--k-min', type=int, default=DEFAULT_K_VALUES[0])
+    parser.add_argument('--k-max', type=int, default=DEFAULT_K_VALUES[-1])
+    parser.add_argument('--criterion', choices=CRITERIA, default='elbow')
+    parser.add_argument('--backend', choices=('kmeans', 'minibatch'), default='kmeans')
+    parser.add_argument('--fit-rows', type=int, default=FIT_SAMPLE_ROWS)
+    parser.add_argument('--silhouette-rows', type=int, default=SILHOUETTE_BATCH_ROWS)
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from flag.ingest import load_dataset
+
+    selecao = select_k_frame(load_dataset(args.dataset), k_values=range(args.k_min, args.k_max + 1),
+                             criterion=args.criterion, backend=args.backend, fit_rows=args.fit_rows,
+                             silhouette_rows=args.silhouette_rows, processes=args.processes)
+    print(f"k = {selecao['k']} ({selecao['criterion']}; cotovelo em {selecao['elbow_k']}) em "
+          f"{selecao['seconds']:.1f}s, amostra de {selecao['fit_rows']:,} linhas", file=sys.stderr)
+    print(selecao['scores'].to_string(float_format=lambda v: f"{v:.4g}"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+# Cache dos artefatos do FLAG: o cache genérico (cache_modelos, reexportado aqui) com o diretório e a instância
+# única do pacote, e o treino sob demanda indexado pelo fingerprint do dataset
+import os
+import threading
+
+from cache_modelos import ModelCache, cache_key, dataset_fingerprint
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'flag_models')
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+# Instância única do processo: como o módulo é importado uma vez, ela sobrevive aos reruns do Streamlit
+def default_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ModelCache(os.environ.get('FLAG_CACHE_DIR', DEFAULT_CACHE_DIR))
+        return _default_cache
+
+
+# Carrega os artefatos do pipeline FLAG do cache ou treina e guarda, se ainda não existirem
+def load_or_fit(dataset_path, hyperparameters, fit, cache=None, version=None):
+    cache = cache or default_cache()
+    key = cache_key(dataset_fingerprint(dataset_path), hyperparameters, version)
+    return cache.get_or_fit(key, fit), key
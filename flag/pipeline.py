@@ -0,0 +1,282 @@
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+from sklearn.preprocessing import StandardScaler
+
+from flag.clustering import cluster_counts, fit_clusters, name_clusters
+from flag.ingest import APP_USAGE_MAP, INCOME_LEVEL_MAP, LOCATION_MAP, encode_categorical
+from flag.projection import fit_projection, project
+from flag.scoring import GLM_FEATURES, design_columns, take_rows
+from flag.training import fit_glm_groups
+from perfil import etapa
+
+
+# Versão do formato dos artefatos; incrementar quando o treino mudar para não reaproveitar caches antigos
+PIPELINE_VERSION = 11
+
+# Hiperparâmetros padrão do pipeline (também fazem parte da chave do cache de modelos)
+DEFAULT_HYPERPARAMETERS = {'num_clusters': 5, 'random_state': 42, 'n_components': 2, 'clustering_backend': 'kmeans',
+                           'ltv_backend': 'glm', 'pca_solver': 'exact'}
+
+# Modelos de LTV: um GLM Gamma por cluster ou um único gradient boosting com o cluster como feature (flag.boosting)
+LTV_BACKENDS = ('glm', 'xgboost')
+
+# Colunas de texto do dataset original, substituídas pelos encodings numéricos no df_novo
+CATEGORICAL_COLUMNS = ['App_Usage_Frequency', 'Income_Level', 'Location', 'Preferred_Payment_Method']
+# Colunas do df_novo que não entram no KMeans nem no PCA (identificador, alvo e colunas derivadas)
+NON_FEATURE_COLUMNS = ['Customer_ID', 'LTV', 'cluster_label', 'PCA_1', 'PCA_2', 'const', 'conversion_value']
+# Linhas por bloco nas etapas que não precisam de todas as linhas de uma vez (scaler e `transform`): os
+# temporários float64 dessas etapas ficam limitados pelo bloco, e não pelo tamanho do dataset
+CHUNK_ROWS = 1_000_000
+
+
+# Score por método de pagamento: o método com maior LTV médio recebe a maior nota
+def fit_payment_scores(df):
+    ltv_mean_by_payment = df.groupby("Preferred_Payment_Method", observed=True)["LTV"].mean().reset_index()
+    ltv_mean_by_payment = ltv_mean_by_payment.sort_values(by="LTV", ascending=False).reset_index(drop=True)
+    ltv_mean_by_payment["payment_score"] = range(len(ltv_mean_by_payment), 0, -1)
+    return dict(zip(ltv_mean_by_payment['Preferred_Payment_Method'], ltv_mean_by_payment['payment_score']))
+
+
+# Converte as colunas categóricas do dataset original nas versões numéricas usadas pelos modelos
+# (datasets vindos de flag.ingest já trazem app_usage/income_level/location codificados). O df_novo não copia
+# o df: as colunas numéricas são as mesmas (copy-on-write do pandas) e só os encodings ocupam memória nova
+def encode_features(df, payment_scores):
+    colunas = {col: df[col] for col in df.columns if col not in CATEGORICAL_COLUMNS}
+    if 'app_usage_numerico' not in colunas:
+        colunas['app_usage_numerico'] = df['App_Usage_Frequency'].map(APP_USAGE_MAP)
+    if 'income_level_numerico' not in colunas:
+        colunas['income_level_numerico'] = df['Income_Level'].map(INCOME_LEVEL_MAP)
+    if 'location_numerico' not in colunas:
+        colunas['location_numerico'] = df['Location'].map(LOCATION_MAP)
+
+    pagamento = df['Preferred_Payment_Method']
+    if isinstance(pagamento.dtype, pd.CategoricalDtype):
+        colunas['payment_score_per_client'] = encode_categorical(pagamento, payment_scores)
+    else:
+        colunas['payment_score_per_client'] = pagamento.map(payment_scores)
+    return pd.DataFrame(colunas, index=df.index, copy=False)
+
+
+# Colunas de entrada do KMeans e do PCA (tudo exceto identificador, alvo e colunas derivadas)
+def feature_columns(df_novo):
+    return [col for col in df_novo.columns if col not in NON_FEATURE_COLUMNS]
+
+
+# As mesmas colunas como DataFrame (seleção sem cópia)
+def model_features(df_novo):
+    return df_novo[feature_columns(df_novo)]
+
+
+# Matriz float64 (C-contígua) das features, montada coluna a coluna a partir dos tipos estreitos do df_novo;
+# é o formato que o scaler, o KMeans e o PCA usam sem converter de novo. `columns` fixa a ordem do treino
+# (artifacts['feature_columns']), para o scoring não depender da ordem das colunas do arquivo pontuado
+def feature_matrix(df_novo, columns=None):
+    columns = feature_columns(df_novo) if columns is None else columns
+    faltando = [col for col in columns if col not in df_novo]
+    if faltando:
+        raise KeyError(f"Colunas ausentes para o clustering: {faltando}")
+    return take_rows(design_columns(df_novo, columns))
+
+
+# Mede o tempo de parede de uma etapa do treino e guarda em `timings[name]`
+# (e registra a etapa no perfil do app quando ele está ligado)
+@contextmanager
+def timed_stage(timings, name):
+    inicio = time.perf_counter()
+    try:
+        with etapa(f"flag:{name}"):
+            yield
+    finally:
+        timings[name] = time.perf_counter() - inicio
+
+
+# Ajusta um único GLM Gamma por cluster e tira dele coeficientes, AIC, métricas de erro e previsões in-sample.
+# Os clusters são ajustados em paralelo (flag.training) quando há volume para isso; `processes` limita o pool
+def fit_cluster_glms(df_novo, timings=None, processes=None):
+    timings = {} if timings is None else timings
+
+    with timed_stage(timings, 'glm_partition'):
+        # Colunas da matriz de desenho direto do df_novo; os clusters são só índices posicionais sobre elas e
+        # cada ajuste monta em float64 apenas as linhas do seu cluster
+        X_all = design_columns(df_novo)
+        y_all = df_novo['LTV'].to_numpy(dtype=np.float64)
+        groups = df_novo.groupby('cluster_label', sort=True).indices
+
+    cluster_metrics = {}
+    evaluation_metrics = {}
+
+    with timed_stage(timings, 'glm_fit'):
+        # Selecionando uma distribuição para o GLM (Gamma geralmente é adequada para valores contínuos como o LTV)
+        glm_models, glm_diagnostics, in_sample_predictions = fit_glm_groups(X_all, y_all, groups, GLM_FEATURES,
+                                                                            processes=processes)
+
+    with timed_stage(timings, 'glm_metrics'):
+        for cluster, idx in groups.items():
+            y = y_all[idx]
+            predictions = in_sample_predictions[idx]
+
+            cluster_metrics[cluster] = {
+                "AIC": glm_diagnostics[cluster]['aic'],
+                "Pseudo R-squared": None,
+                "Coefficients": glm_models[cluster].params
+            }
+
+            # Cálculo de métricas de erro
+            mse = mean_squared_error(y, predictions)
+            evaluation_metrics[cluster] = {
+                "MAE": mean_absolute_error(y, predictions),
+                "MSE": mse,
+                "RMSE": np.sqrt(mse)
+            }
+
+    return {
+        'glm_models': glm_models,
+        'glm_diagnostics': glm_diagnostics,
+        'cluster_metrics': cluster_metrics,
+        'evaluation_metrics': evaluation_metrics,
+        'in_sample_predictions': in_sample_predictions,
+    }
+
+
+# Alternativa aos GLMs: um único gradient boosting (flag.boosting) nas colunas dos GLMs mais o cluster, com as
+# mesmas métricas de erro por cluster. `processes` limita as threads do treino
+def fit_boosted_ltv(df_novo, timings=None, params=None, random_state=42, processes=None):
+    from flag.boosting import BOOSTING_FEATURES, fit_boosted
+
+    timings = {} if timings is None else timings
+
+    with timed_stage(timings, 'boosting_fit'):
+        y_all = df_novo['LTV'].to_numpy(dtype=np.float64)
+        boosted_model = fit_boosted(design_columns(df_novo, BOOSTING_FEATURES), y_all, BOOSTING_FEATURES, params,
+                                    random_state, processes)
+
+    with timed_stage(timings, 'boosting_metrics'):
+        in_sample_predictions = boosted_model.predict_frame(df_novo)
+        evaluation_metrics = {}
+        for cluster, idx in df_novo.groupby('cluster_label', sort=True).indices.items():
+            mse = mean_squared_error(y_all[idx], in_sample_predictions[idx])
+            evaluation_metrics[cluster] = {
+                "MAE": mean_absolute_error(y_all[idx], in_sample_predictions[idx]),
+                "MSE": mse,
+                "RMSE": np.sqrt(mse)
+            }
+
+    return {
+        'boosted_model': boosted_model,
+        'feature_importance': boosted_model.feature_importance(),
+        'cluster_metrics': {},
+        'evaluation_metrics': evaluation_metrics,
+        'in_sample_predictions': in_sample_predictions,
+    }
+
+
+# Treina todo o pipeline do FLAG: encoders, scaler, clustering, PCA e o modelo de LTV (`ltv_backend`: um GLM por
+# cluster ou o gradient boosting, com `boosting_parameters` sobre os padrões de flag.boosting).
+# `pca_solver` escolhe o ajuste da projeção (flag.projection: 'exact', 'randomized' ou 'incremental') e
+# `projection` reaproveita componentes já ajustados (flag.projection.load_projection) sem ajustar de novo.
+# `num_clusters='auto'` escolhe o k numa amostra das features (flag.k_selection, registrado em 'k_selection').
+# `init_centers` faz warm start do clustering a partir de centróides salvos; `reference_centers`
+# mantém os ids dos clusters iguais aos de um treino anterior; `processes` limita o pool dos GLMs
+def fit_pipeline(df, num_clusters=5, random_state=42, n_components=2, clustering_backend='kmeans',
+                 init_centers=None, reference_centers=None, processes=None, ltv_backend='glm',
+                 boosting_parameters=None, pca_solver='exact', projection=None):
+    if ltv_backend not in LTV_BACKENDS:
+        raise ValueError(f"Backend de LTV desconhecido: {ltv_backend!r} (use um de {LTV_BACKENDS})")
+
+    timings = {}
+
+    with timed_stage(timings, 'encoding'):
+        payment_scores = fit_payment_scores(df)
+        df_novo = encode_features(df, payment_scores)
+        # Uma única matriz das features para scaler, PCA e clustering
+        colunas = feature_columns(df_novo)
+        features = feature_matrix(df_novo, colunas)
+
+    selecao_k = None
+    if num_clusters == 'auto':
+        from flag.k_selection import select_k
+
+        with timed_stage(timings, 'k_selection'):
+            selecao_k = select_k(features, backend=clustering_backend, random_state=random_state,
+                                 processes=processes)
+        num_clusters = selecao_k['k']
+
+    with timed_stage(timings, 'scaler'):
+        scaler = StandardScaler()
+        for inicio in range(0, len(features), CHUNK_ROWS):
+            scaler.partial_fit(features[inicio:inicio + CHUNK_ROWS])  # normalizando
+
+    with timed_stage(timings, 'pca'):
+        if projection is None:
+            pca = fit_projection(features, pca_solver, n_components, random_state)
+            # A ordem das colunas acompanha a projeção, para ela poder ser reaproveitada em outro treino
+            pca.feature_columns_ = list(colunas)
+        else:
+            colunas_projecao = getattr(projection, 'feature_columns_', None)
+            if colunas_projecao is None:
+                raise ValueError("A projeção reaproveitada não registra as colunas de features com que foi "
+                                 "ajustada (use flag.projection.load_projection)")
+            if list(colunas_projecao) != list(colunas) or projection.components_.shape[1] != features.shape[1]:
+                raise ValueError(f"A projeção reaproveitada foi ajustada com outras colunas de features: "
+                                 f"{list(colunas_projecao)} != {list(colunas)}")
+            pca = projection
+        pca_components = project(pca, features)
+
+    with timed_stage(timings, 'kmeans'):
+        # Último uso das features: o KMeans pode centralizá-las no próprio array em vez de copiá-las
+        kmeans, labels = fit_clusters(features, clustering_backend, num_clusters, random_state,
+                                      init_centers=init_centers, reference_centers=reference_centers, copy_x=False)
+        del features
+        df_novo['cluster_label'] = labels
+        cluster_names = name_clusters(labels, df_novo['LTV'].to_numpy())
+
+    with timed_stage(timings, 'cluster_summary'):
+        resumidas = [col for col in df_novo.columns if col not in ('Customer_ID', 'cluster_label')]
+        cluster_summary = df_novo.groupby('cluster_label')[resumidas].agg(['mean', 'median', 'std'])
+        cluster_summary.columns = ['_'.join(col).strip() for col in cluster_summary.columns.values]
+
+    df_novo['PCA_1'] = pca_components[:, 0]
+    df_novo['PCA_2'] = pca_components[:, 1]
+
+    if ltv_backend == 'glm':
+        # Os antigos `cluster_models` e `glm_models` usavam exatamente as mesmas colunas (só em outra ordem),
+        # então um único ajuste por cluster basta para o scoring e para as métricas
+        ltv_stage = fit_cluster_glms(df_novo, timings, processes)
+    else:
+        ltv_stage = fit_boosted_ltv(df_novo, timings, boosting_parameters, random_state, processes)
+
+    return {
+        'payment_scores': payment_scores,
+        'feature_columns': colunas,
+        'scaler': scaler,
+        'kmeans': kmeans,
+        'cluster_names': cluster_names,
+        'cluster_counts': cluster_counts(labels, num_clusters),
+        'k_selection': selecao_k,
+        'pca': pca,
+        'cluster_summary': cluster_summary,
+        'timings': timings,
+        'ltv_backend': ltv_backend,
+        **ltv_stage,
+    }
+
+
+# Aplica os artefatos já treinados a um dataset: encoding, cluster, projeção PCA e constante. Cluster e PCA
+# rodam em blocos de `chunksize` linhas, então a matriz float64 das features não cresce com o dataset
+def transform(df, artifacts, chunksize=CHUNK_ROWS):
+    df_novo = encode_features(df, artifacts['payment_scores'])
+    labels = np.empty(len(df_novo), dtype=np.int32)
+    pca_components = np.empty((len(df_novo), artifacts['pca'].n_components_))
+    for inicio in range(0, len(df_novo), chunksize):
+        features = feature_matrix(df_novo.iloc[inicio:inicio + chunksize], artifacts['feature_columns'])
+        labels[inicio:inicio + len(features)] = artifacts['kmeans'].predict(features)
+        pca_components[inicio:inicio + len(features)] = artifacts['pca'].transform(features)
+    df_novo['cluster_label'] = labels
+    df_novo['PCA_1'] = pca_components[:, 0]
+    df_novo['PCA_2'] = pca_components[:, 1]
+    df_novo['const'] = np.ones(len(df_novo), dtype=np.int8)
+    return df_novo
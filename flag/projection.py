@@ -0,0 +1,195 @@
+# Projeção PCA do FLAG (PCA_1/PCA_2, entrada dos GLMs e do boosting) com três solvers:
+#   - 'exact': o PCA do scikit-learn. Com poucas features e muitas linhas ele já resolve pela matriz de
+#     covariância (svd_solver 'covariance_eigh'), sem decompor a matriz de clientes;
+#   - 'randomized': SVD randomizado do scikit-learn, que compensa em tabelas largas (muitas features);
+#   - 'incremental': covariância acumulada bloco a bloco (média e dispersão combinadas como no algoritmo de
+#     Chan), decomposta no fim. É exata como o 'exact', mas a memória do ajuste é O(features²) mais um bloco,
+#     então os componentes podem ser aprendidos de um arquivo lido em blocos (ou de uma amostra dele) que não
+#     cabe na memória.
+# A aplicação é sempre em blocos (`project`), e os componentes ajustados podem ser gravados e reaproveitados
+# em outro treino (`save_projection`/`load_projection`, arrays + JSON sem pickle, e `fit_pipeline(projection=)`).
+#
+# Uso: python -m flag.projection clientes.parquet projecao.npz [--sample-fraction 0.1] [--chunksize 200000]
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SOLVERS = ('exact', 'randomized', 'incremental')
+# Linhas por bloco no ajuste incremental e na aplicação da projeção
+CHUNK_ROWS = 1_000_000
+
+
+# Projeção do PCA (sem whitening), na mesma ordem de operações do `PCA.transform` do sklearn.
+# `feature_columns` é a ordem das colunas de entrada com que ela foi ajustada (None se desconhecida)
+class Projection:
+    def __init__(self, components, mean, explained_variance, feature_columns=None):
+        self.components_ = np.asarray(components, dtype=np.float64)
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.explained_variance_ = np.asarray(explained_variance, dtype=np.float64)
+        self.n_components_ = len(self.components_)
+        self.feature_columns_ = list(feature_columns) if feature_columns is not None else None
+
+    def transform(self, X):
+        projetado = np.asarray(X, dtype=np.float64) @ self.components_.T
+        projetado -= self.mean_[None, :] @ self.components_.T
+        return projetado
+
+
+# PCA exato por covariância acumulada em blocos: `partial_fit` combina média e dispersão de cada bloco com as
+# já acumuladas; os componentes saem da decomposição da covariância, com o mesmo sinal que o sklearn escolhe
+# (a maior coordenada em módulo de cada componente é positiva)
+class StreamingPCA(Projection):
+    def __init__(self, n_components=2):
+        super().__init__(np.empty((0, 0)), np.empty(0), np.empty(0))
+        self.n_components = n_components
+        self.n_components_ = n_components
+        self.n_samples_seen_ = 0
+        self._dispersao = None
+
+    def partial_fit(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return self
+        n_bloco = len(X)
+        media_bloco = X.mean(axis=0)
+        centrado = X - media_bloco
+        dispersao_bloco = centrado.T @ centrado
+        if self.n_samples_seen_ == 0:
+            self.mean_, self._dispersao = media_bloco, dispersao_bloco
+        else:
+            total = self.n_samples_seen_ + n_bloco
+            delta = media_bloco - self.mean_
+            self._dispersao = (self._dispersao + dispersao_bloco
+                               + np.outer(delta, delta) * (self.n_samples_seen_ * n_bloco / total))
+            self.mean_ = self.mean_ + delta * (n_bloco / total)
+        self.n_samples_seen_ += n_bloco
+        self._decompor()
+        return self
+
+    def fit(self, X, chunksize=CHUNK_ROWS):
+        for inicio in range(0, len(X), chunksize):
+            self.partial_fit(X[inicio:inicio + chunksize])
+        return self
+
+    def _decompor(self):
+        autovalores, autovetores = np.linalg.eigh(self._dispersao / max(self.n_samples_seen_ - 1, 1))
+        ordem = np.argsort(autovalores)[::-1][:self.n_components]
+        componentes = autovetores[:, ordem].T
+        maiores = np.argmax(np.abs(componentes), axis=1)
+        componentes *= np.sign(componentes[np.arange(len(componentes)), maiores])[:, None]
+        self.components_ = componentes
+        self.explained_variance_ = np.clip(autovalores[ordem], 0.0, None)
+
+
+# Ajusta a projeção nas features (matriz float64 das features do pipeline) com o solver escolhido
+def fit_projection(features, solver='exact', n_components=2, random_state=42, chunksize=CHUNK_ROWS):
+    if solver == 'incremental':
+        return StreamingPCA(n_components).fit(features, chunksize)
+    from sklearn.decomposition import PCA
+
+    if solver == 'exact':
+        return PCA(n_components=n_components).fit(features)
+    if solver == 'randomized':
+        return PCA(n_components=n_components, svd_solver='randomized', random_state=random_state).fit(features)
+    raise ValueError(f"Solver de PCA desconhecido: {solver!r} (use um de {SOLVERS})")
+
+
+# Aplica a projeção em blocos de `chunksize` linhas (o temporário do transform fica limitado pelo bloco)
+def project(projection, features, chunksize=CHUNK_ROWS):
+    saida = np.empty((len(features), projection.n_components_))
+    for inicio in range(0, len(features), chunksize):
+        saida[inicio:inicio + chunksize] = projection.transform(features[inicio:inicio + chunksize])
+    return saida
+
+
+# Aprende a projeção de um arquivo de clientes lido em blocos, com o encoding do treino (`payment_scores` e a
+# ordem das colunas `columns`); `sample_fraction` < 1 usa só uma amostra aleatória das linhas de cada bloco e
+# `max_rows` para depois das primeiras linhas do arquivo. Devolve (projeção, colunas de entrada)
+def fit_projection_stream(path, payment_scores, columns=None, n_components=2, sample_fraction=1.0,
+                          chunksize=200_000, seed=42, max_rows=None):
+    from flag.ingest import iter_dataset
+    from flag.pipeline import encode_features, feature_columns, feature_matrix
+
+    rng = np.random.default_rng(seed)
+    projecao = StreamingPCA(n_components)
+    lidas = 0
+    for bloco in iter_dataset(path, chunksize):
+        if max_rows is not None:
+            if lidas >= max_rows:
+                break
+            bloco = bloco.iloc[:max_rows - lidas]
+        lidas += len(bloco)
+        if sample_fraction < 1.0:
+            bloco = bloco[rng.random(len(bloco)) < sample_fraction]
+        df_novo = encode_features(bloco, payment_scores)
+        if columns is None:
+            columns = feature_columns(df_novo)
+        projecao.partial_fit(feature_matrix(df_novo, columns))
+    projecao.feature_columns_ = list(columns)
+    return projecao, columns
+
+
+# Grava os componentes ajustados (e a ordem das colunas de entrada) para reaproveitar em outro treino
+def save_projection(path, projection, feature_columns, metadata=None):
+    info = {'feature_columns': list(feature_columns),
+            'n_samples_seen': int(getattr(projection, 'n_samples_seen_', 0)), **(metadata or {})}
+    diretorio = os.path.dirname(os.path.abspath(path))
+    os.makedirs(diretorio, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=diretorio, suffix='.npz')
+    os.close(fd)
+    try:
+        np.savez(tmp_path, components=projection.components_, mean=projection.mean_,
+                 explained_variance=projection.explained_variance_, metadata=np.array(json.dumps(info)))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# (projeção, colunas de entrada, metadados) de um arquivo gravado por `save_projection`
+def load_projection(path):
+    with np.load(path, allow_pickle=False) as dados:
+        info = json.loads(dados['metadata'].item())
+        projecao = Projection(dados['components'], dados['mean'], dados['explained_variance'],
+                              info['feature_columns'])
+    if projecao.components_.shape[1] != len(info['feature_columns']):
+        raise ValueError("Componentes e colunas da projeção gravada não batem")
+    return projecao, info['feature_columns'], info
+
+
+def main(argv=None):
+    import pandas as pd
+
+    from flag.ingest import iter_dataset
+    from flag.pipeline import fit_payment_scores
+
+    parser = argparse.ArgumentParser(description='Aprende a projeção PCA do FLAG de um arquivo lido em blocos')
+    parser.add_argument('input', help='arquivo de clientes com LTV (CSV ou Parquet)')
+    parser.add_argument('output', help='arquivo da projeção (.npz)')
+    parser.add_argument('--n-components', type=int, default=2)
+    parser.add_argument('--sample-fraction', type=float, default=1.0)
+    parser.add_argument('--chunksize', type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    # Primeira passada só com as duas colunas dos scores de pagamento (LTV médio por método)
+    pagamentos = pd.concat([bloco[['Preferred_Payment_Method', 'LTV']]
+                            for bloco in iter_dataset(args.input, args.chunksize)], ignore_index=True)
+    payment_scores = fit_payment_scores(pagamentos)
+    del pagamentos
+    projecao, colunas = fit_projection_stream(args.input, payment_scores, n_components=args.n_components,
+                                              sample_fraction=args.sample_fraction, chunksize=args.chunksize)
+    save_projection(args.output, projecao, colunas,
+                    metadata={'payment_scores': {str(k): int(v) for k, v in payment_scores.items()},
+                              'sample_fraction': args.sample_fraction})
+    print(f"projeção de {projecao.n_samples_seen_:,} linhas gravada em {args.output} "
+          f"em {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
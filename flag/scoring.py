@@ -0,0 +1,88 @@
+import numpy as np
+
+# Colunas usadas pelos GLMs de cada cluster, na mesma ordem do treino
+GLM_FEATURES = ['const', 'PCA_1', 'PCA_2', 'Age', 'Total_Transactions',
+                'Avg_Transaction_Value', 'Max_Transaction_Value', 'Min_Transaction_Value',
+                'Total_Spent', 'Active_Days', 'Last_Transaction_Days_Ago',
+                'Loyalty_Points_Earned', 'Referral_Count', 'Cashback_Received',
+                'Support_Tickets_Raised', 'Issue_Resolution_Time',
+                'Customer_Satisfaction_Score', 'app_usage_numerico',
+                'income_level_numerico', 'location_numerico', 'payment_score_per_client']
+
+
+# O app exibe o LTV previsto dividido por este fator como conversion value para VBB
+CONVERSION_VALUE_DIVISOR = 50
+
+
+# Coeficientes do modelo alinhados com a ordem das colunas da matriz de desenho
+def model_coefficients(model, features=GLM_FEATURES):
+    params = model.params
+    if hasattr(params, 'reindex'):
+        params = params.reindex(features)
+        if params.isna().any():
+            faltando = list(params.index[params.isna()])
+            raise KeyError(f"Modelo sem coeficientes para as colunas: {faltando}")
+    return np.asarray(params, dtype=np.float64)
+
+
+# Colunas da matriz de desenho direto do DataFrame, sem copiá-lo (arrays 1-D nos tipos estreitos do working
+# set); uma coluna ausente (a constante) vira uns sem ocupar memória
+def design_columns(data, features=GLM_FEATURES):
+    return [data[col].to_numpy() if col in data else np.broadcast_to(np.float64(1.0), len(data))
+            for col in features]
+
+
+# Monta em float64 só as linhas `rows` (todas, com None) de uma matriz de desenho dada como lista de colunas
+# (ou já como matriz (n, p)); `out` recebe o resultado no lugar, por exemplo um memmap
+def take_rows(X, rows=None, out=None):
+    if isinstance(X, np.ndarray):
+        return np.take(X, rows, axis=0, out=out) if rows is not None else np.asarray(X, dtype=np.float64)
+    if out is None:
+        out = np.empty((len(X[0]) if rows is None else len(rows), len(X)))
+    for j, coluna in enumerate(X):
+        out[:, j] = coluna if rows is None else coluna[rows]
+    return out
+
+
+# Calcula a média prevista do GLM (inversa da função de ligação) para uma matriz de desenho, limitada à faixa
+# do LTV de treino do modelo (flag.glm.GLMResult.bound)
+def predict_mean(model, X, features=GLM_FEATURES):
+    eta = X @ model_coefficients(model, features)
+    mu = model.family.link.inverse(eta)
+    return model.bound(mu) if hasattr(model, 'bound') else mu
+
+
+# Previsões em lote: agrupa as linhas por cluster e faz uma única multiplicação de matriz por cluster.
+# A matriz de desenho em float64 só existe para um cluster de cada vez. `glm_models` também pode ser o modelo
+# de boosting (flag.boosting.BoostedLTV), que pontua todas as linhas de uma vez
+def predict_conversion_values(data, glm_models, features=GLM_FEATURES, cluster_column='cluster_label'):
+    if not isinstance(glm_models, dict):
+        return glm_models.predict_frame(data)
+    missing = [col for col in features if col not in data]
+    if missing:
+        raise KeyError(f"Colunas ausentes para o scoring: {missing}")
+    colunas = design_columns(data, features)
+    predicted = np.full(len(data), np.nan)
+
+    # Índices posicionais de cada cluster, calculados uma única vez
+    for cluster, idx in data.groupby(cluster_column, sort=False).indices.items():
+        if cluster not in glm_models:
+            raise KeyError(f"Nenhum modelo treinado para o cluster {cluster!r}")
+        predicted[idx] = predict_mean(glm_models[cluster], take_rows(colunas, idx), features)
+
+    return predicted
+
+
+# Modelo de LTV dos artefatos no formato de `predict_conversion_values`: os GLMs por cluster ou o modelo de
+# boosting, conforme o backend do treino
+def ltv_models(artifacts):
+    if artifacts.get('ltv_backend', 'glm') == 'glm':
+        return artifacts['glm_models']
+    return artifacts['boosted_model']
+
+
+# Função para aplicar previsões usando os modelos GLM por cluster (ou o modelo de boosting)
+def apply_predictions(data, glm_models):
+    # Mantém a ordem original das linhas em `conversion_value`
+    data['conversion_value'] = predict_conversion_values(data, glm_models)
+    return data
@@ -0,0 +1,345 @@
+# Serviço HTTP local de scoring do FLAG: conversion value por cliente no momento da conversão, não só no
+# gráfico do app. Um único processo asyncio carrega os artefatos uma vez (modelo exportado por flag.export ou
+# treino na amostra padrão) e junta as requisições concorrentes em micro-lotes: enquanto um lote é pontuado,
+# as requisições que chegam esperam na fila e saem todas juntas na próxima multiplicação de matriz.
+#
+# O caminho de cada lote é NumPy puro (RecordScorer): os registros JSON viram direto a matriz de features, sem
+# montar DataFrame; o pandas custaria alguns ms fixos por lote, mais que o orçamento de latência inteiro.
+#
+# Endpoints (HTTP/1.1 com keep-alive, corpo JSON):
+#   POST /score   um cliente ({...}) ou vários ([{...}, ...] ou {"customers": [...]}), com os campos do dataset
+#   GET  /health  estado, chave do modelo e estatísticas dos micro-lotes
+#
+# Uso: python -m flag.service [modelo.npz] [--port 8765] [--max-batch 256] [--max-wait-ms 0]
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import numpy as np
+
+from flag.ingest import CSV_DTYPES, ENCODED_COLUMNS
+from flag.scoring import CONVERSION_VALUE_DIVISOR, GLM_FEATURES, model_coefficients
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH = 256
+# Tamanho máximo do corpo aceito (bytes); um lote grande de clientes cabe com folga
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+# Scoring de registros (dicionários com os campos do dataset) direto em NumPy, com os mesmos passos de
+# `transform` + `predict_conversion_values`: encodings, tipos estreitos do ingest (os float32 do treino são
+# arredondados igual), cluster, PCA e o GLM do cluster de cada linha (ou o modelo de boosting, flag.boosting)
+class RecordScorer:
+    def __init__(self, artifacts):
+        self.kmeans = artifacts['kmeans']
+        self.pca = artifacts['pca']
+        self.columns = list(artifacts['feature_columns'])
+
+        codificadas = {coluna: (origem, mapping) for coluna, (origem, mapping) in ENCODED_COLUMNS.items()}
+        codificadas['payment_score_per_client'] = ('Preferred_Payment_Method', artifacts['payment_scores'])
+        # (coluna, coluna de origem e mapeamento para encodings, dtype do ingest para as numéricas)
+        self._extratores = [(coluna, *codificadas[coluna], None) if coluna in codificadas
+                            else (coluna, None, None, np.dtype(CSV_DTYPES.get(coluna, 'float64')))
+                            for coluna in self.columns]
+
+        self.boosted = artifacts['boosted_model'] if artifacts.get('ltv_backend', 'glm') != 'glm' else None
+        if self.boosted is None:
+            clusters = sorted(artifacts['glm_models'])
+            familias = {type(artifacts['glm_models'][c].family) for c in clusters}
+            if len(familias) != 1:
+                raise ValueError("Os GLMs dos clusters precisam ter a mesma família")
+            self.family = artifacts['glm_models'][clusters[0]].family
+            self._params = np.stack([model_coefficients(artifacts['glm_models'][c]) for c in clusters])
+            # Faixa do LTV de treino de cada GLM, a mesma que limita o scoring em lote (flag.glm.GLMResult.bound)
+            self._support = np.array([getattr(artifacts['glm_models'][c], 'support', None) or (-np.inf, np.inf)
+                                      for c in clusters], dtype=np.float64)
+            # Linha de `_params` de cada id de cluster do KMeans (-1 para cluster sem GLM)
+            self._linha = np.full(len(self.kmeans.cluster_centers_), -1, dtype=np.intp)
+            self._linha[clusters] = np.arange(len(clusters))
+
+        # Origem de cada coluna da matriz de desenho do modelo: constante, cluster, componente do PCA ou feature
+        self._desenho = []
+        for nome in GLM_FEATURES if self.boosted is None else self.boosted.features:
+            if nome == 'const':
+                self._desenho.append(('const', None))
+            elif nome == 'cluster_label':
+                self._desenho.append(('cluster', None))
+            elif nome.startswith('PCA_'):
+                self._desenho.append(('pca', int(nome[4:]) - 1))
+            elif nome in self.columns:
+                self._desenho.append(('feature', self.columns.index(nome)))
+            else:
+                raise ValueError(f"Coluna do modelo sem origem no scoring: {nome!r}")
+
+    # Matriz float64 (n, features) dos registros; campo ausente, categoria desconhecida ou valor não finito (null
+    # do JSON vira NaN) é ValueError
+    def matrix(self, records):
+        X = np.empty((len(records), len(self.columns)))
+        for j, (coluna, origem, mapping, dtype) in enumerate(self._extratores):
+            try:
+                if mapping is None:
+                    X[:, j] = np.asarray([r[coluna] for r in records], dtype=dtype)
+                else:
+                    X[:, j] = [r[coluna] if coluna in r else mapping[r[origem]] for r in records]
+            except KeyError as erro:
+                raise ValueError(f"Campo ausente ou valor desconhecido para {coluna!r}: {erro}") from None
+            except (TypeError, ValueError, OverflowError) as erro:
+                raise ValueError(f"Valor inválido em {coluna!r}: {erro}") from None
+            invalidos = np.flatnonzero(~np.isfinite(X[:, j]))
+            if len(invalidos):
+                raise ValueError(f"Valor ausente ou não finito em {coluna!r} "
+                                 f"(cliente {int(invalidos[0])} da requisição)")
+        return X
+
+    # (clusters, conversion values já divididos por CONVERSION_VALUE_DIVISOR) das linhas de X
+    def score(self, X):
+        labels = self.kmeans.predict(X)
+        componentes = self.pca.transform(X)
+        desenho = np.empty((len(X), len(self._desenho)))
+        for j, (origem, posicao) in enumerate(self._desenho):
+            if origem == 'const':
+                desenho[:, j] = 1.0
+            elif origem == 'cluster':
+                desenho[:, j] = labels
+            elif origem == 'pca':
+                desenho[:, j] = componentes[:, posicao]
+            else:
+                desenho[:, j] = X[:, posicao]
+        if self.boosted is not None:
+            return labels, self.boosted.predict(desenho) / CONVERSION_VALUE_DIVISOR
+        linhas = self._linha[labels]
+        if (linhas < 0).any():
+            raise ValueError("Cluster sem GLM treinado")
+        eta = np.einsum('ij,ij->i', desenho, self._params[linhas])
+        mu = np.clip(self.family.link.inverse(eta), self._support[linhas, 0], self._support[linhas, 1])
+        return labels, mu / CONVERSION_VALUE_DIVISOR
+
+
+# Junta as requisições pendentes num lote: cada requisição entra com a sua matriz de features e recebe de volta
+# a sua fatia dos resultados. O lote sai assim que a fila esvazia (o tempo de pontuar o lote anterior já
+# acumula requisições), ou depois de `max_wait` segundos se isso for configurado
+class MicroBatcher:
+    def __init__(self, scorer, max_batch=DEFAULT_MAX_BATCH, max_wait=0.0):
+        self.scorer = scorer
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.stats = {'requests': 0, 'rows': 0, 'batches': 0, 'max_batch_rows': 0}
+        self._fila = asyncio.Queue()
+        self._tarefa = None
+
+    def start(self):
+        self._tarefa = asyncio.get_running_loop().create_task(self._executar())
+
+    async def stop(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, X):
+        futuro = asyncio.get_running_loop().create_future()
+        self._fila.put_nowait((X, futuro))
+        return await futuro
+
+    def _drenar(self, lote, linhas):
+        while linhas < self.max_batch and not self._fila.empty():
+            lote.append(self._fila.get_nowait())
+            linhas += len(lote[-1][0])
+        return linhas
+
+    async def _executar(self):
+        while True:
+            lote = [await self._fila.get()]
+            # Uma volta no event loop para as conexões com dados prontos entrarem na fila
+            await asyncio.sleep(0)
+            linhas = self._drenar(lote, len(lote[0][0]))
+            if self.max_wait > 0 and linhas < self.max_batch:
+                await asyncio.sleep(self.max_wait)
+                linhas = self._drenar(lote, linhas)
+            self._pontuar(lote, linhas)
+
+    def _pontuar(self, lote, linhas):
+        self.stats['requests'] += len(lote)
+        self.stats['rows'] += linhas
+        self.stats['batches'] += 1
+        self.stats['max_batch_rows'] = max(self.stats['max_batch_rows'], linhas)
+        try:
+            labels, valores = self.scorer.score(np.concatenate([X for X, _ in lote]))
+        except Exception:
+            # Um registro ruim não derruba as outras requisições do lote: cada uma é pontuada sozinha e só a que
+            # falhar recebe o erro
+            for X, futuro in lote:
+                if futuro.done():
+                    continue
+                try:
+                    futuro.set_result(self.scorer.score(X))
+                except Exception as erro:
+                    futuro.set_exception(erro)
+            return
+        inicio = 0
+        for X, futuro in lote:
+            fim = inicio + len(X)
+            if not futuro.done():
+                futuro.set_result((labels[inicio:fim], valores[inicio:fim]))
+            inicio = fim
+
+
+class ScoringService:
+    def __init__(self, artifacts, model_key=None, max_batch=DEFAULT_MAX_BATCH, max_wait=0.0):
+        self.model_key = model_key
+        self.scorer = RecordScorer(artifacts)
+        self.batcher = MicroBatcher(self.scorer, max_batch, max_wait)
+        self._servidor = None
+        self._inicio = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.batcher.start()
+        self._servidor = await asyncio.start_server(self._atender, host, port)
+        self._inicio = time.monotonic()
+        return self._servidor.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    async def stop(self):
+        self._servidor.close()
+        await self._servidor.wait_closed()
+        await self.batcher.stop()
+
+    # Corpo JSON -> lista de registros e se a resposta é de um cliente só
+    @staticmethod
+    def _registros(corpo):
+        dados = json.loads(corpo)
+        if isinstance(dados, dict) and 'customers' in dados:
+            dados = dados['customers']
+        if isinstance(dados, dict):
+            return [dados], True
+        if isinstance(dados, list) and dados and all(isinstance(r, dict) for r in dados):
+            return dados, False
+        raise ValueError("Esperado um cliente (objeto JSON) ou uma lista não vazia de clientes")
+
+    async def _score(self, corpo):
+        try:
+            registros, unico = self._registros(corpo)
+            X = self.scorer.matrix(registros)
+        except ValueError as erro:
+            return 400, {'error': str(erro)}
+        labels, valores = await self.batcher.submit(X)
+        scores = [{'Customer_ID': r.get('Customer_ID'), 'cluster_label': int(c), 'conversion_value': float(v)}
+                  for r, c, v in zip(registros, labels, valores)]
+        return 200, scores[0] if unico else {'scores': scores}
+
+    def _health(self):
+        return 200, {'status': 'ok', 'model_key': self.model_key,
+                     'uptime_s': round(time.monotonic() - self._inicio, 3), **self.batcher.stats}
+
+    async def _rotear(self, metodo, caminho, corpo):
+        caminho = caminho.split('?', 1)[0]
+        if caminho == '/score':
+            return await self._score(corpo) if metodo == 'POST' else (405, {'error': 'use POST'})
+        if caminho == '/health':
+            return self._health() if metodo == 'GET' else (405, {'error': 'use GET'})
+        return 404, {'error': f"rota desconhecida: {caminho}"}
+
+    # Uma conexão HTTP/1.1: requisições em sequência enquanto o cliente mantiver o keep-alive
+    async def _atender(self, reader, writer):
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                try:
+                    metodo, caminho, versao = linha.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    cabecalho = await reader.readline()
+                    if cabecalho in (b'\r\n', b'\n', b''):
+                        break
+                    nome, _, valor = cabecalho.decode('latin-1').partition(':')
+                    headers[nome.strip().lower()] = valor.strip()
+
+                try:
+                    tamanho = int(headers.get('content-length') or 0)
+                except ValueError:
+                    tamanho = -1
+                if tamanho < 0:
+                    # Sem um tamanho válido não dá para saber onde o corpo termina: responde e fecha a conexão
+                    status, resposta = 400, {'error': f"Content-Length inválido: {headers['content-length']!r}"}
+                    manter = False
+                elif tamanho > MAX_BODY_BYTES:
+                    status, resposta = 413, {'error': f"corpo acima de {MAX_BODY_BYTES} bytes"}
+                    manter = False
+                else:
+                    corpo = await reader.readexactly(tamanho) if tamanho else b''
+                    try:
+                        status, resposta = await self._rotear(metodo, caminho, corpo)
+                    except Exception as erro:
+                        status, resposta = 500, {'error': f"{type(erro).__name__}: {erro}"}
+                    conexao = headers.get('connection', '').lower()
+                    manter = conexao != 'close' and (versao == 'HTTP/1.1' or conexao == 'keep-alive')
+
+                conteudo = json.dumps(resposta).encode()
+                writer.write(f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(conteudo)}\r\n"
+                             f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n".encode() + conteudo)
+                await writer.drain()
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+# Artefatos do serviço: o modelo exportado em `model_path` ou, sem ele, o treino na amostra padrão (com cache)
+def load_artifacts(model_path=None, train_path=None, sample_size=500_000):
+    if model_path:
+        from flag.export import load_model
+
+        artefatos = load_model(model_path)
+        return artefatos, artefatos['metadata'].get('model_key')
+    from flag.streaming import DEFAULT_TRAIN_PATH, fit_on_sample
+
+    return fit_on_sample(train_path or DEFAULT_TRAIN_PATH, sample_size)
+
+
+async def _servir(service, host, port):
+    endereco = await service.start(host, port)
+    print(f"FLAG scoring em http://{endereco[0]}:{endereco[1]} (modelo {str(service.model_key)[:16]})",
+          file=sys.stderr, flush=True)
+    await service.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serviço HTTP local de scoring do FLAG')
+    parser.add_argument('model', nargs='?', help='modelo exportado com `python -m flag.export` (.npz)')
+    parser.add_argument('--train', help='sem modelo exportado: dataset com LTV usado no treino')
+    parser.add_argument('--sample-size', type=int, default=500_000, help='linhas amostradas para o treino')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH, help='linhas máximas por lote')
+    parser.add_argument('--max-wait-ms', type=float, default=0.0,
+                        help='espera extra para encher o lote (0: sai assim que a fila esvazia)')
+    args = parser.parse_args(argv)
+
+    artefatos, chave = load_artifacts(args.model, args.train, args.sample_size)
+    service = ScoringService(artefatos, chave, args.max_batch, args.max_wait_ms / 1000)
+    try:
+        asyncio.run(_servir(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# Scoring out-of-core do FLAG: aplica os artefatos já treinados bloco a bloco e grava o resultado
+# incrementalmente, para arquivos de clientes que não cabem na memória
+#
+# Uso: python -m flag.streaming clientes.csv scores.csv [--train digital_wallet_ltv_dataset.csv] [--cube cubo.npz]
+#      (--cube acrescenta os clientes pontuados ao cubo de agregados do arquivo, criando-o se não existir; um
+#      cubo gravado por outro modelo ou outra versão do cubo é recusado, porque os ids de cluster não batem)
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from flag.cube import CUBE_VERSION, ConversionCube
+from flag.ingest import iter_dataset, sample_dataset, write_chunks
+from flag.model_cache import load_or_fit
+from flag.pipeline import DEFAULT_HYPERPARAMETERS, PIPELINE_VERSION, fit_pipeline, transform
+from flag.scoring import CONVERSION_VALUE_DIVISOR, ltv_models, predict_conversion_values
+
+DEFAULT_TRAIN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'digital_wallet_ltv_dataset.csv')
+DEFAULT_CHUNKSIZE = 200_000
+
+
+# Encoding -> cluster -> PCA -> GLM (ou boosting) para um bloco de clientes; com `cube`, o bloco também entra no cubo
+def score_chunk(chunk, artifacts, cube=None):
+    df_novo = transform(chunk, artifacts)
+    valores = predict_conversion_values(df_novo, ltv_models(artifacts)) / CONVERSION_VALUE_DIVISOR
+    if cube is not None:
+        cube.add(df_novo, valores)
+    return pd.DataFrame({
+        'Customer_ID': chunk['Customer_ID'].to_numpy(),
+        'cluster_label': df_novo['cluster_label'].to_numpy(),
+        'conversion_value': valores,
+    })
+
+
+# Pontua `input_path` inteiro em blocos de `chunksize` linhas e grava em `output_path`;
+# o pico de memória depende do tamanho do bloco, não do arquivo
+def score_file(input_path, output_path, artifacts, chunksize=DEFAULT_CHUNKSIZE, progress=None, cube=None):
+    chunks = (score_chunk(chunk, artifacts, cube) for chunk in iter_dataset(input_path, chunksize))
+    return write_chunks(chunks, output_path, progress)
+
+
+# Artefatos treinados numa amostra do arquivo de treino (reaproveitados do cache de modelos quando possível),
+# com o k escolhido para o arquivo como no app (flag.k_selection.load_or_select_k, a mesma entrada do cache);
+# devolve (artefatos, chave do cache de modelos)
+def fit_on_sample(train_path, sample_size, chunksize=DEFAULT_CHUNKSIZE):
+    from flag.k_selection import load_or_select_k
+
+    amostra = []
+
+    # A amostra só é lida se a escolha de k ou o modelo não estiverem no cache, e no máximo uma vez
+    def carregar_amostra():
+        if not amostra:
+            amostra.append(sample_dataset(train_path, sample_size, chunksize))
+        return amostra[0]
+
+    hiperparametros = dict(DEFAULT_HYPERPARAMETERS)
+    selecao_k = load_or_select_k(train_path, carregar_amostra, backend=hiperparametros['clustering_backend'])
+    hiperparametros['num_clusters'] = selecao_k['k']
+    chave = {**hiperparametros, 'sample_size': sample_size}
+    return load_or_fit(train_path, chave, lambda: fit_pipeline(carregar_amostra(), **hiperparametros),
+                       version=PIPELINE_VERSION)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scoring em blocos dos conversion values do FLAG')
+    parser.add_argument('input', help='arquivo de clientes (CSV ou Parquet)')
+    parser.add_argument('output', help='arquivo de saída (.csv ou .parquet)')
+    parser.add_argument('--train', default=DEFAULT_TRAIN_PATH, help='dataset com LTV usado no treino')
+    parser.add_argument('--sample-size', type=int, default=500_000, help='linhas amostradas para o treino')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--cube', help='cubo de agregados (.npz) atualizado com os clientes pontuados')
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    artefatos, chave_modelo = fit_on_sample(args.train, args.sample_size, args.chunksize)
+    print(f"modelos prontos em {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
+
+    cubo = None
+    if args.cube and os.path.exists(args.cube):
+        cubo = ConversionCube.load(args.cube)
+        if cubo.version != CUBE_VERSION or cubo.model_key != chave_modelo:
+            parser.error(f"o cubo {args.cube} (versão {cubo.version}, modelo {str(cubo.model_key)[:16]}) não é do "
+                         f"modelo atual (versão {CUBE_VERSION}, modelo {str(chave_modelo)[:16]}); use outro arquivo "
+                         f"de cubo ou apague este para recriá-lo")
+    elif args.cube:
+        cubo = ConversionCube.for_artifacts(artefatos, model_key=chave_modelo)
+
+    inicio = time.perf_counter()
+    total = score_file(args.input, args.output, artefatos, args.chunksize,
+                       progress=lambda n: print(f"\r{n:,} clientes pontuados", end='', file=sys.stderr), cube=cubo)
+    segundos = time.perf_counter() - inicio
+    print(f"\n{total:,} clientes em {segundos:.1f}s ({total / max(segundos, 1e-9):,.0f}/s)", file=sys.stderr)
+    if cubo is not None:
+        cubo.save(args.cube)
+        print(f"cubo com {cubo.total:,} clientes gravado em {args.cube}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
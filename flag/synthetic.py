@@ -0,0 +1,190 @@
+# Gerador de clientes sintéticos no schema do digital_wallet_ltv_dataset.csv, para testar o FLAG em escala.
+#
+# O gerador é ajustado no arquivo real. As colunas livres (idade, contagens, dias, categorias, ...) seguem uma
+# cópula gaussiana: correlação dos normal scores + marginais empíricas de cada coluna. As colunas derivadas
+# seguem as relações do próprio arquivo: Total_Spent = Total_Transactions * Avg_Transaction_Value, máximo e
+# mínimo como múltiplos do valor médio (razões amostradas na cópula) e o LTV como regressão linear das
+# demais colunas numéricas, com o resíduo reamostrado.
+#
+# Uso: python -m flag.synthetic clientes_10M.parquet --rows 10000000 [--chunksize 1000000] [--seed 42]
+#      (o formato sai da extensão: .csv ou .parquet; a memória depende do bloco, não do total de linhas)
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from flag.ingest import CATEGORIES, CSV_DTYPES, load_dataset, write_chunks
+
+DEFAULT_SOURCE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   'digital_wallet_ltv_dataset.csv')
+DEFAULT_CHUNKSIZE = 1_000_000
+# Clientes por sub-bloco no sorteio da cópula (buffer de normais pequeno o bastante para ficar em cache)
+SUBBLOCK = 16_384
+
+# Colunas calculadas a partir das outras (não entram na cópula)
+DERIVED_COLUMNS = ('Total_Spent', 'Max_Transaction_Value', 'Min_Transaction_Value', 'LTV')
+# Razões amostradas na cópula no lugar do máximo e do mínimo (garantem mínimo <= médio <= máximo)
+RATIO_COLUMNS = {'max_ratio': 'Max_Transaction_Value', 'min_ratio': 'Min_Transaction_Value'}
+
+
+# Marginal empírica de uma coluna: discreta (inteiros e categorias, amostra os valores observados com as
+# frequências observadas) ou contínua (interpolação linear entre as estatísticas de ordem)
+def _fit_marginal(values, discrete):
+    values = np.asarray(values, dtype=np.float64)
+    if discrete:
+        uniques, counts = np.unique(values, return_counts=True)
+        return {'discrete': True, 'values': uniques, 'cdf': np.cumsum(counts) / counts.sum()}
+    return {'discrete': False, 'values': np.sort(values)}
+
+
+def _inverse_cdf(marginal, u):
+    values = marginal['values']
+    if marginal['discrete']:
+        idx = np.searchsorted(marginal['cdf'], u, side='right')
+        return values[np.minimum(idx, len(values) - 1)]
+    probs = (np.arange(len(values)) + 0.5) / len(values)
+    return np.interp(u, probs, values)
+
+
+# Normal scores de uma coluna: posto médio (empates divididos) levado à normal padrão
+def _normal_scores(values):
+    ranks = pd.Series(values).rank(method='average').to_numpy()
+    return ndtri((ranks - 0.5) / len(ranks))
+
+
+# Matriz de correlação positiva definida mais próxima (autovalores negativos por arredondamento viram ~0)
+def _positive_definite(corr, floor=1e-8):
+    w, v = np.linalg.eigh(corr)
+    corr = (v * np.maximum(w, floor)) @ v.T
+    d = np.sqrt(np.diag(corr))
+    return corr / np.outer(d, d)
+
+
+# Gerador ajustado: `sample` devolve um bloco de clientes com os mesmos tipos do flag.ingest
+class CustomerGenerator:
+    def __init__(self, columns, copula_columns, marginals, correlation, ltv_regressors, ltv_coefficients,
+                 ltv_residuals, ltv_min):
+        self.columns = list(columns)
+        self.copula_columns = list(copula_columns)
+        self.marginals = marginals
+        self.correlation = correlation
+        self.cholesky = np.linalg.cholesky(correlation)
+        self.ltv_regressors = list(ltv_regressors)
+        self.ltv_coefficients = ltv_coefficients
+        self.ltv_residuals = ltv_residuals
+        self.ltv_min = ltv_min
+
+    # `n_rows` clientes com ids a partir de `start_id`; `id_width` fixa os dígitos do Customer_ID
+    # (o gerador de arquivos usa a largura do total para os ids ficarem ordenáveis)
+    def sample(self, n_rows, rng=None, start_id=0, id_width=4):
+        rng = np.random.default_rng(rng)
+        # Uma linha por coluna da cópula: cada coluna fica contígua na memória para a inversa da marginal.
+        # As normais independentes são sorteadas em sub-blocos reaproveitando o mesmo buffer, sem uma
+        # segunda matriz do tamanho do bloco inteiro
+        u = np.empty((len(self.copula_columns), n_rows))
+        buffer = np.empty((len(self.copula_columns), min(n_rows, SUBBLOCK)))
+        for inicio in range(0, n_rows, SUBBLOCK):
+            fim = min(inicio + SUBBLOCK, n_rows)
+            z = buffer[:, :fim - inicio] if fim - inicio == buffer.shape[1] else np.empty((len(u), fim - inicio))
+            rng.standard_normal(out=z)
+            np.matmul(self.cholesky, z, out=u[:, inicio:fim])
+        ndtr(u, out=u)
+
+        valores = {col: _inverse_cdf(self.marginals[col], u[j]) for j, col in enumerate(self.copula_columns)}
+        del u
+        media = valores['Avg_Transaction_Value']
+        valores['Total_Spent'] = valores['Total_Transactions'] * media
+        for razao, coluna in RATIO_COLUMNS.items():
+            valores[coluna] = media * valores.pop(razao)
+
+        ltv = _inverse_cdf({'discrete': False, 'values': self.ltv_residuals}, rng.random(n_rows))
+        ltv += self.ltv_coefficients[0]
+        for coef, col in zip(self.ltv_coefficients[1:], self.ltv_regressors):
+            ltv += coef * valores[col]
+        # O Gamma do GLM só aceita LTV positivo: a cauda abaixo do menor LTV observado é truncada nele
+        valores['LTV'] = np.maximum(ltv, self.ltv_min, out=ltv)
+
+        df = pd.DataFrame(index=pd.RangeIndex(n_rows))
+        for col in self.columns:
+            if col == 'Customer_ID':
+                df[col] = pd.array([f"cust_{i:0{id_width}d}" for i in range(start_id, start_id + n_rows)],
+                                   dtype=CSV_DTYPES[col])
+            elif col in CATEGORIES:
+                df[col] = pd.Categorical.from_codes(valores[col].astype(np.int8), dtype=CSV_DTYPES[col])
+            else:
+                df[col] = valores[col].astype(CSV_DTYPES[col])
+        return df
+
+
+# Ajusta o gerador num dataset com o schema do digital_wallet_ltv_dataset.csv (como o de flag.ingest)
+def fit_generator(df):
+    columns = [col for col in df.columns if col in CSV_DTYPES]
+    livres = [col for col in columns if col != 'Customer_ID' and col not in DERIVED_COLUMNS]
+
+    dados = {}
+    marginals = {}
+    for col in livres:
+        if col in CATEGORIES:
+            dados[col] = df[col].cat.codes.to_numpy()
+            discreta = True
+        else:
+            dados[col] = df[col].to_numpy(dtype=np.float64)
+            discreta = np.dtype(CSV_DTYPES[col]).kind == 'i'
+        marginals[col] = _fit_marginal(dados[col], discreta)
+    media = df['Avg_Transaction_Value'].to_numpy(dtype=np.float64)
+    for razao, coluna in RATIO_COLUMNS.items():
+        dados[razao] = df[coluna].to_numpy(dtype=np.float64) / media
+        marginals[razao] = _fit_marginal(dados[razao], False)
+
+    copula_columns = livres + list(RATIO_COLUMNS)
+    scores = np.column_stack([_normal_scores(dados[col]) for col in copula_columns])
+    correlation = _positive_definite(np.corrcoef(scores, rowvar=False))
+
+    # LTV ~ todas as colunas numéricas (livres e derivadas), por mínimos quadrados
+    regressors = [col for col in columns if col not in CATEGORIES and col not in ('Customer_ID', 'LTV')]
+    X = np.column_stack([np.ones(len(df))] + [df[col].to_numpy(dtype=np.float64) for col in regressors])
+    ltv = df['LTV'].to_numpy(dtype=np.float64)
+    coefficients = np.linalg.lstsq(X, ltv, rcond=None)[0]
+    residuals = np.sort(ltv - X @ coefficients)
+
+    return CustomerGenerator(columns, copula_columns, marginals, correlation, regressors, coefficients,
+                             residuals, float(ltv.min()))
+
+
+# Blocos de até `chunksize` clientes, cada um com uma semente derivada de `seed`: o mesmo seed e chunksize
+# geram sempre os mesmos dados
+def iter_synthetic(generator, n_rows, chunksize=DEFAULT_CHUNKSIZE, seed=42):
+    id_width = max(4, len(str(max(n_rows - 1, 0))))
+    inicios = range(0, n_rows, chunksize)
+    for inicio, semente in zip(inicios, np.random.SeedSequence(seed).spawn(len(inicios))):
+        yield generator.sample(min(chunksize, n_rows - inicio), semente, start_id=inicio, id_width=id_width)
+
+
+# Grava `n_rows` clientes sintéticos em CSV ou Parquet, bloco a bloco; devolve o total de linhas gravadas
+def write_synthetic(output_path, n_rows, generator, chunksize=DEFAULT_CHUNKSIZE, seed=42, progress=None):
+    return write_chunks(iter_synthetic(generator, n_rows, chunksize, seed), output_path, progress)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera clientes sintéticos no schema do dataset de LTV')
+    parser.add_argument('output', help='arquivo de saída (.csv ou .parquet)')
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--source', default=DEFAULT_SOURCE_PATH, help='dataset real usado no ajuste')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    generator = fit_generator(load_dataset(args.source))
+    inicio = time.perf_counter()
+    total = write_synthetic(args.output, args.rows, generator, args.chunksize, args.seed,
+                            progress=lambda n: print(f"\r{n:,} clientes gerados", end='', file=sys.stderr))
+    segundos = time.perf_counter() - inicio
+    print(f"\n{total:,} clientes em {segundos:.1f}s ({total / max(segundos, 1e-9):,.0f}/s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# Agendador do treino dos GLMs por grupo (cluster, ou segmento x região): cada grupo é um ajuste IRLS
+# independente, distribuído num pool de processos.
+#
+# A matriz de desenho vai para arquivos .npy mapeados em memória (em /dev/shm quando existe), com as linhas
+# reordenadas para cada grupo ser uma fatia contígua: os workers abrem o mesmo mapeamento e recebem só
+# (início, fim), sem uma cópia serializada do df_novo. As previsões in-sample voltam pelo mesmo caminho;
+# pelo pool voltam só os coeficientes (flag.glm.GLMResult) e os diagnósticos de cada ajuste.
+#
+# `X` pode ser a matriz (n, p) ou a lista das p colunas do working set (flag.scoring.design_columns): nesse
+# caso a matriz float64 completa nunca é montada, só as linhas de cada grupo (ou direto no mapeamento).
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from flag.glm import Gamma, fit_glm
+from flag.scoring import take_rows
+
+# Abaixo disso (linhas no total) o custo de subir o pool é maior que o ganho e o treino roda em série
+MIN_ROWS_PARALLEL = 100_000
+SHARED_MEMORY_DIR = '/dev/shm'
+
+
+# Ajusta o GLM Gamma de um grupo e devolve (resultado, diagnósticos, previsões in-sample)
+def _fit_rows(X, y, feature_names):
+    results = fit_glm(X, y, Gamma(), feature_names)
+    diagnostics = {
+        'n_obs': results.n_obs,
+        'converged': results.converged,
+        'iterations': results.iterations,
+        'aic': results.aic,
+        'llf': results.llf,
+        'deviance': results.deviance,
+        'scale': results.scale,
+    }
+    return results, diagnostics, results.predict(X)
+
+
+# Limita o BLAS de cada worker para os processos não disputarem os mesmos núcleos
+def _limit_blas_threads(threads):
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(threads)
+
+
+# Executado no worker: abre os mapeamentos, ajusta a fatia [start, stop) e grava as previsões no lugar
+def _fit_slice(paths, start, stop, feature_names):
+    X = np.load(paths['X'], mmap_mode='r')
+    y = np.load(paths['y'], mmap_mode='r')
+    results, diagnostics, fitted = _fit_rows(X[start:stop], y[start:stop], feature_names)
+    saida = np.load(paths['fitted'], mmap_mode='r+')
+    saida[start:stop] = fitted
+    saida.flush()
+    return results, diagnostics
+
+
+def _fit_parallel(X, y, keys, groups, feature_names, processes):
+    order = np.concatenate([groups[key] for key in keys])
+    limites = np.concatenate([[0], np.cumsum([len(groups[key]) for key in keys])])
+    diretorio = tempfile.mkdtemp(prefix='flag-glm-',
+                                 dir=SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else None)
+    try:
+        paths = {nome: os.path.join(diretorio, f"{nome}.npy") for nome in ('X', 'y', 'fitted')}
+        colunas = X.shape[1] if isinstance(X, np.ndarray) else len(X)
+        mapeado = np.lib.format.open_memmap(paths['X'], mode='w+', dtype=np.float64, shape=(len(order), colunas))
+        take_rows(X, order, out=mapeado)
+        mapeado.flush()
+        mapeado = np.lib.format.open_memmap(paths['y'], mode='w+', dtype=np.float64, shape=(len(order),))
+        np.take(y, order, out=mapeado)
+        mapeado.flush()
+        np.lib.format.open_memmap(paths['fitted'], mode='w+', dtype=np.float64, shape=(len(order),)).flush()
+        del mapeado
+
+        workers = min(processes, len(keys))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_limit_blas_threads, initargs=(threads,)) as pool:
+            # Maiores grupos primeiro: o último ajuste a terminar tende a ser um dos pequenos
+            maiores_primeiro = sorted(range(len(keys)), key=lambda i: limites[i] - limites[i + 1])
+            futuros = {keys[i]: pool.submit(_fit_slice, paths, int(limites[i]), int(limites[i + 1]), feature_names)
+                       for i in maiores_primeiro}
+            ajustes = {key: futuros[key].result() for key in keys}
+
+        fitted = np.empty(len(y))
+        fitted[order] = np.load(paths['fitted'])
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+    return ajustes, fitted
+
+
+# Ajusta um GLM Gamma por grupo. `groups` mapeia a chave do grupo para os índices posicionais das linhas de
+# `X` (matriz ou lista de colunas) e `y`. Devolve (modelos, diagnósticos, previsões in-sample na ordem
+# original), com as chaves sempre em ordem crescente: o resultado é o mesmo em série ou com qualquer número de
+# processos
+def fit_glm_groups(X, y, groups, feature_names, processes=None, min_rows_parallel=MIN_ROWS_PARALLEL):
+    keys = sorted(groups)
+    processes = processes or os.cpu_count() or 1
+    if processes > 1 and len(keys) > 1 and len(y) >= min_rows_parallel:
+        ajustes, fitted = _fit_parallel(X, y, keys, groups, feature_names, processes)
+    else:
+        ajustes = {}
+        fitted = np.empty(len(y))
+        for key in keys:
+            idx = groups[key]
+            results, diagnostics, fitted[idx] = _fit_rows(take_rows(X, idx), y[idx], feature_names)
+            ajustes[key] = (results, diagnostics)
+
+    models = {key: ajustes[key][0] for key in keys}
+    diagnostics = {key: ajustes[key][1] for key in keys}
+    return models, diagnostics, fitted
@@ -0,0 +1,283 @@
+# Validação cruzada e busca de hiperparâmetros dos modelos de LTV do FLAG: o pipeline inteiro (encoders,
+# clustering e PCA refeitos no treino de cada fold) com qualquer um dos backends de LTV ('glm': GLMs Gamma por
+# cluster; 'xgboost': flag.boosting) e, como referência fora do pipeline, um gradient boosting do scikit-learn
+# (HistGradientBoostingRegressor, 'gbm') direto sobre as features.
+#
+# O dataset não tem data de cadastro nem de transação; o único eixo de tempo é Last_Transaction_Days_Ago e os
+# "meses" são blocos de 30 dias dele (mês 1 = última transação há 1-30 dias). No rolling-origin, cada um dos
+# últimos `months` meses é previsto por um modelo treinado só com clientes de meses mais antigos; no K-fold
+# (embaralhado) a acurácia por mês vem das previsões fora da amostra agrupadas pelo mês. Acurácia = 1 - WAPE
+# (erro absoluto total / LTV total), a mesma conta para os dois modelos. Os modelos do pipeline são pontuados
+# pelo mesmo caminho do app (flag.scoring.predict_conversion_values), então a acurácia é a do modelo publicado.
+#
+# Os folds (treino/teste do pipeline e matrizes float64 das features do boosting, com os scores de pagamento
+# ajustados só no treino do fold) são montados uma vez no processo principal e chegam aos workers pelo
+# initializer do pool; cada (trial, fold) vira uma tarefa, sem remontar matriz. Os modelos são determinísticos
+# (sementes fixas), então o resultado é o mesmo em série ou com qualquer número de processos.
+#
+# Uso: python -m flag.validation [dataset.csv] [--model glm|xgboost|gbm] [--scheme kfold|rolling] [--trials 50]
+#                                [--splits 5] [--processes 4]
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from flag.boosting import DEFAULT_BOOSTING_PARAMETERS
+from flag.pipeline import (DEFAULT_HYPERPARAMETERS, encode_features, feature_columns, feature_matrix,
+                           fit_payment_scores, fit_pipeline, transform)
+from flag.scoring import ltv_models, predict_conversion_values
+
+# Versão das métricas de validação; incrementar quando os folds ou a métrica mudarem (faz parte da chave do cache)
+VALIDATION_VERSION = 3
+MODELS = ('glm', 'xgboost', 'gbm')
+# Modelos validados pelo pipeline completo (o nome é o `ltv_backend`); nos outros o fold é só a matriz de features
+PIPELINE_MODELS = ('glm', 'xgboost')
+SCHEMES = ('kfold', 'rolling')
+MONTH_DAYS = 30
+N_MONTHS = 6
+
+# Hiperparâmetros padrão do boosting: perda Gamma (como os GLMs) e early stopping numa fração do treino
+DEFAULT_GBM_PARAMETERS = {'loss': 'gamma', 'learning_rate': 0.1, 'max_iter': 200, 'max_leaf_nodes': 31,
+                          'min_samples_leaf': 20, 'l2_regularization': 0.0}
+GBM_FIXED_PARAMETERS = {'early_stopping': True, 'validation_fraction': 0.1, 'n_iter_no_change': 20,
+                        'random_state': 42}
+
+# Espaços da busca aleatória: ('int', mín, máx), ('float', mín, máx), ('log', mín, máx) ou ('choice', valores)
+SEARCH_SPACES = {
+    'glm': {
+        'num_clusters': ('int', 2, 8),
+        'clustering_backend': ('choice', ['kmeans', 'minibatch']),
+    },
+    'xgboost': {
+        'objective': ('choice', ['reg:squarederror', 'reg:gamma']),
+        'learning_rate': ('log', 0.03, 0.3),
+        'max_depth': ('int', 3, 10),
+        'min_child_weight': ('log', 0.5, 20.0),
+        'subsample': ('float', 0.6, 1.0),
+        'colsample_bytree': ('float', 0.5, 1.0),
+        'reg_lambda': ('log', 1e-2, 10.0),
+    },
+    'gbm': {
+        'loss': ('choice', ['gamma', 'squared_error']),
+        'learning_rate': ('log', 0.05, 0.3),
+        'max_iter': ('int', 50, 250),
+        'max_leaf_nodes': ('int', 8, 40),
+        'min_samples_leaf': ('int', 5, 100),
+        'l2_regularization': ('log', 1e-3, 10.0),
+    },
+}
+
+# Folds do processo atual (no worker, entregues pelo initializer do pool) e threads de cada treino
+_folds = None
+_threads = 1
+
+
+# Mês da última transação: 1 = 1-30 dias atrás, 2 = 31-60 dias, ...
+def transaction_month(days_ago):
+    return (np.asarray(days_ago, dtype=np.int64) - 1) // MONTH_DAYS + 1
+
+
+# Acurácia como 1 - WAPE (pode ficar negativa quando o erro passa do LTV total)
+def accuracy(y, predicted):
+    return 1.0 - np.abs(y - predicted).sum() / np.abs(y).sum()
+
+
+# Índices posicionais (treino, teste) de cada fold
+def make_splits(df, scheme='kfold', n_splits=5, months=N_MONTHS, seed=42):
+    if scheme == 'kfold':
+        from sklearn.model_selection import KFold
+
+        return list(KFold(n_splits=n_splits, shuffle=True, random_state=seed).split(np.arange(len(df))))
+    if scheme == 'rolling':
+        mes = transaction_month(df['Last_Transaction_Days_Ago'])
+        return [(np.flatnonzero(mes > m), np.flatnonzero(mes == m)) for m in range(months, 0, -1)]
+    raise ValueError(f"Esquema de validação desconhecido: {scheme!r} (use um de {SCHEMES})")
+
+
+# Dados de cada fold, montados uma única vez para todos os trials
+def build_folds(df, splits, model):
+    folds = []
+    for treino_idx, teste_idx in splits:
+        treino, teste = df.iloc[treino_idx], df.iloc[teste_idx]
+        fold = {'y_test': teste['LTV'].to_numpy(dtype=np.float64)}
+        if model in PIPELINE_MODELS:
+            fold['train'], fold['test'] = treino, teste
+        else:
+            payment_scores = fit_payment_scores(treino)
+            treino_novo = encode_features(treino, payment_scores)
+            colunas = feature_columns(treino_novo)
+            fold['X_train'] = feature_matrix(treino_novo, colunas)
+            fold['y_train'] = treino['LTV'].to_numpy(dtype=np.float64)
+            fold['X_test'] = feature_matrix(encode_features(teste, payment_scores), colunas)
+        folds.append(fold)
+    return folds
+
+
+def default_parameters(model):
+    if model == 'glm':
+        return {chave: DEFAULT_HYPERPARAMETERS[chave] for chave in SEARCH_SPACES['glm']}
+    if model == 'xgboost':
+        return {chave: DEFAULT_BOOSTING_PARAMETERS[chave] for chave in SEARCH_SPACES['xgboost']}
+    return dict(DEFAULT_GBM_PARAMETERS)
+
+
+# `n_trials` combinações de hiperparâmetros: a primeira é o padrão do modelo, as outras sorteadas do espaço
+def sample_parameters(model, n_trials, seed=42):
+    rng = np.random.default_rng(seed)
+    trials = [default_parameters(model)]
+    while len(trials) < n_trials:
+        params = {}
+        for nome, (tipo, *faixa) in SEARCH_SPACES[model].items():
+            if tipo == 'int':
+                params[nome] = int(rng.integers(faixa[0], faixa[1] + 1))
+            elif tipo == 'float':
+                params[nome] = float(rng.uniform(faixa[0], faixa[1]))
+            elif tipo == 'log':
+                params[nome] = float(np.exp(rng.uniform(np.log(faixa[0]), np.log(faixa[1]))))
+            else:
+                params[nome] = faixa[0][rng.integers(len(faixa[0]))]
+        trials.append(params)
+    return trials
+
+
+# Treina no fold e devolve as previsões do teste. Nos modelos do pipeline, as chaves de `params` que não são
+# hiperparâmetros do pipeline vão para o boosting
+def _predict_fold(model, params, fold):
+    if model in PIPELINE_MODELS:
+        pipeline = {k: v for k, v in params.items() if k in DEFAULT_HYPERPARAMETERS}
+        boosting = {k: v for k, v in params.items() if k not in DEFAULT_HYPERPARAMETERS}
+        hiperparametros = {**DEFAULT_HYPERPARAMETERS, **pipeline, 'ltv_backend': model}
+        artefatos = fit_pipeline(fold['train'], processes=_threads, boosting_parameters=boosting or None,
+                                 **hiperparametros)
+        return predict_conversion_values(transform(fold['test'], artefatos), ltv_models(artefatos))
+
+    from sklearn.ensemble import HistGradientBoostingRegressor
+
+    regressor = HistGradientBoostingRegressor(**{**GBM_FIXED_PARAMETERS, **params})
+    return regressor.fit(fold['X_train'], fold['y_train']).predict(fold['X_test'])
+
+
+def _iniciar_worker(folds, threads):
+    from threadpoolctl import threadpool_limits
+
+    global _folds, _threads
+    threadpool_limits(threads)
+    _folds, _threads = folds, threads
+
+
+# Executado no worker (ou em série): um trial num fold, com o tempo de parede
+def _run_task(model, params, fold_index):
+    inicio = time.perf_counter()
+    predicted = _predict_fold(model, params, _folds[fold_index])
+    return predicted, time.perf_counter() - inicio
+
+
+def _run_tasks(folds, tarefas, processes):
+    global _folds, _threads
+    if processes > 1 and len(tarefas) > 1:
+        workers = min(processes, len(tarefas))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker,
+                                 initargs=(folds, threads)) as pool:
+            futuros = [pool.submit(_run_task, *tarefa) for tarefa in tarefas]
+            return [futuro.result() for futuro in futuros]
+    _folds, _threads = folds, os.cpu_count() or 1
+    try:
+        return [_run_task(*tarefa) for tarefa in tarefas]
+    finally:
+        _folds, _threads = None, 1
+
+
+# Métricas de um trial a partir das previsões fora da amostra de cada fold
+def _summarize(df, splits, folds, previsoes, months):
+    y = df['LTV'].to_numpy(dtype=np.float64)
+    oof = np.full(len(df), np.nan)
+    for (_, teste_idx), predicted in zip(splits, previsoes):
+        oof[teste_idx] = predicted
+    testados = ~np.isnan(oof)
+    mes = transaction_month(df['Last_Transaction_Days_Ago'])
+    mensal = pd.Series({m: accuracy(y[testados & (mes == m)], oof[testados & (mes == m)])
+                        for m in range(1, months + 1) if (testados & (mes == m)).any()}, name='accuracy',
+                       dtype=np.float64)
+    mensal.index.name = 'month'
+    erros = oof[testados] - y[testados]
+    return {
+        'accuracy': accuracy(y[testados], oof[testados]),
+        'fold_accuracy': [accuracy(fold['y_test'], p) for fold, p in zip(folds, previsoes)],
+        'monthly_accuracy': mensal,
+        'mae': float(np.abs(erros).mean()),
+        'rmse': float(np.sqrt((erros ** 2).mean())),
+        'predictions': oof,
+    }
+
+
+# Avalia uma lista de combinações de hiperparâmetros nos mesmos folds: devolve um dict de métricas por trial
+# ('params', 'accuracy', 'fold_accuracy', 'monthly_accuracy', 'mae', 'rmse', 'predictions', 'seconds')
+def evaluate_trials(df, model, trials, scheme='kfold', n_splits=5, months=N_MONTHS, seed=42, processes=None):
+    if model not in MODELS:
+        raise ValueError(f"Modelo desconhecido: {model!r} (use um de {MODELS})")
+    splits = make_splits(df, scheme, n_splits, months, seed)
+    folds = build_folds(df, splits, model)
+    tarefas = [(model, params, f) for params in trials for f in range(len(folds))]
+    resultados = _run_tasks(folds, tarefas, processes or os.cpu_count() or 1)
+
+    avaliados = []
+    for t, params in enumerate(trials):
+        bloco = resultados[t * len(folds):(t + 1) * len(folds)]
+        metricas = _summarize(df, splits, folds, [p for p, _ in bloco], months)
+        avaliados.append({'params': params, **metricas, 'seconds': sum(s for _, s in bloco)})
+    return avaliados
+
+
+# Validação cruzada de uma única configuração (`params=None` usa o padrão do modelo)
+def cross_validate(df, model='glm', params=None, scheme='kfold', n_splits=5, months=N_MONTHS, seed=42,
+                   processes=None):
+    params = default_parameters(model) if params is None else params
+    return evaluate_trials(df, model, [params], scheme, n_splits, months, seed, processes)[0]
+
+
+# Busca aleatória com `n_trials` combinações (a primeira é o padrão). Devolve (tabela dos trials ordenada pela
+# acurácia, métricas completas do melhor trial)
+def search(df, model='gbm', n_trials=50, scheme='kfold', n_splits=5, months=N_MONTHS, seed=42, processes=None):
+    avaliados = evaluate_trials(df, model, sample_parameters(model, n_trials, seed), scheme, n_splits, months, seed,
+                                processes)
+    tabela = pd.DataFrame([{**a['params'], 'accuracy': a['accuracy'], 'mae': a['mae'], 'rmse': a['rmse'],
+                            'seconds': a['seconds']} for a in avaliados])
+    tabela.index.name = 'trial'
+    melhor = int(tabela['accuracy'].idxmax())
+    return tabela.sort_values('accuracy', ascending=False, kind='stable'), avaliados[melhor]
+
+
+def main(argv=None):
+    from flag.ingest import load_dataset
+    from flag.streaming import DEFAULT_TRAIN_PATH
+
+    parser = argparse.ArgumentParser(description='Validação cruzada e busca de hiperparâmetros do LTV do FLAG')
+    parser.add_argument('dataset', nargs='?', default=DEFAULT_TRAIN_PATH)
+    parser.add_argument('--model', choices=MODELS, default='gbm')
+    parser.add_argument('--scheme', choices=SCHEMES, default='kfold')
+    parser.add_argument('--trials', type=int, default=50)
+    parser.add_argument('--splits', type=int, default=5, help='folds do K-fold')
+    parser.add_argument('--months', type=int, default=N_MONTHS, help='meses avaliados (e testados no rolling)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    df = load_dataset(args.dataset)
+    inicio = time.perf_counter()
+    tabela, melhor = search(df, args.model, args.trials, args.scheme, args.splits, args.months, args.seed,
+                            args.processes)
+    print(f"{args.trials} trials x {args.model} ({args.scheme}) em {time.perf_counter() - inicio:.1f}s",
+          file=sys.stderr)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(tabela.head(10).to_string(float_format=lambda v: f"{v:.4g}"))
+        print("\nMelhor trial:", melhor['params'])
+        print(melhor['monthly_accuracy'].to_frame().T.to_string(float_format=lambda v: f"{v:.2%}"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+# MMM: curvas de resposta de mídia e simulação de cenários de investimento
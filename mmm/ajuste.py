@@ -0,0 +1,357 @@
+# Ajuste do MMM a partir de dados: gasto semanal por canal e a série do KPI (acessos) viram os parâmetros das
+# curvas de resposta do simulador (adstock, saturação de Hill, efeito de cada canal e base).
+#
+# O modelo é o mesmo de mmm.curvas, semana a semana:
+#     kpi[t] = base + sum_c beta_c * hill(adstock_c(gasto_c)[t], meia_saturacao_c, inclinacao_c)
+# com adstock geométrico (decaimento) ou Weibull (forma, escala), pesos normalizados em MAX_LAG lags.
+# O objetivo (soma dos quadrados dos resíduos, relativa à variância do KPI) e o gradiente analítico são
+# calculados de uma vez para todos os canais e semanas; o L-BFGS-B (com limites em cada parâmetro) parte de
+# vários pontos iniciais, distribuídos num pool de processos, e fica o melhor. O resultado monta direto as
+# CurvasResposta usadas pelo simulador, pelo otimizador e pelo Monte Carlo.
+#
+# Uso: python -m mmm.ajuste historico.csv [--kpi acessos] [--inicios 8]
+#      (CSV com uma coluna de gasto semanal por canal, em mil R$, e a coluna do KPI)
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from mmm.curvas import CANAIS_ONLINE, MAX_LAG, PARAMETROS_PADRAO, CurvasResposta, adstock, hill
+
+# Parâmetros de adstock de cada tipo e os limites usados no ajuste
+PARAMETROS_ADSTOCK = {'geometrico': ('decaimento',), 'weibull': ('forma', 'escala')}
+LIMITES = {
+    'decaimento': (0.0, 0.9),
+    'forma': (0.5, 5.0),
+    'escala': (0.5, float(MAX_LAG)),
+    'inclinacao': (0.5, 4.0),
+}
+# Meia saturação entre essas frações do gasto efetivo médio do canal
+LIMITES_MEIA_SATURACAO = (0.05, 20.0)
+
+INICIOS_PADRAO = 8
+# Abaixo disso (semanas x canais x inícios) o custo de subir o pool é maior que o ganho e os inícios rodam em série
+LIMITE_PARALELO = 50_000
+# Menor gasto efetivo relativo à meia saturação nas derivadas (evita 0 ** negativo quando a inclinação < 1)
+_EPS = 1e-9
+
+
+# Pesos normalizados (canais, lags) e as derivadas deles em relação a cada parâmetro de adstock.
+# Mesmas fórmulas de pesos_geometricos e pesos_weibull
+def _pesos_geometricos(decaimento, max_lag):
+    lags = np.arange(max_lag)
+    d = decaimento[:, None]
+    p = d ** lags
+    dp = lags * d ** np.maximum(lags - 1, 0)
+    soma = p.sum(axis=1, keepdims=True)
+    w = p / soma
+    return w, [(dp - w * dp.sum(axis=1, keepdims=True)) / soma]
+
+
+def _pesos_weibull(forma, escala, max_lag):
+    k, lam = forma[:, None], escala[:, None]
+    u = np.arange(1, max_lag + 1) / lam
+    uk = u ** k
+    p = u ** (k - 1) * np.exp(-uk)
+    w = p / p.sum(axis=1, keepdims=True)
+    # Derivadas de log p (o fator forma/escala da densidade some na normalização)
+    g_forma = np.log(u) * (1 - uk)
+    g_escala = -((k - 1) - k * uk) / lam
+    return w, [w * (g - (w * g).sum(axis=1, keepdims=True)) for g in (g_forma, g_escala)]
+
+
+# Problema de ajuste: gastos (canais, semanas), KPI (semanas,) e o tipo de adstock de cada canal.
+# O vetor de parâmetros é [base, beta (C), meia_saturacao (C), inclinacao (C), adstock...], com os parâmetros
+# de adstock agrupados por tipo na ordem de PARAMETROS_ADSTOCK; o otimizador trabalha com ele dividido por
+# `escala` (todas as variáveis na ordem de grandeza 1)
+class ProblemaMMM:
+    def __init__(self, gastos, kpi, tipos, max_lag=MAX_LAG):
+        self.gastos = np.ascontiguousarray(gastos, dtype=np.float64)
+        self.kpi = np.asarray(kpi, dtype=np.float64)
+        self.tipos = list(tipos)
+        self.max_lag = max_lag
+        n_canais, semanas = self.gastos.shape
+        if self.kpi.shape != (semanas,):
+            raise ValueError("O KPI precisa ter uma observação por semana dos gastos")
+        if len(self.tipos) != n_canais:
+            raise ValueError("Informe um tipo de adstock por canal")
+        desconhecidos = set(self.tipos) - set(PARAMETROS_ADSTOCK)
+        if desconhecidos:
+            raise ValueError(f"Tipos de adstock desconhecidos: {sorted(desconhecidos)}")
+
+        # Canais de cada tipo e a fatia do vetor de parâmetros de cada parâmetro de adstock
+        self.grupos = {tipo: np.flatnonzero(np.array(self.tipos) == tipo) for tipo in PARAMETROS_ADSTOCK}
+        self.fatias = {}
+        inicio = 1 + 3 * n_canais
+        for tipo, nomes in PARAMETROS_ADSTOCK.items():
+            for nome in nomes:
+                self.fatias[nome] = slice(inicio, inicio + len(self.grupos[tipo]))
+                inicio += len(self.grupos[tipo])
+        self.n_parametros = inicio
+
+        # Escalas: base e beta na unidade do KPI, meia saturação no gasto efetivo médio de cada canal
+        self.gasto_medio = np.maximum(self.gastos.mean(axis=1), 1e-12)
+        nivel = max(float(np.abs(self.kpi).mean()), 1e-12)
+        self.escala = np.ones(self.n_parametros)
+        self.escala[0] = nivel
+        self.escala[1:1 + n_canais] = nivel / max(n_canais, 1)
+        self.escala[1 + n_canais:1 + 2 * n_canais] = self.gasto_medio
+        self.normalizador = max(float(((self.kpi - self.kpi.mean()) ** 2).sum()), 1e-12)
+
+    @property
+    def n_canais(self):
+        return self.gastos.shape[0]
+
+    # Limites (mínimo, máximo) de cada parâmetro, na escala natural
+    def limites(self):
+        c = self.n_canais
+        baixo = np.empty(self.n_parametros)
+        alto = np.empty(self.n_parametros)
+        baixo[0], alto[0] = 0.0, float(np.abs(self.kpi).max())
+        baixo[1:1 + c], alto[1:1 + c] = 0.0, 10.0 * float(np.abs(self.kpi).max())
+        baixo[1 + c:1 + 2 * c] = LIMITES_MEIA_SATURACAO[0] * self.gasto_medio
+        alto[1 + c:1 + 2 * c] = LIMITES_MEIA_SATURACAO[1] * self.gasto_medio
+        baixo[1 + 2 * c:1 + 3 * c], alto[1 + 2 * c:1 + 3 * c] = LIMITES['inclinacao']
+        for nome, fatia in self.fatias.items():
+            baixo[fatia], alto[fatia] = LIMITES[nome]
+        return baixo, alto
+
+    # Parâmetros nomeados a partir do vetor na escala natural
+    def desempacotar(self, theta):
+        c = self.n_canais
+        parametros = {'base': theta[0], 'beta': theta[1:1 + c], 'meia_saturacao': theta[1 + c:1 + 2 * c],
+                      'inclinacao': theta[1 + 2 * c:1 + 3 * c]}
+        for nome, fatia in self.fatias.items():
+            parametros[nome] = theta[fatia]
+        return parametros
+
+    # Pesos de adstock (canais, lags) e, por parâmetro de adstock, (canais do tipo, derivada dos pesos)
+    def pesos(self, parametros):
+        w = np.empty((self.n_canais, self.max_lag))
+        derivadas = {}
+        geo = self.grupos['geometrico']
+        if len(geo):
+            w[geo], (d_decaimento,) = _pesos_geometricos(parametros['decaimento'], self.max_lag)
+            derivadas['decaimento'] = (geo, d_decaimento)
+        wei = self.grupos['weibull']
+        if len(wei):
+            w[wei], (d_forma, d_escala) = _pesos_weibull(parametros['forma'], parametros['escala'], self.max_lag)
+            derivadas['forma'] = (wei, d_forma)
+            derivadas['escala'] = (wei, d_escala)
+        return w, derivadas
+
+    # KPI previsto (semanas,) e a contribuição de cada canal (canais, semanas) para o vetor natural `theta`
+    def prever(self, theta, gastos=None):
+        parametros = self.desempacotar(theta)
+        w, _ = self.pesos(parametros)
+        gastos = self.gastos if gastos is None else np.asarray(gastos, dtype=np.float64)
+        contribuicoes = parametros['beta'][:, None] * hill(adstock(gastos, w), parametros['meia_saturacao'][:, None],
+                                                           parametros['inclinacao'][:, None])
+        return parametros['base'] + contribuicoes.sum(axis=0), contribuicoes
+
+    # Objetivo e gradiente analítico no vetor escalado `x`: 0.5 * SQR / soma dos quadrados do KPI centrado
+    def objetivo(self, x):
+        theta = x * self.escala
+        p = self.desempacotar(theta)
+        w, derivadas = self.pesos(p)
+        K = p['meia_saturacao'][:, None]
+        s = p['inclinacao'][:, None]
+        beta = p['beta'][:, None]
+
+        A = np.maximum(adstock(self.gastos, w), _EPS * K)
+        razao = A / K
+        q = razao ** s
+        h = q / (1 + q)
+        residuo = p['base'] + (beta * h).sum(axis=0) - self.kpi
+        perda = 0.5 * (residuo @ residuo) / self.normalizador
+
+        # r_t * beta_c * h(1 - h): fator comum das derivadas da saturação
+        r = residuo / self.normalizador
+        comum = r * beta * h * (1 - h)
+        c = self.n_canais
+        grad = np.empty(self.n_parametros)
+        grad[0] = r.sum()
+        grad[1:1 + c] = h @ r
+        grad[1 + c:1 + 2 * c] = -(s[:, 0] / K[:, 0]) * comum.sum(axis=1)
+        grad[1 + 2 * c:1 + 3 * c] = (comum * np.log(razao)).sum(axis=1)
+        # Adstock: dh/dA = s h (1 - h) / A, e dA/dθ é o adstock dos gastos com as derivadas dos pesos
+        dperda_dA = comum * s / A
+        for nome, (canais, dw) in derivadas.items():
+            dA = adstock(self.gastos[canais], dw)
+            grad[self.fatias[nome]] = (dperda_dA[canais] * dA).sum(axis=1)
+        return perda, grad * self.escala
+
+    # Pontos iniciais (vetores naturais): o primeiro é um chute central (efeito médio dividido entre os canais,
+    # meia saturação no gasto médio), os demais sorteados dentro dos limites
+    def inicios(self, n, seed=0):
+        baixo, alto = self.limites()
+        c = self.n_canais
+        central = np.empty(self.n_parametros)
+        central[0] = 0.5 * float(np.percentile(self.kpi, 10))
+        central[1:1 + c] = 2 * max(float(self.kpi.mean()) - central[0], 1e-12) / max(c, 1)
+        central[1 + c:1 + 2 * c] = self.gasto_medio
+        central[1 + 2 * c:1 + 3 * c] = 1.0
+        padroes = {'decaimento': 0.3, 'forma': 1.5, 'escala': 2.0}
+        for nome, fatia in self.fatias.items():
+            central[fatia] = padroes[nome]
+        pontos = [np.clip(central, baixo, alto)]
+
+        rng = np.random.default_rng(seed)
+        for _ in range(n - 1):
+            ponto = rng.uniform(baixo, alto)
+            ponto[0] = rng.uniform(0, float(self.kpi.mean()))
+            # Efeitos e meias saturações em escala log em torno do chute central
+            ponto[1:1 + 2 * c] = central[1:1 + 2 * c] * np.exp(rng.uniform(np.log(0.2), np.log(5.0), 2 * c))
+            pontos.append(np.clip(ponto, baixo, alto))
+        return pontos
+
+
+# Um início do multi-start: L-BFGS-B com gradiente analítico. Devolve (vetor natural, perda, iterações, convergiu)
+def _otimizar(problema, theta0, max_iteracoes):
+    from scipy.optimize import minimize
+
+    baixo, alto = problema.limites()
+    resultado = minimize(problema.objetivo, theta0 / problema.escala, jac=True, method='L-BFGS-B',
+                         bounds=list(zip(baixo / problema.escala, alto / problema.escala)),
+                         options={'maxiter': max_iteracoes})
+    return resultado.x * problema.escala, float(resultado.fun), int(resultado.nit), bool(resultado.success)
+
+
+def _otimizar_varios(problema, pontos, max_iteracoes):
+    return [_otimizar(problema, ponto, max_iteracoes) for ponto in pontos]
+
+
+# Parâmetros ajustados de um MMM e os indicadores do ajuste; `curvas()` monta as curvas do simulador
+class AjusteMMM:
+    def __init__(self, canais, tipos, theta, problema, perdas, iteracoes, convergiu, segundos):
+        parametros = problema.desempacotar(theta)
+        self.canais = list(canais)
+        self.tipos = list(tipos)
+        self.theta = theta
+        self.base = float(parametros['base'])
+        self.beta = np.array(parametros['beta'])
+        self.meia_saturacao = np.array(parametros['meia_saturacao'])
+        self.inclinacao = np.array(parametros['inclinacao'])
+        self.pesos, _ = problema.pesos(parametros)
+        self.adstock = []
+        for c, tipo in enumerate(self.tipos):
+            posicao = int(np.searchsorted(problema.grupos[tipo], c))
+            self.adstock.append({nome: float(parametros[nome][posicao]) for nome in PARAMETROS_ADSTOCK[tipo]})
+
+        self.kpi = problema.kpi
+        self.previsto, self.contribuicoes = problema.prever(theta)
+        residuo = self.kpi - self.previsto
+        self.r2 = 1 - float(residuo @ residuo) / problema.normalizador
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.mape = float(np.nanmean(np.abs(residuo / self.kpi)[self.kpi != 0]) * 100)
+        self.perdas = perdas
+        self.iteracoes = iteracoes
+        self.convergiu = convergiu
+        self.segundos = segundos
+
+    # Especificação de cada canal no formato de PARAMETROS_PADRAO (mais o beta ajustado)
+    def especificacoes(self):
+        return [{'adstock': tipo, **params, 'meia_saturacao': float(k), 'inclinacao': float(s), 'beta': float(b)}
+                for tipo, params, k, s, b in zip(self.tipos, self.adstock, self.meia_saturacao, self.inclinacao,
+                                                  self.beta)]
+
+    # Curvas de resposta do simulador com os parâmetros ajustados. O simulador distribui o orçamento do período
+    # em `semanas` semanas e soma as contribuições semanais; a base do período é a base semanal x semanas
+    def curvas(self, semanas=12, taxa_leads=0.3, taxa_vendas=0.1):
+        return CurvasResposta(self.canais, self.pesos, self.beta, self.meia_saturacao, self.inclinacao,
+                              base=self.base * semanas, semanas=semanas, taxa_leads=taxa_leads,
+                              taxa_vendas=taxa_vendas, especificacoes=self.especificacoes())
+
+
+# Ajusta o MMM: `gastos` (canais, semanas) em mil R$ por semana e `kpi` (semanas,). `tipos_adstock` (lista ou
+# dict por canal) usa por padrão o tipo de PARAMETROS_PADRAO (geométrico para canais fora dele). Os `inicios`
+# do multi-start vão para um pool de processos quando o problema é grande o bastante; o resultado não depende
+# do número de processos
+def ajustar_mmm(gastos, kpi, canais, tipos_adstock=None, inicios=INICIOS_PADRAO, seed=0, processos=None,
+                max_iteracoes=500, max_lag=MAX_LAG, limite_paralelo=LIMITE_PARALELO):
+    inicio_relogio = time.perf_counter()
+    canais = list(canais)
+    if tipos_adstock is None:
+        tipos_adstock = {canal: PARAMETROS_PADRAO.get(canal, {}).get('adstock', 'geometrico') for canal in canais}
+    if isinstance(tipos_adstock, dict):
+        tipos_adstock = [tipos_adstock.get(canal, 'geometrico') for canal in canais]
+
+    problema = ProblemaMMM(gastos, kpi, tipos_adstock, max_lag)
+    pontos = problema.inicios(inicios, seed)
+    processos = processos or os.cpu_count() or 1
+    tamanho = problema.gastos.size * len(pontos)
+    if processos > 1 and len(pontos) > 1 and tamanho >= limite_paralelo:
+        workers = min(processos, len(pontos))
+        # Inícios intercalados entre os workers (os sorteados têm custo parecido)
+        partes = [pontos[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parciais = list(pool.map(_otimizar_varios, [problema] * workers, partes, [max_iteracoes] * workers))
+        resultados = [None] * len(pontos)
+        for i, parcial in enumerate(parciais):
+            resultados[i::workers] = parcial
+    else:
+        resultados = _otimizar_varios(problema, pontos, max_iteracoes)
+
+    # Menor perda; em empate fica o primeiro início
+    melhor = min(range(len(resultados)), key=lambda i: (resultados[i][1], i))
+    theta, _, iteracoes, convergiu = resultados[melhor]
+    return AjusteMMM(canais, problema.tipos, theta, problema, [r[1] for r in resultados], iteracoes, convergiu,
+                     time.perf_counter() - inicio_relogio)
+
+
+# Histórico semanal sintético a partir de curvas conhecidas, para medir se o ajuste recupera os parâmetros
+# (benchmarks/bench_mmm.py); o app não usa histórico sintético. O gasto semanal oscila em torno de
+# `investimentos` (orçamento do período de `curvas.semanas` semanas) e todo canal tem semanas sem veiculação
+# (flights nos offline, pausas curtas nos digitais): sem elas a base e o efeito de canais sempre ligados não se
+# separam. Devolve (gastos, kpi)
+def historico_sintetico(curvas, investimentos, semanas=156, base_semanal=5.0, ruido=0.03, seed=0):
+    rng = np.random.default_rng(seed)
+    referencia = np.array([investimentos[canal] for canal in curvas.canais], dtype=np.float64) / curvas.semanas
+    gastos = referencia[:, None] * rng.lognormal(-0.125, 0.5, (len(curvas.canais), semanas))
+    pausa = np.where(np.isin(curvas.canais, CANAIS_ONLINE), 0.15, 0.3)
+    gastos *= rng.random(gastos.shape) > pausa[:, None]
+    efeito = hill(adstock(gastos, curvas.pesos), curvas.meia_saturacao[:, None], curvas.inclinacao[:, None])
+    kpi = base_semanal + (curvas.beta[:, None] * efeito).sum(axis=0)
+    kpi = kpi * (1 + rng.normal(0, ruido, semanas))
+    return gastos, kpi
+
+
+# Lê um histórico em CSV: uma coluna de gasto semanal por canal e a coluna do KPI (colunas de data são ignoradas).
+# Devolve (canais, gastos (canais, semanas), kpi)
+def carregar_historico(path, kpi='acessos', canais=None):
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    if kpi not in df:
+        raise KeyError(f"Coluna do KPI ausente no histórico: {kpi!r}")
+    if canais is None:
+        canais = [col for col in df.columns if col != kpi and pd.api.types.is_numeric_dtype(df[col])]
+    faltando = [canal for canal in canais if canal not in df]
+    if faltando:
+        raise KeyError(f"Canais ausentes no histórico: {faltando}")
+    return list(canais), df[canais].to_numpy(dtype=np.float64).T, df[kpi].to_numpy(dtype=np.float64)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ajuste do MMM a partir do histórico semanal')
+    parser.add_argument('historico', help='CSV com o gasto semanal por canal (mil R$) e o KPI')
+    parser.add_argument('--kpi', default='acessos', help='coluna do KPI')
+    parser.add_argument('--inicios', type=int, default=INICIOS_PADRAO, help='pontos iniciais do multi-start')
+    parser.add_argument('--processos', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    canais, gastos, kpi = carregar_historico(args.historico, args.kpi)
+    ajuste = ajustar_mmm(gastos, kpi, canais, inicios=args.inicios, seed=args.seed, processos=args.processos)
+    print(f"{len(canais)} canais x {gastos.shape[1]} semanas em {ajuste.segundos:.2f}s: R² {ajuste.r2:.3f}, "
+          f"MAPE {ajuste.mape:.1f}%, base semanal {ajuste.base:.2f}")
+    for canal, spec in zip(canais, ajuste.especificacoes()):
+        adstock_txt = ', '.join(f"{nome} {spec[nome]:.2f}" for nome in PARAMETROS_ADSTOCK[spec['adstock']])
+        print(f"  {canal:<20} beta {spec['beta']:9.3f}  meia saturação {spec['meia_saturacao']:8.2f}  "
+              f"inclinação {spec['inclinacao']:.2f}  {spec['adstock']} ({adstock_txt})")
+
+
+if __name__ == '__main__':
+    main()
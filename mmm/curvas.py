@@ -0,0 +1,163 @@
+import numpy as np
+
+# Quantidade máxima de períodos em que o investimento de um período ainda tem efeito (carryover)
+MAX_LAG = 8
+
+# Parâmetros padrão das curvas por canal. Digital tem carryover curto (adstock geométrico) e
+# saturação rápida; TV e OOH têm efeito com pico atrasado (adstock Weibull) e saturação mais lenta.
+# `meia_saturacao` está em mil R$ por período: é o investimento em que o canal entrega metade do efeito máximo
+PARAMETROS_PADRAO = {
+    "Google Ads": {"adstock": "geometrico", "decaimento": 0.20, "meia_saturacao": 15.0, "inclinacao": 1.0},
+    "Meta Ads": {"adstock": "geometrico", "decaimento": 0.30, "meia_saturacao": 15.0, "inclinacao": 1.1},
+    "Out of Home": {"adstock": "weibull", "forma": 1.5, "escala": 2.0, "meia_saturacao": 8.0, "inclinacao": 1.4},
+    "Rádio": {"adstock": "geometrico", "decaimento": 0.40, "meia_saturacao": 10.0, "inclinacao": 1.3},
+    "TV Paga": {"adstock": "weibull", "forma": 2.0, "escala": 2.5, "meia_saturacao": 20.0, "inclinacao": 1.6},
+    "TV Aberta": {"adstock": "weibull", "forma": 2.0, "escala": 3.0, "meia_saturacao": 30.0, "inclinacao": 1.8},
+    "Influenciadores": {"adstock": "geometrico", "decaimento": 0.50, "meia_saturacao": 18.0, "inclinacao": 1.2},
+}
+
+# Canais digitais (ROI Online); os demais entram no ROI Offline
+CANAIS_ONLINE = ("Google Ads", "Meta Ads", "Influenciadores")
+
+
+# Pesos do adstock geométrico: o efeito cai pela fração `decaimento` a cada período
+def pesos_geometricos(decaimento, max_lag=MAX_LAG, normalizar=True):
+    decaimento = np.asarray(decaimento, dtype=np.float64)
+    pesos = decaimento[..., None] ** np.arange(max_lag)
+    return pesos / pesos.sum(axis=-1, keepdims=True) if normalizar else pesos
+
+
+# Pesos do adstock Weibull (densidade): permite que o pico do efeito aconteça alguns períodos depois do investimento
+def pesos_weibull(forma, escala, max_lag=MAX_LAG, normalizar=True):
+    forma = np.asarray(forma, dtype=np.float64)[..., None]
+    escala = np.asarray(escala, dtype=np.float64)[..., None]
+    lag = np.arange(1, max_lag + 1) / escala
+    pesos = (forma / escala) * lag ** (forma - 1) * np.exp(-lag ** forma)
+    return pesos / pesos.sum(axis=-1, keepdims=True) if normalizar else pesos
+
+
+# Matriz (canais x lags) de pesos a partir da especificação de cada canal
+def pesos_adstock(especificacoes, max_lag=MAX_LAG):
+    linhas = []
+    for spec in especificacoes:
+        if spec["adstock"] == "geometrico":
+            linhas.append(pesos_geometricos(spec["decaimento"], max_lag))
+        elif spec["adstock"] == "weibull":
+            linhas.append(pesos_weibull(spec["forma"], spec["escala"], max_lag))
+        else:
+            raise ValueError(f"Tipo de adstock desconhecido: {spec['adstock']!r}")
+    return np.vstack(linhas)
+
+
+# Adstock de gastos com formato (..., canais, tempo) usando pesos (canais, lags): um passo vetorizado por lag
+def adstock(gastos, pesos):
+    gastos = np.asarray(gastos, dtype=np.float64)
+    saida = gastos * pesos[:, 0, None]
+    for lag in range(1, min(pesos.shape[1], gastos.shape[-1])):
+        saida[..., lag:] += gastos[..., :-lag] * pesos[:, lag, None]
+    return saida
+
+
+# Saturação de Hill: 0 sem investimento, 0.5 na meia saturação e tende a 1 com investimento alto
+def hill(x, meia_saturacao, inclinacao):
+    x = np.maximum(x, 0.0)
+    xs = x ** inclinacao
+    return xs / (xs + meia_saturacao ** inclinacao)
+
+
+# ROI (%) de um grupo de canais: (receita das vendas atribuídas - investimento) / investimento.
+# `vendas_por_canal` e `orcamentos` com formato (..., canais), orçamentos em mil R$ e valor da venda em R$
+def calcular_roi(vendas_por_canal, orcamentos, valor_venda, mascara=None):
+    vendas_por_canal = np.asarray(vendas_por_canal, dtype=np.float64)
+    orcamentos = np.asarray(orcamentos, dtype=np.float64)
+    if mascara is not None:
+        vendas_por_canal = vendas_por_canal[..., mascara]
+        orcamentos = orcamentos[..., mascara]
+    investimento = orcamentos.sum(axis=-1)
+    receita = vendas_por_canal.sum(axis=-1) * valor_venda / 1000
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(investimento > 0, (receita - investimento) / investimento * 100, np.nan)
+
+
+# Curvas de resposta de todos os canais, avaliadas em lote sobre cenários x canais x tempo.
+# `especificacoes` (opcional) guarda os parâmetros de adstock de cada canal, usados na simulação de incerteza
+class CurvasResposta:
+    def __init__(self, canais, pesos, beta, meia_saturacao, inclinacao, base=0.0, semanas=12,
+                 taxa_leads=0.3, taxa_vendas=0.1, especificacoes=None):
+        self.canais = list(canais)
+        self.pesos = np.asarray(pesos, dtype=np.float64)
+        self.beta = np.asarray(beta, dtype=np.float64)
+        self.meia_saturacao = np.asarray(meia_saturacao, dtype=np.float64)
+        self.inclinacao = np.asarray(inclinacao, dtype=np.float64)
+        self.base = base
+        self.semanas = semanas
+        self.taxa_leads = taxa_leads
+        self.taxa_vendas = taxa_vendas
+        self.especificacoes = especificacoes
+
+    # Contribuição de cada canal (acessos) para gastos com formato (..., canais, tempo)
+    def contribuicoes(self, gastos):
+        efeito = hill(adstock(gastos, self.pesos), self.meia_saturacao[:, None], self.inclinacao[:, None])
+        return self.beta * efeito.sum(axis=-1)
+
+    # Distribui o orçamento de cada canal igualmente entre as semanas do período: (..., canais) -> (..., canais, tempo)
+    def gastos_uniformes(self, orcamentos, semanas=None):
+        semanas = semanas or self.semanas
+        orcamentos = np.asarray(orcamentos, dtype=np.float64)
+        return np.broadcast_to((orcamentos / semanas)[..., None], orcamentos.shape + (semanas,))
+
+    # Orçamentos por canal (..., canais) -> contribuição de cada canal em acessos (..., canais)
+    def resposta_por_canal(self, orcamentos, semanas=None):
+        return self.contribuicoes(self.gastos_uniformes(orcamentos, semanas))
+
+    # Acessos, leads e vendas para um ou muitos cenários de orçamento (..., canais) numa única chamada
+    def simular(self, orcamentos, semanas=None):
+        acessos = self.base + self.resposta_por_canal(orcamentos, semanas).sum(axis=-1)
+        leads = acessos * self.taxa_leads
+        vendas = leads * self.taxa_vendas
+        return {"acessos": acessos, "leads": leads, "vendas": vendas}
+
+    # ROI (%) geral, online e offline para um ou muitos cenários de orçamento (..., canais)
+    def roi(self, orcamentos, valor_venda, semanas=None):
+        orcamentos = np.asarray(orcamentos, dtype=np.float64)
+        vendas = self.resposta_por_canal(orcamentos, semanas) * self.taxa_leads * self.taxa_vendas
+        online = np.isin(self.canais, CANAIS_ONLINE)
+        return {
+            "roi_geral": calcular_roi(vendas, orcamentos, valor_venda),
+            "roi_online": calcular_roi(vendas, orcamentos, valor_venda, online),
+            "roi_offline": calcular_roi(vendas, orcamentos, valor_venda, ~online),
+        }
+
+    # ROI (%) de cada canal para orçamentos (..., canais): receita das vendas atribuídas ao canal sobre o investimento nele
+    def roi_por_canal(self, orcamentos, valor_venda, semanas=None):
+        orcamentos = np.asarray(orcamentos, dtype=np.float64)
+        receita = self.resposta_por_canal(orcamentos, semanas) * self.taxa_leads * self.taxa_vendas * valor_venda / 1000
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(orcamentos > 0, (receita - orcamentos) / orcamentos * 100, np.nan)
+
+    # Curva de resposta de um canal isolado para uma grade de investimentos
+    def curva_canal(self, canal, investimentos):
+        i = self.canais.index(canal)
+        orcamentos = np.zeros((len(investimentos), len(self.canais)))
+        orcamentos[:, i] = investimentos
+        return self.resposta_por_canal(orcamentos)[:, i]
+
+
+# Curvas com os parâmetros padrão, calibradas para que a alocação de referência entregue o mesmo
+# resultado do modelo linear anterior (0,5 acesso por mil R$ em cada canal), mas com retornos decrescentes
+def curvas_padrao(investimentos_referencia, acessos_por_mil=0.5, semanas=12, parametros=PARAMETROS_PADRAO):
+    canais = list(investimentos_referencia)
+    especificacoes = [parametros[canal] for canal in canais]
+    curvas = CurvasResposta(
+        canais,
+        pesos_adstock(especificacoes),
+        beta=np.ones(len(canais)),
+        meia_saturacao=[spec["meia_saturacao"] for spec in especificacoes],
+        inclinacao=[spec["inclinacao"] for spec in especificacoes],
+        semanas=semanas,
+        especificacoes=especificacoes,
+    )
+    referencia = np.array([investimentos_referencia[canal] for canal in canais], dtype=np.float64)
+    resposta = curvas.resposta_por_canal(referencia)
+    curvas.beta = np.divide(acessos_por_mil * referencia, resposta, out=np.zeros_like(resposta), where=resposta > 0)
+    return curvas
@@ -0,0 +1,120 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from mmm.curvas import CANAIS_ONLINE, calcular_roi, hill, pesos_geometricos, pesos_weibull
+
+# Coeficiente de variação de cada parâmetro nas amostras do Monte Carlo (desvio padrão / média)
+INCERTEZA_PADRAO = {
+    "beta": 0.15,
+    "meia_saturacao": 0.20,
+    "inclinacao": 0.10,
+    "adstock": 0.15,
+    "taxa_leads": 0.10,
+    "taxa_vendas": 0.15,
+}
+
+# As amostras são geradas em lotes de tamanho fixo, cada um com sua semente derivada da semente principal:
+# o resultado é o mesmo rodando em série ou em qualquer número de processos
+TAMANHO_LOTE = 25_000
+# A partir dessa quantidade de amostras os lotes são distribuídos num pool de processos
+LIMITE_PARALELO = 400_000
+
+QUANTIS_PADRAO = (0.05, 0.5, 0.95)
+
+
+# Amostras log-normais com média `centro` e coeficiente de variação `cv` (sempre positivas)
+def _lognormal(rng, centro, cv, forma):
+    sigma = np.sqrt(np.log1p(cv ** 2))
+    return centro * np.exp(rng.normal(-sigma ** 2 / 2, sigma, forma))
+
+
+# Amostras Beta com média `media` e coeficiente de variação `cv` (taxas entre 0 e 1)
+def _beta(rng, media, cv, forma):
+    media = np.asarray(media, dtype=np.float64)
+    concentracao = np.maximum((1 - media) / (media * cv ** 2) - 1, 1e-3)
+    return rng.beta(media * concentracao, (1 - media) * concentracao, forma)
+
+
+# Pesos de adstock amostrados por canal: (amostras, canais, lags). Sem as especificações dos canais
+# os pesos calibrados ficam fixos
+def _amostrar_pesos(rng, curvas, n, cv):
+    if curvas.especificacoes is None or cv == 0:
+        return np.broadcast_to(curvas.pesos, (n,) + curvas.pesos.shape)
+    max_lag = curvas.pesos.shape[1]
+    pesos = np.empty((n,) + curvas.pesos.shape)
+    for c, spec in enumerate(curvas.especificacoes):
+        if spec["adstock"] == "geometrico":
+            pesos[:, c] = pesos_geometricos(_beta(rng, spec["decaimento"], cv, n), max_lag)
+        else:
+            forma = _lognormal(rng, spec["forma"], cv, n)
+            escala = _lognormal(rng, spec["escala"], cv, n)
+            pesos[:, c] = pesos_weibull(forma, escala, max_lag)
+    return pesos
+
+
+# Um lote do Monte Carlo: amostra os parâmetros e avalia todas as amostras num único cálculo em array.
+# Devolve acessos por canal (amostras, canais) e as taxas de conversão de cada amostra
+def _simular_lote(curvas, orcamentos, n, semente, incerteza, semanas):
+    rng = np.random.default_rng(semente)
+    n_canais = len(curvas.canais)
+    beta = _lognormal(rng, curvas.beta, incerteza["beta"], (n, n_canais))
+    meia_saturacao = _lognormal(rng, curvas.meia_saturacao, incerteza["meia_saturacao"], (n, n_canais))
+    inclinacao = _lognormal(rng, curvas.inclinacao, incerteza["inclinacao"], (n, n_canais))
+    pesos = _amostrar_pesos(rng, curvas, n, incerteza["adstock"])
+    taxa_leads = _beta(rng, curvas.taxa_leads, incerteza["taxa_leads"], n)
+    taxa_vendas = _beta(rng, curvas.taxa_vendas, incerteza["taxa_vendas"], n)
+
+    # Com o orçamento distribuído igualmente nas semanas, o adstock da semana t é o gasto semanal
+    # vezes a soma acumulada dos pesos até o lag t
+    t = np.minimum(np.arange(semanas), pesos.shape[-1] - 1)
+    gasto_efetivo = np.cumsum(pesos, axis=-1)[..., t] * (orcamentos / semanas)[:, None]
+    efeito = hill(gasto_efetivo, meia_saturacao[..., None], inclinacao[..., None]).sum(axis=-1)
+    return beta * efeito, taxa_leads, taxa_vendas
+
+
+# Monte Carlo dos KPIs do simulador para uma alocação (canais,): amostra a curva de resposta de cada canal
+# (efeito, saturação, inclinação e adstock) e as taxas de conversão. Devolve as amostras de cada KPI;
+# com `valor_venda`, inclui também os ROIs geral, online e offline
+def simular_incerteza(curvas, orcamentos, n_amostras=10_000, seed=None, incerteza=None, valor_venda=None,
+                      semanas=None, processos=None, tamanho_lote=TAMANHO_LOTE, limite_paralelo=LIMITE_PARALELO):
+    orcamentos = np.asarray(orcamentos, dtype=np.float64)
+    incerteza = {**INCERTEZA_PADRAO, **(incerteza or {})}
+    semanas = semanas or curvas.semanas
+
+    tamanhos = [min(tamanho_lote, n_amostras - inicio) for inicio in range(0, n_amostras, tamanho_lote)]
+    sementes = np.random.SeedSequence(seed).spawn(len(tamanhos))
+    argumentos = [(curvas, orcamentos, n, semente, incerteza, semanas) for n, semente in zip(tamanhos, sementes)]
+
+    processos = processos or os.cpu_count() or 1
+    if n_amostras >= limite_paralelo and processos > 1 and len(argumentos) > 1:
+        with ProcessPoolExecutor(max_workers=min(processos, len(argumentos))) as pool:
+            lotes = list(pool.map(_simular_lote, *zip(*argumentos)))
+    else:
+        lotes = [_simular_lote(*args) for args in argumentos]
+
+    acessos_por_canal = np.concatenate([lote[0] for lote in lotes])
+    taxa_leads = np.concatenate([lote[1] for lote in lotes])
+    taxa_vendas = np.concatenate([lote[2] for lote in lotes])
+
+    acessos = curvas.base + acessos_por_canal.sum(axis=1)
+    amostras = {"acessos": acessos, "leads": acessos * taxa_leads, "vendas": acessos * taxa_leads * taxa_vendas}
+    if valor_venda is not None:
+        vendas_por_canal = acessos_por_canal * (taxa_leads * taxa_vendas)[:, None]
+        online = np.isin(curvas.canais, CANAIS_ONLINE)
+        amostras["roi_geral"] = calcular_roi(vendas_por_canal, orcamentos, valor_venda)
+        amostras["roi_online"] = calcular_roi(vendas_por_canal, orcamentos, valor_venda, online)
+        amostras["roi_offline"] = calcular_roi(vendas_por_canal, orcamentos, valor_venda, ~online)
+    return amostras
+
+
+# Bandas de quantis de cada KPI: uma linha por KPI, uma coluna por quantil (P5, P50, P95, ...)
+def bandas_quantis(amostras, quantis=QUANTIS_PADRAO):
+    # pandas só é carregado aqui: a aba do simulador não precisa dele fora do modo incerteza
+    import pandas as pd
+
+    quantis = np.asarray(quantis)
+    valores = {kpi: np.nanquantile(serie, quantis) for kpi, serie in amostras.items()}
+    colunas = [f"P{q * 100:g}" for q in quantis]
+    return pd.DataFrame.from_dict(valores, orient='index', columns=colunas)
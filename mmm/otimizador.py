@@ -0,0 +1,261 @@
+import numpy as np
+
+# Valor mínimo do investimento efetivo usado nas derivadas (evita 0 ** negativo quando a inclinação < 1)
+_EPS = 1e-12
+
+
+# Com orçamento distribuído igualmente entre as semanas, o gasto após o adstock na semana t é a[c, t] * orçamento
+def coeficientes_semanais(curvas, semanas=None):
+    semanas = semanas or curvas.semanas
+    acumulado = np.cumsum(curvas.pesos, axis=1)
+    t = np.minimum(np.arange(semanas), curvas.pesos.shape[1] - 1)
+    return acumulado[:, t] / semanas
+
+
+def _por_canal(valor, canais, padrao):
+    if valor is None:
+        valor = padrao
+    if isinstance(valor, dict):
+        return np.array([valor.get(canal, padrao) for canal in canais], dtype=np.float64)
+    return np.broadcast_to(np.asarray(valor, dtype=np.float64), (len(canais),)).copy()
+
+
+# Otimizador de alocação por equalização do ROI marginal.
+#
+# No ótimo com orçamento fixo, todo canal que não está num limite tem a mesma resposta marginal λ
+# (acessos por mil R$). Para um λ dado, o investimento de cada canal sai direto da sua curva marginal
+# (analítica), e o λ que esgota o orçamento é achado por bisseção, vetorizada sobre vários orçamentos.
+# Curvas de Hill com inclinação > 1 têm formato em S: nesses canais a solução fica no ramo decrescente
+# da curva marginal ou no mínimo permitido, e um refino troca quais canais em S participam da solução.
+# Com `valor_venda` o objetivo passa a ser o lucro (vendas x valor - investimento): o orçamento total
+# vira um teto e só é gasto enquanto o ROI marginal for maior que 1.
+class OtimizadorOrcamento:
+    def __init__(self, curvas, semanas=None, pontos_grade=512, iteracoes=50, candidatos_troca=4,
+                 profundidade_saltos=3):
+        self.curvas = curvas
+        self.canais = curvas.canais
+        self.a = coeficientes_semanais(curvas, semanas)
+        self.beta = curvas.beta
+        self.meia_saturacao = curvas.meia_saturacao[:, None]
+        self.inclinacao = curvas.inclinacao[:, None]
+        self.pontos_grade = pontos_grade
+        self.iteracoes = iteracoes
+        self.candidatos_troca = candidatos_troca
+        self.profundidade_saltos = profundidade_saltos
+        self.pico = self._pico_marginal()
+
+    # Resposta de cada canal f_c(b) para orçamentos (..., canais)
+    def resposta(self, orcamentos):
+        u = self.a * np.asarray(orcamentos, dtype=np.float64)[..., None]
+        us = u ** self.inclinacao
+        return self.beta * (us / (us + self.meia_saturacao ** self.inclinacao)).sum(axis=-1)
+
+    # Derivada analítica f'_c(b) (e opcionalmente f''_c(b)) para orçamentos (..., canais)
+    def marginal(self, orcamentos, segunda=False):
+        u = np.maximum(self.a * np.asarray(orcamentos, dtype=np.float64)[..., None], _EPS)
+        s = self.inclinacao
+        ks = self.meia_saturacao ** s
+        us = u ** s
+        den = us + ks
+        primeira = self.beta * (self.a * s * ks * us / (u * den ** 2)).sum(axis=-1)
+        if not segunda:
+            return primeira
+        h2 = s * ks * us / (u ** 2 * den ** 3) * ((s - 1) * den - 2 * s * us)
+        return primeira, self.beta * (self.a ** 2 * h2).sum(axis=-1)
+
+    # Orçamento em que a resposta marginal de cada canal é máxima (0 para curvas côncavas)
+    def _pico_marginal(self):
+        s = self.inclinacao[:, 0]
+        pico = np.zeros(len(self.canais))
+        curvas_s = s > 1
+        if not curvas_s.any():
+            return pico
+        # Para um único termo de Hill o pico fica em u* = K ((s - 1) / (s + 1)) ** (1 / s); com várias semanas
+        # ele está entre o menor e o maior u*/a_t, e a segunda derivada troca de sinal uma vez nesse intervalo
+        ratio = np.where(curvas_s, (s - 1) / (s + 1), 1.0)
+        u_estrela = self.meia_saturacao[:, 0] * ratio ** (1 / s)
+        baixo = u_estrela / self.a.max(axis=1)
+        alto = u_estrela / self.a.min(axis=1)
+        for _ in range(self.iteracoes):
+            meio = (baixo + alto) / 2
+            _, f2 = self.marginal(meio, segunda=True)
+            crescente = f2 > 0
+            baixo = np.where(crescente, meio, baixo)
+            alto = np.where(crescente, alto, meio)
+        return np.where(curvas_s, (baixo + alto) / 2, 0.0)
+
+    # Investimento ótimo de cada canal para cada λ (..., ) -> (..., canais), dentro dos limites `baixo` e `alto`.
+    # `grade_b`, `grade_f` e `grade_r` são orçamento, resposta marginal e resposta no ramo decrescente de cada canal
+    def _alocacao(self, lam, baixo, alto, f_baixo, grade_b, grade_f, grade_r):
+        lam = np.asarray(lam, dtype=np.float64)
+        # A grade de f' é decrescente: quantos pontos ainda têm retorno marginal acima de λ (busca binária por canal)
+        g = self.pontos_grade
+        k = np.stack([g - np.searchsorted(grade_f[c, ::-1], lam, side='right') for c in range(len(self.canais))],
+                     axis=-1)
+        lam = lam[..., None]
+        i0 = np.clip(k - 1, 0, g - 1)
+        i1 = np.clip(k, 0, g - 1)
+        canal = np.arange(len(self.canais))
+        f0, f1 = grade_f[canal, i0], grade_f[canal, i1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = np.where(f0 > f1, (f0 - lam) / (f0 - f1), 0.0)
+        ramo = grade_b[canal, i0] + (grade_b[canal, i1] - grade_b[canal, i0]) * frac
+        f_ramo = grade_r[canal, i0] + (grade_r[canal, i1] - grade_r[canal, i0]) * frac
+
+        # Compara o ponto do ramo decrescente com ficar no limite inferior (relevante nas curvas em S)
+        escolhe_ramo = (f_ramo - lam * ramo >= f_baixo - lam * baixo) & (alto > baixo)
+        return np.where(escolhe_ramo, np.clip(ramo, baixo, alto), baixo)
+
+    # Retorno marginal mínimo (acessos por mil R$) para um investimento se pagar com o valor de venda dado
+    def _lambda_equilibrio(self, valor_venda):
+        return 1000.0 / (self.curvas.taxa_leads * self.curvas.taxa_vendas * valor_venda)
+
+    # Objetivo comparado entre alocações: acessos totais ou, com valor de venda, acessos menos o custo do
+    # investimento convertido em acessos (equivale ao lucro)
+    def _objetivo(self, alocacao, valor_venda=None):
+        valor = self.resposta(alocacao).sum(axis=-1)
+        if valor_venda is None:
+            return valor
+        return valor - self._lambda_equilibrio(valor_venda) * alocacao.sum(axis=-1)
+
+    # Bisseção em log(λ) para cada orçamento total. Devolve a alocação que fecha o orçamento e as
+    # alocações dos dois lados do λ final (diferem nos canais em S que entram ou saem da solução)
+    def _resolver(self, totais, baixo, alto, grades, valor_venda=None):
+        f_baixo = self.resposta(baixo)
+
+        def alocacao(lam):
+            return self._alocacao(lam, baixo, alto, f_baixo, *grades)
+
+        grade_f = grades[1]
+        # λ alto -> todos no limite inferior; λ baixo -> todos no superior
+        lam_baixo = np.full(totais.shape, max(grade_f.min() / 2, _EPS))
+        if valor_venda is not None:
+            # Abaixo do equilíbrio cada mil R$ a mais retorna menos que custa (ROI marginal < 1)
+            lam_baixo[:] = self._lambda_equilibrio(valor_venda)
+        lam_alto = np.full(totais.shape, max(grade_f.max(), lam_baixo.max()) * 2)
+
+        # Com ROI mínimo, onde nem o λ de break-even esgota o orçamento, o ótimo é gastar menos que o total
+        sobra = alocacao(lam_baixo).sum(axis=-1) <= totais
+        for _ in range(self.iteracoes):
+            lam = np.sqrt(lam_baixo * lam_alto)
+            acima = alocacao(lam).sum(axis=-1) > totais
+            lam_baixo = np.where(acima, lam, lam_baixo)
+            lam_alto = np.where(acima, lam_alto, lam)
+
+        aloc_baixo = alocacao(lam_baixo)
+        aloc_alto = alocacao(lam_alto)
+
+        # Combinação convexa entre os dois lados do λ final para fechar o orçamento exatamente
+        gasto_baixo = aloc_baixo.sum(axis=-1)
+        gasto_alto = aloc_alto.sum(axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            theta = np.where(gasto_baixo > gasto_alto, (totais - gasto_alto) / (gasto_baixo - gasto_alto), 0.0)
+        resultado = aloc_alto + np.clip(theta, 0.0, 1.0)[:, None] * (aloc_baixo - aloc_alto)
+        resultado = np.where(sobra[:, None], aloc_baixo, resultado)
+        salto = (np.abs(aloc_baixo - aloc_alto) > 1e-9) & ~sobra[:, None]
+        return resultado, salto, sobra
+
+    # Resolve e, enquanto algum canal ficar parcialmente financiado no salto, tenta tirá-lo da solução
+    # (a saída de um canal em S costuma empurrar o salto para o próximo); fica com o melhor ponto da cadeia
+    def _resolver_sem_saltos(self, totais, baixo, alto, minimo, grades, valor_venda, profundidade):
+        alocacao, salto, sobra = self._resolver(totais, baixo, alto, grades, valor_venda)
+        melhor = (alocacao, salto, sobra, baixo, alto)
+        valor = self._objetivo(alocacao, valor_venda)
+        for _ in range(profundidade):
+            if not salto.any():
+                break
+            baixo = np.where(salto, minimo, baixo)
+            alto = np.where(salto, minimo, alto)
+            viavel = salto.any(axis=1) & (alto.sum(axis=-1) >= totais - 1e-9)
+            alocacao, salto, sobra = self._resolver(totais, baixo, alto, grades, valor_venda)
+            novo_valor = self._objetivo(alocacao, valor_venda)
+            ganha = viavel & (novo_valor > valor + 1e-9)
+            valor = np.where(ganha, novo_valor, valor)
+            melhor = tuple(np.where(ganha.reshape((-1,) + (1,) * (velho.ndim - 1)), novo, velho)
+                           for novo, velho in zip((alocacao, salto, sobra, baixo, alto), melhor))
+            salto = salto & viavel[:, None]
+        return melhor, valor
+
+    # Alocações ótimas para vários orçamentos totais numa única chamada: (orçamentos,) -> (orçamentos, canais)
+    def alocar(self, orcamentos_totais, minimo=0.0, maximo=None, valor_venda=None, rodadas_refino=4):
+        totais = np.atleast_1d(np.asarray(orcamentos_totais, dtype=np.float64))
+        minimo = _por_canal(minimo, self.canais, 0.0)
+        maximo = _por_canal(maximo, self.canais, float(totais.max()))
+        if np.any(minimo > maximo):
+            raise ValueError("Limite mínimo maior que o máximo em algum canal")
+        if np.any(totais < minimo.sum() - 1e-9) or np.any(totais > maximo.sum() + 1e-9):
+            raise ValueError(f"Orçamento total fora do intervalo viável [{minimo.sum():g}, {maximo.sum():g}]")
+
+        # Grade do ramo decrescente de f' em cada canal, mais densa perto do início (onde f' muda mais rápido)
+        inicio = np.clip(self.pico, minimo, maximo)
+        passos = np.linspace(0.0, 1.0, self.pontos_grade) ** 2
+        grade_b = inicio[:, None] + (maximo - inicio)[:, None] * passos
+        grades = (grade_b, self.marginal(grade_b.T).T, self.resposta(grade_b.T).T)
+
+        baixo = np.broadcast_to(minimo, (len(totais), len(self.canais)))
+        alto = np.broadcast_to(maximo, baixo.shape)
+        alocacao, salto, sobra = self._resolver(totais, baixo, alto, grades, valor_venda)
+
+        # Refino para curvas em S, onde a equalização de λ não garante o ótimo: o canal que "salta" no λ final
+        # fica parcialmente financiado no trecho convexo da curva, e trocar quais canais em S participam pode
+        # render mais. Cada troca vira limites por orçamento: tirar da solução (máximo = mínimo) ou forçar no
+        # ramo decrescente (mínimo = pico). Só aceita melhora estrita, então não entra em ciclo
+        curvas_s = self.inclinacao[:, 0] > 1
+        f_minimo = self.resposta(minimo)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            retorno_entrada = (self.resposta(inicio) - f_minimo) / (inicio - minimo)
+        for _ in range(rodadas_refino):
+            ativos = curvas_s & (alocacao > minimo + 1e-9) & ~sobra[:, None]
+            candidatos = [(salto, np.where(salto, minimo, baixo), np.where(salto, minimo, alto)),
+                          (salto, np.where(salto, inicio, baixo), alto)]
+            # Candidatos a sair: os canais em S ativos com menor retorno médio em cada orçamento.
+            # Candidatos a entrar: os canais em S parados no mínimo com maior retorno médio até o pico
+            inativos = curvas_s & (alocacao <= minimo + 1e-9) & (inicio > minimo) & (alto > minimo) & ~sobra[:, None]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                retorno = np.where(ativos, (self.resposta(alocacao) - f_minimo) / (alocacao - minimo), np.inf)
+            ordem_saida = np.argsort(retorno, axis=1)[:, :self.candidatos_troca]
+            ordem_entrada = np.argsort(np.where(inativos, -retorno_entrada, np.inf), axis=1)[:, :self.candidatos_troca]
+            linhas = np.arange(len(totais))
+            for posicao in range(ordem_saida.shape[1]):
+                mascara = np.zeros(baixo.shape, dtype=bool)
+                mascara[linhas, ordem_saida[:, posicao]] = ativos[linhas, ordem_saida[:, posicao]]
+                if mascara.any():
+                    candidatos.append((mascara, np.where(mascara, minimo, baixo), np.where(mascara, minimo, alto)))
+                mascara = np.zeros(baixo.shape, dtype=bool)
+                mascara[linhas, ordem_entrada[:, posicao]] = inativos[linhas, ordem_entrada[:, posicao]]
+                if mascara.any():
+                    candidatos.append((mascara, np.where(mascara, inicio, baixo), alto))
+
+            melhor = self._objetivo(alocacao, valor_venda)
+            atual = (alocacao, salto, sobra, baixo, alto)
+            proximo = atual
+            for mascara, novo_baixo, novo_alto in candidatos:
+                linhas = mascara.any(axis=1)
+                viavel = linhas & (novo_baixo.sum(axis=-1) <= totais + 1e-9) & (novo_alto.sum(axis=-1) >= totais - 1e-9)
+                if not viavel.any():
+                    continue
+                candidato, valor = self._resolver_sem_saltos(totais, novo_baixo, novo_alto, minimo, grades, valor_venda,
+                                                             self.profundidade_saltos)
+                ganha = viavel & (valor > melhor + 1e-9)
+                if ganha.any():
+                    melhor = np.where(ganha, valor, melhor)
+                    proximo = tuple(np.where(ganha.reshape((-1,) + (1,) * (velho.ndim - 1)), novo, velho)
+                                    for novo, velho in zip(candidato, proximo))
+            if proximo is atual:
+                break
+            alocacao, salto, sobra, baixo, alto = proximo
+        return alocacao
+
+
+# Alocação ótima para um orçamento total; devolve {canal: investimento}
+def otimizar_alocacao(curvas, orcamento_total, minimo=0.0, maximo=None, valor_venda=None):
+    otimizador = OtimizadorOrcamento(curvas)
+    alocacao = otimizador.alocar([orcamento_total], minimo, maximo, valor_venda)[0]
+    return dict(zip(curvas.canais, alocacao))
+
+
+# Fronteira eficiente: alocação ótima e resultados simulados para cada nível de orçamento
+def fronteira_eficiente(curvas, orcamentos_totais, minimo=0.0, maximo=None, valor_venda=None):
+    otimizador = OtimizadorOrcamento(curvas)
+    alocacoes = otimizador.alocar(orcamentos_totais, minimo, maximo, valor_venda)
+    return alocacoes, curvas.simular(alocacoes)
@@ -0,0 +1,207 @@
+# Instrumentação de desempenho: tempo de parede, tempo de CPU e pico de memória por etapa nomeada.
+#
+# As etapas só são medidas dentro de uma execução ativa (`execucao(...)`), registrada por thread: cada rerun
+# do Streamlit roda na thread da sua sessão, então uma sessão com o perfil ligado não afeta as outras.
+# Sem execução ativa, `etapa(...)` devolve um contexto vazio compartilhado (custo de uma consulta de atributo).
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+# Arquivo JSON lines onde cada execução finalizada é acrescentada (opcional, para análise offline)
+TRACE_ENV = 'OKIAR_PERFIL_TRACE'
+
+_local = threading.local()
+_arquivo_lock = threading.Lock()
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_usuarios = 0
+
+
+class _EtapaNula:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULA = _EtapaNula()
+
+
+# Uma execução (um rerun do app, um treino, ...) com as etapas medidas dentro dela, na ordem em que terminaram
+class Execucao:
+    def __init__(self, rotulo, memoria=True):
+        self.rotulo = rotulo
+        self.memoria = memoria
+        self.inicio_epoch = time.time()
+        self.inicio = time.perf_counter()
+        self.duracao = None
+        self.etapas = []
+        self._pilha = []
+
+    def _entrar(self, nome, atributos):
+        quadro = {
+            'nome': nome,
+            'atributos': atributos,
+            'profundidade': len(self._pilha),
+            'inicio': time.perf_counter(),
+            'cpu': time.process_time(),
+            'pico': 0,
+        }
+        if self.memoria:
+            atual, pico = tracemalloc.get_traced_memory()
+            # O pico do tracemalloc é global: guarda o do pai antes de zerar para a etapa filha
+            if self._pilha:
+                self._pilha[-1]['pico'] = max(self._pilha[-1]['pico'], pico)
+            tracemalloc.reset_peak()
+            quadro['memoria_inicial'] = atual
+        self._pilha.append(quadro)
+
+    def _sair(self):
+        quadro = self._pilha.pop()
+        fim = time.perf_counter()
+        registro = {
+            'nome': quadro['nome'],
+            'profundidade': quadro['profundidade'],
+            'inicio_s': quadro['inicio'] - self.inicio,
+            'wall_s': fim - quadro['inicio'],
+            'cpu_s': time.process_time() - quadro['cpu'],
+        }
+        if self.memoria:
+            pico = max(quadro['pico'], tracemalloc.get_traced_memory()[1])
+            registro['pico_mb'] = max(pico - quadro['memoria_inicial'], 0) / 2 ** 20
+            if self._pilha:
+                self._pilha[-1]['pico'] = max(self._pilha[-1]['pico'], pico)
+        if quadro['atributos']:
+            registro['atributos'] = quadro['atributos']
+        self.etapas.append(registro)
+
+    def finalizar(self):
+        self.duracao = time.perf_counter() - self.inicio
+
+    # Um dicionário por etapa, com o rótulo e o início da execução (formato das linhas do JSON lines)
+    def registros(self):
+        return [{'execucao': self.rotulo, 'execucao_inicio': self.inicio_epoch, **etapa} for etapa in self.etapas]
+
+
+class _Etapa:
+    __slots__ = ('execucao', 'nome', 'atributos')
+
+    def __init__(self, execucao, nome, atributos):
+        self.execucao = execucao
+        self.nome = nome
+        self.atributos = atributos
+
+    def __enter__(self):
+        self.execucao._entrar(self.nome, self.atributos)
+        return self
+
+    def __exit__(self, *exc):
+        self.execucao._sair()
+        return False
+
+
+# Execução ativa na thread atual (None quando o perfil está desligado)
+def execucao_atual():
+    return getattr(_local, 'execucao', None)
+
+
+# Contexto de uma etapa nomeada; não mede nada fora de uma execução ativa
+def etapa(nome, **atributos):
+    execucao = getattr(_local, 'execucao', None)
+    if execucao is None:
+        return _NULA
+    return _Etapa(execucao, nome, atributos)
+
+
+# Decorador equivalente a envolver a função inteira em `etapa(nome)`
+def medir(nome):
+    def decorador(func):
+        @wraps(func)
+        def envolvida(*args, **kwargs):
+            with etapa(nome):
+                return func(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def _iniciar_tracemalloc():
+    global _tracemalloc_usuarios
+    with _tracemalloc_lock:
+        if _tracemalloc_usuarios == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracemalloc_usuarios += 1
+
+
+def _parar_tracemalloc():
+    global _tracemalloc_usuarios
+    with _tracemalloc_lock:
+        _tracemalloc_usuarios -= 1
+        if _tracemalloc_usuarios == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+# Abre uma execução na thread atual. Com `ativo=False` não mede nada e devolve None, e as etapas dentro dela
+# continuam sem custo. `memoria` liga o tracemalloc durante a execução (deixa o código medido mais lento)
+@contextmanager
+def execucao(rotulo, ativo=True, memoria=True):
+    if not ativo or execucao_atual() is not None:
+        yield None
+        return
+    atual = Execucao(rotulo, memoria)
+    if memoria:
+        _iniciar_tracemalloc()
+    _local.execucao = atual
+    try:
+        yield atual
+    finally:
+        _local.execucao = None
+        atual.finalizar()
+        if memoria:
+            _parar_tracemalloc()
+        caminho = os.environ.get(TRACE_ENV)
+        if caminho:
+            exportar_jsonl([atual], caminho)
+
+
+# Acrescenta as etapas das execuções num arquivo JSON lines (uma etapa por linha)
+def exportar_jsonl(execucoes, caminho):
+    linhas = [json.dumps(registro, ensure_ascii=False) for ex in execucoes for registro in ex.registros()]
+    with _arquivo_lock, open(caminho, 'a', encoding='utf-8') as arquivo:
+        arquivo.write(''.join(linha + '\n' for linha in linhas))
+
+
+# Trace no formato do Chrome (chrome://tracing, Perfetto): uma trilha por execução, eventos completos ("X")
+def trace_chrome(execucoes):
+    eventos = []
+    if not execucoes:
+        return {'traceEvents': eventos, 'displayTimeUnit': 'ms'}
+    origem = min(ex.inicio_epoch for ex in execucoes)
+    for tid, ex in enumerate(execucoes, start=1):
+        base_us = (ex.inicio_epoch - origem) * 1e6
+        eventos.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': ex.rotulo}})
+        for registro in ex.etapas:
+            args = {'cpu_ms': registro['cpu_s'] * 1000}
+            if 'pico_mb' in registro:
+                args['pico_mb'] = registro['pico_mb']
+            args.update(registro.get('atributos', {}))
+            eventos.append({
+                'name': registro['nome'],
+                'ph': 'X',
+                'pid': 1,
+                'tid': tid,
+                'ts': base_us + registro['inicio_s'] * 1e6,
+                'dur': registro['wall_s'] * 1e6,
+                'args': args,
+            })
+    return {'traceEvents': eventos, 'displayTimeUnit': 'ms'}
+
+
+def exportar_chrome_trace(execucoes, caminho):
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(trace_chrome(execucoes), arquivo)
@@ -0,0 +1,67 @@
+# Painel de perfil na sidebar: tempo de parede, CPU e pico de memória por etapa nas últimas N execuções
+import json
+from collections import deque
+
+import streamlit as st
+
+from perfil import trace_chrome
+
+HISTORICO_PADRAO = 10
+
+
+# Controles do perfil na sidebar; devolve (ativo, medir_memoria) para abrir a execução do rerun
+def controles_perfil():
+    ativo = st.sidebar.checkbox("Perfil de desempenho", key="perfil_ativo")
+    memoria = False
+    if ativo:
+        memoria = st.sidebar.checkbox("Medir memória (tracemalloc)", key="perfil_memoria",
+                                      help="Mede o pico de memória de cada etapa, mas deixa o rerun várias vezes "
+                                           "mais lento (os tempos medidos junto com a memória ficam inflados)")
+    return ativo, memoria
+
+
+def _historico(tamanho):
+    historico = st.session_state.get('perfil_historico')
+    if historico is None or historico.maxlen != tamanho:
+        historico = deque(historico or [], maxlen=tamanho)
+        st.session_state['perfil_historico'] = historico
+    return historico
+
+
+# Guarda a execução do rerun atual no histórico da sessão e mostra o painel
+def mostrar_painel(execucao):
+    import pandas as pd
+
+    with st.sidebar.expander("Perfil das últimas execuções", expanded=True):
+        tamanho = st.number_input("Execuções no histórico", min_value=1, max_value=100, value=HISTORICO_PADRAO,
+                                  key="perfil_historico_tamanho")
+        historico = _historico(int(tamanho))
+        historico.append(execucao)
+
+        registros = pd.DataFrame([
+            {**registro, 'rerun': i} for i, ex in enumerate(historico) for registro in ex.registros()
+        ])
+        if registros.empty:
+            st.write("Nenhuma etapa medida.")
+            return
+        registros['etapa'] = ['  ' * p + nome for p, nome in zip(registros['profundidade'], registros['nome'])]
+        ultimo = registros['rerun'] == registros['rerun'].max()
+        # As etapas são registradas ao terminar (filhas antes da mãe): a tabela segue a ordem de início
+        ordem = registros[ultimo].sort_values('inicio_s')['etapa'].tolist()
+
+        colunas = {'wall_s': 'wall (ms)', 'cpu_s': 'CPU (ms)'}
+        if 'pico_mb' in registros:
+            colunas['pico_mb'] = 'pico (MB)'
+        resumo = registros[ultimo].groupby('etapa', sort=False)[list(colunas)].sum()
+        resumo[['wall_s', 'cpu_s']] *= 1000
+        resumo['média wall (ms)'] = registros.groupby('etapa')['wall_s'].mean() * 1000
+        resumo = resumo.rename(columns=colunas).reindex(list(dict.fromkeys(ordem)))
+        st.write(f"Último rerun: **{execucao.rotulo}**, {execucao.duracao * 1000:.0f} ms "
+                 f"(média em {len(historico)} execuções)")
+        st.dataframe(resumo.style.format("{:.1f}"))
+
+        # Exportação para análise offline: JSON lines (uma etapa por linha) ou trace do Chrome/Perfetto
+        linhas = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for ex in historico for r in ex.registros())
+        st.download_button("Baixar JSON lines", linhas, file_name="perfil.jsonl", mime="application/jsonl")
+        st.download_button("Baixar trace do Chrome", json.dumps(trace_chrome(list(historico))),
+                           file_name="perfil_trace.json", mime="application/json")
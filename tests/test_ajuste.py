@@ -0,0 +1,48 @@
+# Ajuste do MMM (mmm.ajuste): o gradiente analítico do objetivo é o das diferenças finitas, com adstock
+# geométrico e Weibull, e o multi-start dá o mesmo ajuste em série e no pool de processos
+#
+# Uso: python -m pytest tests
+import numpy as np
+import pytest
+
+from mmm.ajuste import ProblemaMMM, ajustar_mmm, historico_sintetico
+from mmm.curvas import PARAMETROS_PADRAO, curvas_padrao
+
+INVESTIMENTOS = {"Google Ads": 100, "Meta Ads": 100, "Out of Home": 50, "Rádio": 75, "TV Paga": 150,
+                 "TV Aberta": 200, "Influenciadores": 120}
+
+
+@pytest.fixture(scope='module')
+def historico():
+    return historico_sintetico(curvas_padrao(INVESTIMENTOS), INVESTIMENTOS, semanas=104)
+
+
+@pytest.fixture(scope='module')
+def problema(historico):
+    gastos, kpi = historico
+    return ProblemaMMM(gastos, kpi, [PARAMETROS_PADRAO[canal]['adstock'] for canal in INVESTIMENTOS])
+
+
+def test_gradiente_igual_as_diferencas_finitas(problema):
+    assert set(problema.tipos) == {'geometrico', 'weibull'}
+    baixo, alto = problema.limites()
+    for ponto in problema.inicios(4, seed=1):
+        # Diferenças centrais por coordenada, longe dos limites para o passo não sair da região válida
+        x = np.clip(ponto / problema.escala, baixo / problema.escala + 1e-3, alto / problema.escala - 1e-3)
+        _, grad = problema.objetivo(x)
+        passo = 1e-6
+        numerico = np.empty_like(x)
+        for i in range(len(x)):
+            e = np.zeros_like(x)
+            e[i] = passo
+            numerico[i] = (problema.objetivo(x + e)[0] - problema.objetivo(x - e)[0]) / (2 * passo)
+        np.testing.assert_allclose(grad, numerico, rtol=1e-6, atol=1e-6 * np.abs(numerico).max())
+
+
+def test_pool_igual_ao_ajuste_em_serie(historico):
+    gastos, kpi = historico
+    canais = list(INVESTIMENTOS)
+    serie = ajustar_mmm(gastos, kpi, canais, inicios=4, processos=1, max_iteracoes=50)
+    pool = ajustar_mmm(gastos, kpi, canais, inicios=4, processos=2, max_iteracoes=50, limite_paralelo=0)
+    np.testing.assert_array_equal(pool.theta, serie.theta)
+    assert pool.perdas == serie.perdas
@@ -0,0 +1,84 @@
+# Cubo de conversion values gravado em arquivo: a chave do modelo e a versão do cubo voltam do .npz, o scoring
+# em blocos recusa acrescentar clientes a um cubo de outro modelo e cada cliente conta uma vez só
+#
+# Uso: python -m pytest tests
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from flag.cube import CUBE_VERSION, ConversionCube
+from flag.ingest import load_dataset
+from flag.pipeline import transform
+from flag.streaming import DEFAULT_TRAIN_PATH, fit_on_sample, main
+
+SAMPLE_SIZE = 5_000
+
+
+@pytest.fixture(scope='module')
+def modelo():
+    return fit_on_sample(DEFAULT_TRAIN_PATH, SAMPLE_SIZE)
+
+
+def test_save_load_guarda_chave_e_versao(tmp_path, modelo):
+    artefatos, chave = modelo
+    caminho = tmp_path / 'cubo.npz'
+    ConversionCube.for_artifacts(artefatos, model_key=chave).save(caminho)
+    cubo = ConversionCube.load(caminho)
+    assert cubo.model_key == chave
+    assert cubo.version == CUBE_VERSION
+
+
+def test_save_mantem_o_caminho_sem_extensao(tmp_path, modelo):
+    artefatos, chave = modelo
+    caminho = tmp_path / 'cubo'
+    ConversionCube.for_artifacts(artefatos, model_key=chave).save(caminho)
+    assert os.listdir(tmp_path) == ['cubo']
+    assert ConversionCube.load(caminho).model_key == chave
+
+
+def test_streaming_nao_conta_o_mesmo_arquivo_duas_vezes(tmp_path, modelo):
+    caminho = tmp_path / 'cubo.npz'
+    argumentos = [DEFAULT_TRAIN_PATH, str(tmp_path / 'scores.csv'), '--sample-size', str(SAMPLE_SIZE),
+                  '--cube', str(caminho)]
+    main(argumentos)
+    primeiro = ConversionCube.load(caminho)
+    main(argumentos)
+    segundo = ConversionCube.load(caminho)
+    assert segundo.total == primeiro.total == len(load_dataset(DEFAULT_TRAIN_PATH))
+    np.testing.assert_array_equal(segundo.counts, primeiro.counts)
+    np.testing.assert_allclose(segundo.sums, primeiro.sums)
+
+
+def test_cliente_repontuado_substitui_a_contribuicao_antiga(modelo):
+    artefatos, chave = modelo
+    df_novo = transform(load_dataset(DEFAULT_TRAIN_PATH).head(100), artefatos)
+    valores = np.arange(len(df_novo), dtype=np.float64)
+    cubo = ConversionCube.for_artifacts(artefatos, model_key=chave).add(df_novo, valores)
+
+    # Os 10 primeiros clientes voltam com outro valor e outra data da última transação
+    repontuados = df_novo.head(10).assign(Last_Transaction_Days_Ago=lambda d: d['Last_Transaction_Days_Ago'] + 1)
+    cubo.add(repontuados, np.full(10, 1000.0))
+    esperado = ConversionCube.for_artifacts(artefatos, model_key=chave)
+    esperado.add(pd.concat([repontuados, df_novo.iloc[10:]]), np.concatenate([np.full(10, 1000.0), valores[10:]]))
+    assert cubo.total == len(df_novo)
+    np.testing.assert_array_equal(cubo.counts, esperado.counts)
+    np.testing.assert_allclose(cubo.sums, esperado.sums, atol=1e-9)
+
+    with pytest.raises(ValueError, match='repetido'):
+        cubo.add(pd.concat([df_novo.head(2), df_novo.head(1)]), np.zeros(3))
+
+
+@pytest.mark.parametrize('model_key, version', [('outro-modelo', CUBE_VERSION), (None, CUBE_VERSION - 1)])
+def test_streaming_recusa_cubo_de_outro_modelo(tmp_path, modelo, model_key, version):
+    artefatos, chave = modelo
+    caminho = tmp_path / 'cubo.npz'
+    cubo = ConversionCube.for_artifacts(artefatos, model_key=model_key or chave)
+    cubo.version = version
+    cubo.save(caminho)
+    antes = np.load(caminho)['counts'].sum()
+    with pytest.raises(SystemExit):
+        main([DEFAULT_TRAIN_PATH, str(tmp_path / 'scores.csv'), '--sample-size', str(SAMPLE_SIZE),
+              '--cube', str(caminho)])
+    assert np.load(caminho)['counts'].sum() == antes
@@ -0,0 +1,43 @@
+# Modelo exportado do FLAG (flag.export): o arquivo reproduz o scoring dos artefatos e só é carregado pela mesma
+# versão do pipeline que o gerou
+#
+# Uso: python -m pytest tests
+import io
+
+import numpy as np
+import pytest
+
+from flag.export import export_model, load_model
+from flag.ingest import load_dataset
+from flag.pipeline import PIPELINE_VERSION, fit_pipeline, transform
+from flag.scoring import ltv_models, predict_conversion_values
+from flag.streaming import DEFAULT_TRAIN_PATH
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    return load_dataset(DEFAULT_TRAIN_PATH)
+
+
+@pytest.fixture(scope='module')
+def artefatos(dataset):
+    return fit_pipeline(dataset, processes=1)
+
+
+def exportar(artefatos, metadata=None):
+    arquivo = io.BytesIO()
+    export_model(artefatos, arquivo, 'chave', metadata)
+    arquivo.seek(0)
+    return arquivo
+
+
+def test_modelo_exportado_pontua_igual(dataset, artefatos):
+    exportado = load_model(exportar(artefatos))
+    np.testing.assert_allclose(predict_conversion_values(transform(dataset, exportado), ltv_models(exportado)),
+                               predict_conversion_values(transform(dataset, artefatos), ltv_models(artefatos)),
+                               rtol=1e-9)
+
+
+def test_modelo_de_outra_versao_do_pipeline_e_recusado(artefatos):
+    with pytest.raises(ValueError, match='pipeline'):
+        load_model(exportar(artefatos, metadata={'pipeline_version': PIPELINE_VERSION - 1}))
@@ -0,0 +1,82 @@
+# GLM Gamma em NumPy (flag.glm) contra o statsmodels: em cada cluster do dataset real e em lotes de segmentos
+# pequenos, os coeficientes, as médias ajustadas, as iterações e os diagnósticos são os do sm.GLM
+#
+# Uso: python -m pytest tests
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
+
+from flag.glm import Gamma, fit_glm, fit_glm_batch
+from flag.ingest import load_dataset
+from flag.pipeline import encode_features, fit_payment_scores, model_features
+from flag.scoring import GLM_FEATURES
+from flag.streaming import DEFAULT_TRAIN_PATH
+
+
+# Matriz de desenho dos GLMs, LTV e cluster de cada cliente, como no treino do app
+@pytest.fixture(scope='module')
+def desenho():
+    df = load_dataset(DEFAULT_TRAIN_PATH)
+    df_novo = encode_features(df, fit_payment_scores(df))
+    features = model_features(df_novo)
+    labels = KMeans(n_clusters=5, random_state=42).fit_predict(features)
+    componentes = PCA(n_components=2).fit_transform(features)
+    df_novo['PCA_1'] = componentes[:, 0]
+    df_novo['PCA_2'] = componentes[:, 1]
+    X = df_novo.reindex(columns=GLM_FEATURES, fill_value=1).to_numpy(dtype=np.float64)
+    return X, df_novo['LTV'].to_numpy(dtype=np.float64), labels
+
+
+def ajuste_statsmodels(X, y, family=None):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return sm.GLM(y, pd.DataFrame(X, columns=GLM_FEATURES), family=family or sm.families.Gamma()).fit()
+
+
+def comparar(resultado, referencia, X):
+    # Médias sem o limite ao suporte do treino: a comparação é do ajuste, não do scoring
+    mu = resultado.family.link.inverse(X @ np.asarray(resultado.params))
+    np.testing.assert_allclose(mu, referencia.fittedvalues, rtol=1e-10)
+    # Coeficientes pela contribuição de cada coluna ao preditor linear: o da constante fica na ordem de 1e-19
+    # (a escala de Total_Spent domina) e só os seus primeiros dígitos são determinados pelos dados
+    escala = np.linalg.norm(X, axis=0)
+    np.testing.assert_allclose(np.asarray(resultado.params) * escala, np.asarray(referencia.params) * escala,
+                               rtol=1e-6, atol=1e-6 * np.linalg.norm(X @ np.asarray(referencia.params)))
+    assert resultado.iterations == referencia.fit_history['iteration']
+    assert resultado.rank == referencia.df_model + 1
+    np.testing.assert_allclose([resultado.deviance, resultado.llf, resultado.aic, resultado.scale],
+                               [referencia.deviance, referencia.llf, referencia.aic, referencia.scale], rtol=1e-9)
+
+
+@pytest.mark.parametrize('cluster', range(5))
+def test_glm_do_cluster_igual_ao_statsmodels(desenho, cluster):
+    X, y, labels = desenho
+    idx = labels == cluster
+    resultado = fit_glm(X[idx], y[idx], Gamma(), GLM_FEATURES)
+    assert resultado.converged
+    assert list(resultado.params.index) == GLM_FEATURES
+    comparar(resultado, ajuste_statsmodels(X[idx], y[idx]), X[idx])
+
+
+def test_ligacao_log_igual_ao_statsmodels(desenho):
+    X, y, labels = desenho
+    idx = labels == 0
+    resultado = fit_glm(X[idx], y[idx], Gamma('log'))
+    comparar(resultado, ajuste_statsmodels(X[idx], y[idx], sm.families.Gamma(sm.families.links.Log())), X[idx])
+
+
+def test_lote_igual_aos_ajustes_individuais(desenho):
+    X, y, _ = desenho
+    rng = np.random.default_rng(0)
+    idx = rng.integers(0, len(y), (20, 200))
+    Xs, ys = X[idx], y[idx]
+    for i, resultado in enumerate(fit_glm_batch(Xs, ys)):
+        individual = fit_glm(Xs[i], ys[i])
+        np.testing.assert_allclose(resultado.params, individual.params, rtol=1e-9, atol=1e-12)
+        assert resultado.iterations == individual.iterations
+        comparar(resultado, ajuste_statsmodels(Xs[i], ys[i]), Xs[i])
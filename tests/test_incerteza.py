@@ -0,0 +1,23 @@
+# Monte Carlo do simulador do MMM (mmm.incerteza): com a mesma semente, as amostras são as mesmas em série e
+# no pool de processos, pois cada lote tem a sua semente derivada da principal
+#
+# Uso: python -m pytest tests
+import numpy as np
+
+from mmm.curvas import curvas_padrao
+from mmm.incerteza import simular_incerteza
+
+INVESTIMENTOS = {"Google Ads": 100, "Meta Ads": 100, "Out of Home": 50, "Rádio": 75, "TV Paga": 150,
+                 "TV Aberta": 200, "Influenciadores": 120}
+
+
+def test_pool_igual_a_simulacao_em_serie():
+    curvas = curvas_padrao(INVESTIMENTOS)
+    orcamentos = np.array(list(INVESTIMENTOS.values()), dtype=np.float64)
+    argumentos = dict(n_amostras=10_000, seed=7, valor_venda=100.0, tamanho_lote=2_500)
+    serie = simular_incerteza(curvas, orcamentos, processos=1, **argumentos)
+    pool = simular_incerteza(curvas, orcamentos, processos=2, limite_paralelo=0, **argumentos)
+    assert serie.keys() == pool.keys()
+    for kpi in serie:
+        assert len(serie[kpi]) == 10_000
+        np.testing.assert_array_equal(pool[kpi], serie[kpi])
@@ -0,0 +1,22 @@
+# Treinos fora do app (flag.streaming.fit_on_sample: CLIs de scoring, export, rescoring incremental e serviço)
+# usam o mesmo k escolhido automaticamente que o app, e portanto a mesma segmentação
+#
+# Uso: python -m pytest tests
+import numpy as np
+
+from flag.ingest import load_dataset
+from flag.k_selection import load_or_select_k
+from flag.pipeline import DEFAULT_HYPERPARAMETERS, fit_pipeline
+from flag.streaming import DEFAULT_TRAIN_PATH, fit_on_sample
+
+
+def test_fit_on_sample_usa_o_k_do_app():
+    df = load_dataset(DEFAULT_TRAIN_PATH)
+    selecao_k = load_or_select_k(DEFAULT_TRAIN_PATH, df, backend=DEFAULT_HYPERPARAMETERS['clustering_backend'])
+    app = fit_pipeline(df, **{**DEFAULT_HYPERPARAMETERS, 'num_clusters': selecao_k['k']})
+
+    # A amostra cobre o arquivo inteiro: o modelo tem de ser o do app
+    artefatos, _ = fit_on_sample(DEFAULT_TRAIN_PATH, len(df))
+    assert len(artefatos['cluster_counts']) == selecao_k['k']
+    assert artefatos['cluster_names'] == app['cluster_names']
+    np.testing.assert_allclose(artefatos['kmeans'].cluster_centers_, app['kmeans'].cluster_centers_)
@@ -0,0 +1,38 @@
+# Curvas das abas do MMM (abas.mmm_comum): sem histórico são as curvas padrão, marcadas como demonstração; com
+# histórico, as ajustadas nele. Nada é ajustado no import do módulo
+#
+# Uso: python -m pytest tests
+import numpy as np
+import pandas as pd
+
+import abas.mmm_comum as mmm_comum
+from cache_modelos import ModelCache
+from mmm.ajuste import historico_sintetico
+from mmm.curvas import curvas_padrao
+
+
+def test_sem_historico_usa_curvas_padrao_de_demonstracao(tmp_path, monkeypatch):
+    monkeypatch.setattr(mmm_comum, 'HISTORICO_MMM', str(tmp_path / 'ausente.csv'))
+    monkeypatch.setattr(mmm_comum, '_modelos', {})
+    ajuste, curvas = mmm_comum.modelo_mmm()
+    assert ajuste is None
+    padrao = curvas_padrao(mmm_comum.investimentos_iniciais)
+    np.testing.assert_allclose(curvas.beta, padrao.beta)
+    assert 'demonstração' in mmm_comum.descricao_curvas(ajuste)
+
+
+def test_com_historico_usa_o_ajuste(tmp_path, monkeypatch):
+    investimentos = mmm_comum.investimentos_iniciais
+    gastos, kpi = historico_sintetico(curvas_padrao(investimentos), investimentos, semanas=104)
+    historico = pd.DataFrame(gastos.T, columns=list(investimentos)).assign(acessos=kpi)
+    caminho = tmp_path / 'historico.csv'
+    historico.to_csv(caminho, index=False)
+
+    monkeypatch.setattr(mmm_comum, 'HISTORICO_MMM', str(caminho))
+    monkeypatch.setattr(mmm_comum, '_modelos', {})
+    monkeypatch.setattr(mmm_comum, '_cache_ajustes', ModelCache(str(tmp_path / 'cache')))
+    ajuste, curvas = mmm_comum.modelo_mmm()
+    assert len(ajuste.kpi) == 104
+    assert curvas.canais == list(investimentos)
+    assert 'semanas de histórico' in mmm_comum.descricao_curvas(ajuste)
+    assert mmm_comum.modelo_mmm()[0] is ajuste
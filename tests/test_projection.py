@@ -0,0 +1,88 @@
+# Projeção PCA do FLAG (flag.projection): os solvers 'randomized' e 'incremental' (também lendo o arquivo em
+# blocos) dão os componentes do PCA do sklearn, a menos do sinal, e a projeção reaproveitada entre treinos só
+# entra num treino com as mesmas colunas de features, na mesma ordem
+#
+# Uso: python -m pytest tests
+import numpy as np
+import pytest
+from sklearn.decomposition import PCA
+
+from flag.ingest import load_dataset
+from flag.pipeline import encode_features, fit_payment_scores, fit_pipeline, model_features
+from flag.projection import fit_projection, fit_projection_stream, load_projection, project, save_projection
+from flag.streaming import DEFAULT_TRAIN_PATH
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    return load_dataset(DEFAULT_TRAIN_PATH)
+
+
+@pytest.fixture(scope='module')
+def features(dataset):
+    return np.asarray(model_features(encode_features(dataset, fit_payment_scores(dataset))), dtype=np.float64)
+
+
+@pytest.fixture(scope='module')
+def referencia(features):
+    return PCA(n_components=2).fit(features)
+
+
+# Compara com o PCA do sklearn componente a componente, depois de alinhar o sinal de cada um
+def comparar(projecao, referencia, features):
+    sinais = np.sign(np.sum(projecao.components_ * referencia.components_, axis=1))
+    np.testing.assert_allclose(projecao.components_ * sinais[:, None], referencia.components_, atol=1e-10)
+    np.testing.assert_allclose(projecao.explained_variance_, referencia.explained_variance_, rtol=1e-10)
+    np.testing.assert_allclose(projecao.mean_, referencia.mean_, rtol=1e-12)
+    esperado = referencia.transform(features)
+    np.testing.assert_allclose(project(projecao, features, chunksize=1_000) * sinais, esperado,
+                               atol=1e-10 * np.abs(esperado).max())
+    return sinais
+
+
+@pytest.mark.parametrize('solver', ['randomized', 'incremental'])
+def test_solver_igual_ao_pca_do_sklearn(features, referencia, solver):
+    projecao = fit_projection(features, solver, chunksize=999)
+    sinais = comparar(projecao, referencia, features)
+    if solver == 'incremental':
+        # O StreamingPCA aplica a convenção de sinal do sklearn: os componentes saem iguais, não só a menos do sinal
+        np.testing.assert_array_equal(sinais, 1.0)
+
+
+def test_projecao_lida_do_arquivo_igual_ao_pca_do_sklearn(dataset, features, referencia):
+    projecao, _ = fit_projection_stream(DEFAULT_TRAIN_PATH, fit_payment_scores(dataset), chunksize=1_500)
+    comparar(projecao, referencia, features)
+
+
+@pytest.fixture(scope='module')
+def projecao_gravada(tmp_path_factory, dataset):
+    projecao, colunas = fit_projection_stream(DEFAULT_TRAIN_PATH, fit_payment_scores(dataset))
+    caminho = tmp_path_factory.mktemp('projecao') / 'projecao.npz'
+    save_projection(caminho, projecao, colunas)
+    return caminho
+
+
+def test_projecao_gravada_e_reaproveitada(dataset, projecao_gravada):
+    projecao, colunas, _ = load_projection(projecao_gravada)
+    artefatos = fit_pipeline(dataset, processes=1, projection=projecao)
+    assert artefatos['pca'] is projecao
+    assert artefatos['feature_columns'] == colunas
+
+
+def test_projecao_com_outra_ordem_de_colunas_e_recusada(dataset, projecao_gravada):
+    projecao, colunas, _ = load_projection(projecao_gravada)
+    reordenadas = dataset[[*dataset.columns[::-1]]]
+    with pytest.raises(ValueError, match='outras colunas'):
+        fit_pipeline(reordenadas, processes=1, projection=projecao)
+
+    # Mesmo número de colunas, nomes trocados de lugar
+    projecao.feature_columns_ = [colunas[1], colunas[0], *colunas[2:]]
+    with pytest.raises(ValueError, match='outras colunas'):
+        fit_pipeline(dataset, processes=1, projection=projecao)
+
+
+def test_projecao_sem_colunas_registradas_e_recusada(dataset, projecao_gravada):
+    projecao, _, _ = load_projection(projecao_gravada)
+    projecao.feature_columns_ = None
+    with pytest.raises(ValueError, match='não registra'):
+        fit_pipeline(dataset, processes=1, projection=projecao)
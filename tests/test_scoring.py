@@ -0,0 +1,35 @@
+# Scoring em lote do FLAG (flag.scoring): uma multiplicação de matriz por cluster dá, na ordem original das
+# linhas, o mesmo conversion value que pontuar cliente a cliente com o GLM do seu cluster
+#
+# Uso: python -m pytest tests
+import numpy as np
+import pytest
+
+from flag.ingest import load_dataset
+from flag.pipeline import fit_pipeline, transform
+from flag.scoring import apply_predictions, design_columns, take_rows
+from flag.streaming import DEFAULT_TRAIN_PATH
+
+
+@pytest.fixture(scope='module')
+def pontuados():
+    df = load_dataset(DEFAULT_TRAIN_PATH)
+    artefatos = fit_pipeline(df, processes=1)
+    # Linhas embaralhadas: os clusters ficam intercalados, como num arquivo de clientes qualquer
+    df_novo = transform(df, artefatos).sample(frac=1, random_state=0).reset_index(drop=True)
+    return apply_predictions(df_novo, artefatos['glm_models']), artefatos['glm_models']
+
+
+def test_lote_igual_ao_loop_por_cliente(pontuados):
+    df_novo, modelos = pontuados
+    X = take_rows(design_columns(df_novo))
+    clusters = df_novo['cluster_label'].to_numpy()
+    por_cliente = np.array([modelos[clusters[i]].predict(X[i:i + 1])[0] for i in range(len(df_novo))])
+    np.testing.assert_allclose(df_novo['conversion_value'].to_numpy(), por_cliente, rtol=1e-12)
+
+
+def test_cluster_sem_modelo_e_recusado(pontuados):
+    df_novo, modelos = pontuados
+    sem_um = {cluster: modelo for cluster, modelo in modelos.items() if cluster != df_novo['cluster_label'].iloc[0]}
+    with pytest.raises(KeyError, match='Nenhum modelo'):
+        apply_predictions(df_novo.copy(), sem_um)
@@ -0,0 +1,57 @@
+# Serviço de scoring do FLAG: registros com valores ausentes são recusados na montagem da matriz e um lote
+# coalescido com uma requisição que falha ainda responde as outras
+#
+# Uso: python -m pytest tests
+import asyncio
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from flag.pipeline import fit_pipeline
+from flag.service import MicroBatcher, RecordScorer
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'digital_wallet_ltv_dataset.csv')
+
+
+@pytest.fixture(scope='module')
+def registros():
+    return pd.read_csv(DATASET).head(20).to_dict('records')
+
+
+@pytest.fixture(scope='module')
+def scorer(registros):
+    from flag.ingest import load_dataset
+
+    return RecordScorer(fit_pipeline(load_dataset(DATASET), processes=1))
+
+
+@pytest.mark.parametrize('valor', [None, float('nan'), float('inf')])
+def test_matrix_recusa_valor_nao_finito(scorer, registros, valor):
+    ruim = {**registros[0], 'Avg_Transaction_Value': valor}
+    with pytest.raises(ValueError, match='Avg_Transaction_Value'):
+        scorer.matrix([registros[1], ruim])
+
+
+# Scorer que falha sempre que o lote contém a linha marcada (primeira coluna negativa)
+class ScorerComFalha:
+    def score(self, X):
+        if (X[:, 0] < 0).any():
+            raise ValueError("linha ruim")
+        return np.zeros(len(X), dtype=np.int32), X[:, 0]
+
+
+def test_lote_com_requisicao_ruim_responde_as_outras():
+    async def rodar():
+        batcher = MicroBatcher(ScorerComFalha())
+        batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit(np.array([[valor]])) for valor in (1.0, -1.0, 2.0, 3.0)),
+                                        return_exceptions=True)
+        finally:
+            await batcher.stop()
+
+    boas, ruim, *outras = asyncio.run(rodar())
+    assert isinstance(ruim, ValueError)
+    assert [float(valores[0]) for _, valores in (boas, *outras)] == [1.0, 2.0, 3.0]
@@ -0,0 +1,27 @@
+# Treino dos GLMs por grupo (flag.training): o pool de processos, com a matriz de desenho mapeada em memória,
+# dá os mesmos coeficientes, diagnósticos e previsões in-sample que o treino em série
+#
+# Uso: python -m pytest tests
+import numpy as np
+
+from flag.ingest import load_dataset
+from flag.pipeline import fit_pipeline, transform
+from flag.scoring import GLM_FEATURES, design_columns
+from flag.streaming import DEFAULT_TRAIN_PATH
+from flag.training import fit_glm_groups
+
+
+def test_pool_igual_ao_treino_em_serie():
+    df = load_dataset(DEFAULT_TRAIN_PATH)
+    df_novo = transform(df, fit_pipeline(df, processes=1))
+    X = design_columns(df_novo)
+    y = df_novo['LTV'].to_numpy(dtype=np.float64)
+    groups = df_novo.groupby('cluster_label', sort=True).indices
+
+    serie = fit_glm_groups(X, y, groups, GLM_FEATURES, processes=1)
+    pool = fit_glm_groups(X, y, groups, GLM_FEATURES, processes=2, min_rows_parallel=0)
+    assert list(pool[0]) == list(serie[0]) == sorted(groups)
+    for cluster in groups:
+        np.testing.assert_array_equal(pool[0][cluster].params, serie[0][cluster].params)
+        assert pool[1][cluster] == serie[1][cluster]
+    np.testing.assert_array_equal(pool[2], serie[2])
@@ -0,0 +1,70 @@
+# Validação e scoring de produção do FLAG pontuam da mesma forma: as previsões fora da amostra da validação
+# rolling-origin são as do app (flag.scoring) para o modelo treinado no fold, e toda previsão dos GLMs fica na
+# faixa do LTV de treino do cluster, também no modelo exportado e no serviço. A busca dá o mesmo resultado em
+# série e no pool de processos
+#
+# Uso: python -m pytest tests
+import io
+import os
+
+import numpy as np
+import pytest
+
+from flag.export import export_model, load_model
+from flag.ingest import load_dataset
+from flag.pipeline import fit_pipeline, transform
+from flag.scoring import CONVERSION_VALUE_DIVISOR, ltv_models, predict_conversion_values
+from flag.service import RecordScorer
+from flag.validation import cross_validate, evaluate_trials, make_splits, sample_parameters
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'digital_wallet_ltv_dataset.csv')
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    return load_dataset(DATASET)
+
+
+@pytest.mark.parametrize('num_clusters', [4, 5])
+def test_validacao_usa_o_scoring_de_producao(dataset, num_clusters):
+    params = {'num_clusters': num_clusters, 'clustering_backend': 'kmeans'}
+    validacao = cross_validate(dataset, 'glm', params, scheme='rolling', processes=1)
+    for treino_idx, teste_idx in make_splits(dataset, 'rolling'):
+        artefatos = fit_pipeline(dataset.iloc[treino_idx], num_clusters=num_clusters, processes=1)
+        producao = predict_conversion_values(transform(dataset.iloc[teste_idx], artefatos), ltv_models(artefatos))
+        np.testing.assert_array_equal(validacao['predictions'][teste_idx], producao)
+
+
+@pytest.mark.parametrize('num_clusters', [4, 5])
+def test_previsoes_dos_glms_ficam_na_faixa_do_treino(dataset, num_clusters):
+    artefatos = fit_pipeline(dataset, num_clusters=num_clusters, processes=1)
+    df_novo = transform(dataset, artefatos)
+    previsto = predict_conversion_values(df_novo, ltv_models(artefatos))
+    ltv = dataset['LTV'].to_numpy(dtype=np.float64)
+    # O dataset pontuado é o próprio treino: as linhas de cada cluster são as que ajustaram o GLM dele
+    for idx in df_novo.groupby('cluster_label').indices.values():
+        assert ltv[idx].min() <= previsto[idx].min() and previsto[idx].max() <= ltv[idx].max()
+
+    # Modelo exportado e serviço aplicam o mesmo limite
+    arquivo = io.BytesIO()
+    export_model(artefatos, arquivo)
+    arquivo.seek(0)
+    exportado = load_model(arquivo)
+    np.testing.assert_allclose(predict_conversion_values(transform(dataset, exportado), ltv_models(exportado)),
+                               previsto, rtol=1e-9)
+    scorer = RecordScorer(artefatos)
+    _, servico = scorer.score(scorer.matrix(dataset.drop(columns='LTV').to_dict('records')))
+    np.testing.assert_allclose(servico * CONVERSION_VALUE_DIVISOR, previsto, rtol=1e-6)
+
+
+# Cada (trial, fold) é uma tarefa independente: o pool de processos dá as mesmas previsões e métricas que a
+# execução em série
+def test_busca_igual_em_serie_e_no_pool(dataset):
+    trials = sample_parameters('glm', 2)
+    serie = evaluate_trials(dataset, 'glm', trials, n_splits=3, processes=1)
+    pool = evaluate_trials(dataset, 'glm', trials, n_splits=3, processes=2)
+    for a, b in zip(serie, pool):
+        assert a['params'] == b['params']
+        np.testing.assert_array_equal(b['predictions'], a['predictions'])
+        assert b['fold_accuracy'] == a['fold_accuracy']
+        assert b['accuracy'] == a['accuracy']